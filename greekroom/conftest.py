@@ -0,0 +1,14 @@
+# Shared pytest fixtures of the greekroom tests (greekroom/*/test/test_*.py)
+
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def greekroom_cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Precompiled data (tag data, versification schemas, verse schema matrix) of a test goes to a fresh cache
+    directory (see general_util.cache_dir), never to the user's ~/.cache/greekroom"""
+    cache_dir = tmp_path / 'greekroom-cache'
+    monkeypatch.setenv('GREEKROOM_CACHE_DIR', str(cache_dir))
+    return cache_dir
@@ -65,6 +65,27 @@ def standard_data_dirs() -> List[str]:
     return result
 
 
+def cache_dir() -> Path:
+    """Directory of precompiled data: $GREEKROOM_CACHE_DIR, $XDG_CACHE_HOME/greekroom or ~/.cache/greekroom"""
+    if greekroom_cache_dir := os.getenv("GREEKROOM_CACHE_DIR"):
+        return Path(greekroom_cache_dir)
+    return Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "greekroom"
+
+
+def prune_cache_files(cache_filename: Path, pattern: str) -> int:
+    """Deletes the siblings of a newly stored cache file that match pattern (e.g. 'tag-data-*.pickle'),
+    i.e. cache files keyed by the hash of an earlier version of the same data. Returns number of files deleted."""
+    n_deleted = 0
+    for filename in cache_filename.parent.glob(pattern):
+        if filename != cache_filename:
+            try:
+                filename.unlink()
+                n_deleted += 1
+            except OSError:
+                pass  # e.g. already deleted by a concurrent run
+    return n_deleted
+
+
 def absolute_path(path: str) -> str:
     return path if path.startswith("/") else f"{Path(os.path.abspath(os.getcwd()))}/{path}"
 
@@ -116,6 +137,7 @@ class Corpus:
 
     def __init__(self, corpus_id: str | None = None):
         self.snt_id2snt = dict()
+        self.store = None  # memory-mapped vref corpus store instead of snt_id2snt (see load_corpus_from_store)
         self.corpus_id = corpus_id
         if corpus_id:
             Corpus.corpora[corpus_id] = self
@@ -132,6 +154,15 @@ class Corpus:
 
     def reset(self) -> None:
         self.snt_id2snt = dict()
+        if self.store:
+            self.store.close()
+            self.store = None
+
+    def load_corpus_from_store(self, store) -> int:
+        """Uses an open vref corpus store (e.g. versification/vref_corpus_store.py VrefCorpusStore) as corpus,
+        returning number of entries. The store is closed on reset."""
+        self.store = store
+        return sum(store.line_flags[:store.n_vref_lines])
 
     def load_corpus_with_vref(self, corpus_filename: str, vref_filename: str) -> Tuple[int, str]:
         """Loads corpus, vref, returning number of entries and any error-message (empty = ok)"""
@@ -165,7 +196,15 @@ class Corpus:
         return n_entries
 
     def get_snt_ids(self):
+        if self.store:
+            return list(dict.fromkeys(self.store.verse_id(line_index) for line_index in range(self.store.n_vref_lines)
+                                      if not self.store.line_is_blank(line_index)))
         return self.snt_id2snt.keys()
 
     def lookup_snt(self, snt_id: str) -> str:
+        if self.store:
+            for line_index in reversed(self.store.line_indexes(snt_id)):
+                if not self.store.line_is_blank(line_index):
+                    return self.store.line(line_index).rstrip()
+            return None
         return self.snt_id2snt.get(snt_id)
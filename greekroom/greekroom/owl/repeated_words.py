@@ -20,6 +20,7 @@ import sys
 from typing import Dict, List, Tuple
 from greekroom.gr_utilities import general_util, html_util
 from greekroom.versification.versification import BackVersification
+from greekroom.versification.vref_corpus_store import VrefCorpusStore
 
 
 def legit_dupl_data_filenames(verbose: bool = False) -> List[str]:
@@ -294,7 +295,7 @@ def load_data_filename(explicit_data_filenames: List[str] | None = None, verbose
 def update_corpus_if_empty(corpus: general_util.Corpus, check_corpus_list: List[dict]) -> general_util.Corpus:
     sys.stderr.write(f"check_corpus_list: {check_corpus_list}\n")
     corpus_id = corpus.corpus_id if corpus else None
-    if (corpus is None) or (not corpus.snt_id2snt.keys()) and check_corpus_list:
+    if (corpus is None) or (not corpus.get_snt_ids()) and check_corpus_list:
         corpus = new_corpus(corpus_id)
         corpus.load_corpus_from_in_dict(check_corpus_list)
     return corpus
@@ -303,7 +304,7 @@ def update_corpus_if_empty(corpus: general_util.Corpus, check_corpus_list: List[
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('-j', '--json', type=str, help='input text or filename (alternative 1)')
-    parser.add_argument('-i', '--in_filename', type=str, help='text file (alternative 2)')
+    parser.add_argument('-i', '--in_filename', type=str, help='text file or vref corpus store (alternative 2)')
     parser.add_argument('-r', '--ref_filename', type=Path, default='vref.txt', help='ref file (alt. 2)')
     parser.add_argument('-o', '--out_filename', type=str, default=None, help='output JSON filename')
     parser.add_argument('--html', type=str, default=None, help='output HTML filename')
@@ -338,7 +339,10 @@ def main():
         if not message_id:
             message_id = f"{lang_code}-{''.join(random.choices(string.ascii_letters + string.digits, k=8))}"
         corpus = new_corpus(message_id)
-        n_entries, error_message = corpus.load_corpus_with_vref(args.in_filename, args.ref_filename)
+        if VrefCorpusStore.is_store_file(args.in_filename):
+            n_entries, error_message = corpus.load_corpus_from_store(VrefCorpusStore(args.in_filename)), ""
+        else:
+            n_entries, error_message = corpus.load_corpus_with_vref(args.in_filename, args.ref_filename)
         if error_message:
             sys.stderr.write(f"{error_message}\n")
             return
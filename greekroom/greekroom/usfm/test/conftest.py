@@ -0,0 +1,20 @@
+# Shared pytest fixtures of the USFM tests
+
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+from ualign_utilities import BibleUtilities
+
+
+@pytest.fixture
+def new_usfm_check():
+    """Factory of UsfmCheck instances with default Bible configuration, e.g. sc = new_usfm_check()"""
+    def new_usfm_check() -> usfm_check.UsfmCheck:
+        sc = usfm_check.UsfmCheck()
+        sc.bible_config = BibleUtilities()
+        return sc
+    return new_usfm_check
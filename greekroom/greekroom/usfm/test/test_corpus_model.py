@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+
+# Checks CorpusModel corpus statistics against straightforward reference implementations,
+# and (main) benchmarks them, e.g. on a whole-Bible extract:
+#   test_corpus_model.py extract.jsonl
+
+from collections import defaultdict
+import contextlib
+import io
+from pathlib import Path
+import json
+import random
+import regex
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+
+
+def reference_paired_delimiter_counts(corpus_model: usfm_check.CorpusModel, s: str) -> list[int]:
+    """One regex scan per paired delimiter (original implementation)."""
+    counts = []
+    for left_punct, right_punct in corpus_model.paired_delimiters:
+        g_left_punct, g_right_punct = usfm_check.guard_regex(left_punct), usfm_check.guard_regex(right_punct)
+        re = fr'(?<!\pL\pM*\pP*){g_left_punct}\pP*\pL.*?\pL\pM*\pP*{g_right_punct}(?!\pP*\pL)'
+        counts.append(len(regex.findall(re, s)))
+    return counts
+
+
+def random_text(rand: random.Random, corpus_model: usfm_check.CorpusModel, length: int) -> str:
+    delimiters = corpus_model.matching_punct_candidates
+    alphabet = ['a', 'b', 'é', 'ب', '́', '्', ' ', ' ', '.', ',', '!', '-', '\n', '1']
+    return ''.join(rand.choice(delimiters) if rand.random() < 0.3 else rand.choice(alphabet)
+                   for _ in range(length))
+
+
+def test_paired_delimiter_counts():
+    corpus_model = usfm_check.CorpusModel()
+    rand = random.Random(1)
+    texts = ['He said, "Go (now) to «Jerusalem»." (John 3:16)', '(a (b) c)', '"a" "b"', '“(x)”', "'t is 'a' b'",
+             '(a\nb)', '((a b))', 'x(a b)', '(.a b.)', '(a b)c', 'a»b«c»d', '']
+    texts += [random_text(rand, corpus_model, rand.randint(1, 60)) for _ in range(3000)]
+    for s in texts:
+        assert corpus_model.count_paired_delimiters(s) == reference_paired_delimiter_counts(corpus_model, s), s
+
+
+def reference_letter_ngram_counts(token_counts: dict[str, int]) -> dict[str, int]:
+    """All letter n-grams of length 1 to 14 (original implementation)."""
+    letter_ngram_count = defaultdict(int)
+    for token, count in token_counts.items():
+        bordered_token = ' ' + token + ' '
+        max_pos = len(bordered_token)
+        for start_pos in range(max_pos):
+            for end_pos in range(start_pos + 1, min(start_pos + 15, max_pos + 1)):
+                letter_ngram_count[bordered_token[start_pos:end_pos]] += count
+    return letter_ngram_count
+
+
+def reference_letter_ngram_pmi_outliers(token_counts: dict[str, int]) -> list[tuple]:
+    """PMI of all splits of all n-grams (original implementation)."""
+    letter_ngram_count = reference_letter_ngram_counts(token_counts)
+    letter_ngram_size = sum(len(token) + 2 for token in token_counts)
+    result = []
+    for sub_token, sub_token_count in letter_ngram_count.items():
+        pmi_min, pmi_max = 99, -99
+        best_s1, best_s2 = None, None
+        for mid in range(1, len(sub_token)):
+            s1, s2 = sub_token[:mid], sub_token[mid:]
+            pmi1 = usfm_check.pmi(letter_ngram_count[s1], letter_ngram_count[s2], sub_token_count,
+                                  letter_ngram_size, smoothing=0.3)
+            if pmi1 > pmi_max:
+                pmi_max = pmi1
+                best_s1, best_s2 = s1, s2
+            if pmi1 < pmi_min:
+                pmi_min = pmi1
+        if len(sub_token) > 6 and pmi_max < -2.5:
+            result.append((sub_token, sub_token_count, pmi_min, pmi_max,
+                           best_s1, letter_ngram_count[best_s1], best_s2, letter_ngram_count[best_s2]))
+    return result
+
+
+def random_token_counts(seed: int = 3, n: int = 3000) -> dict[str, int]:
+    rand = random.Random(seed)
+    syllables = ['ka', 'lo', 'mi', 'ne', 'su', 'ta', 'ri', 'po', 'é']
+    token_counts = defaultdict(int)
+    for _ in range(n):
+        token_counts[''.join(rand.choice(syllables) for _ in range(rand.randint(1, 8)))] += rand.choice([1, 1, 2, 50])
+    return token_counts
+
+
+def test_letter_ngram_counts():
+    token_counts = random_token_counts()
+    reference_counts = reference_letter_ngram_counts(token_counts)
+    counter = usfm_check.LetterNgramCounter()
+    counter.count(token_counts)
+    assert counter.counts == reference_counts
+    counter = usfm_check.LetterNgramCounter(min_count=5)
+    counter.count(token_counts)
+    assert counter.counts == {ngram: count for ngram, count in reference_counts.items() if count >= 5}
+    counter = usfm_check.LetterNgramCounter(max_exact_len=6, sketch_width=1 << 12)
+    counter.count(token_counts)
+    assert counter.counts == {ngram: count for ngram, count in reference_counts.items() if len(ngram) <= 6}
+    assert all(counter[ngram] >= count for ngram, count in reference_counts.items())  # count-min sketch
+
+
+def test_letter_ngram_pmi_outliers():
+    token_counts = random_token_counts()
+    corpus_model = usfm_check.CorpusModel()
+    corpus_model.lc_token_count = token_counts
+    with contextlib.redirect_stderr(io.StringIO()):
+        corpus_model.letter_ngram_stats()
+    reference_outliers = reference_letter_ngram_pmi_outliers(token_counts)
+    assert reference_outliers
+    assert corpus_model.letter_ngram_pmi_outliers == reference_outliers
+    with contextlib.redirect_stderr(io.StringIO()):
+        corpus_model.letter_ngram_stats(max_exact_len=8)  # large default sketch: no collisions expected
+    assert corpus_model.letter_ngram_pmi_outliers == reference_outliers
+
+
+def extract_texts(filename: str | None) -> list[str]:
+    if filename:
+        with open(filename) as f:
+            return [d['txt'] for line in f if (d := json.loads(line)).get('txt')]
+    rand = random.Random(2)
+    words = ['and', 'he', 'said', '“Go', 'now,”', '(see', 'Mark', '1:2)', '«Lord»', 'to', 'the', "'people'", 'city.']
+    return [' '.join(rand.choice(words) for _ in range(rand.randint(5, 40))) for _ in range(31000)]
+
+
+def main():
+    texts = extract_texts(sys.argv[1] if len(sys.argv) > 1 else None)
+    corpus_model = usfm_check.CorpusModel()
+    start_time = time.perf_counter()
+    counts = [corpus_model.count_paired_delimiters(s) for s in texts]
+    duration = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    reference_counts = [reference_paired_delimiter_counts(corpus_model, s) for s in texts]
+    reference_duration = time.perf_counter() - start_time
+    print(f"Paired delimiters in {len(texts)} texts: single scan {duration:.3f} sec, "
+          f"regex per delimiter pair {reference_duration:.3f} sec, "
+          f"speed-up {reference_duration / duration:.1f}x, same counts: {counts == reference_counts}")
+    token_counts = defaultdict(int)
+    for s in texts:
+        for token in s.split():
+            token_counts[usfm_check.CorpusModel.strip_punct(token).lower()] += 1
+    if len(sys.argv) <= 1:
+        token_counts = random_token_counts(n=30000)
+    reference_outliers = None
+    for name, kwargs in (('reference', None), ('exact', {}), ('floor 3', {'min_count': 3}),
+                         ('sketch 8+', {'max_exact_len': 7})):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        if kwargs is None:
+            outliers = reference_outliers = reference_letter_ngram_pmi_outliers(token_counts)
+        else:
+            corpus_model = usfm_check.CorpusModel()
+            corpus_model.lc_token_count = token_counts
+            with contextlib.redirect_stderr(io.StringIO()):
+                corpus_model.letter_ngram_stats(**kwargs)
+            outliers = corpus_model.letter_ngram_pmi_outliers
+        duration = time.perf_counter() - start_time
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"Letter n-gram PMI ({name}) for {len(token_counts)} token types: {duration:.3f} sec, "
+              f"peak memory {peak_memory / 1e6:.1f} MB, {len(outliers)} outliers, "
+              f"same as reference: {outliers == reference_outliers}")
+
+
+if __name__ == "__main__":
+    main()
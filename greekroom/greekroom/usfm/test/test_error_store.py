@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+# Checks the columnar error store behind UsfmCheck.record_error (ErrorStore) against plain lists of recorded
+# errors, and (main) benchmarks recording and reporting many errors.
+
+from collections import defaultdict
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+from ualign_utilities import BibleUtilities
+
+
+def random_errors(rand: random.Random, n: int) -> list[tuple[tuple, str, str | None]]:
+    books = ['GEN', 'EXO', 'MAT', 'MRK', 'JHN', 'XYZ']
+    errors = []
+    for i in range(n):
+        error_cat = (rand.choice(['Errors', 'Warnings', 'Info']), f"Category {rand.randint(1, 5)}")
+        location = rand.choice([f"{rand.choice(books)} {rand.randint(1, 3)}:{rand.randint(1, 9)}",
+                                f"4{rand.randint(0, 3)}MATTEST.SFM l.{rand.randint(1, 20)}",
+                                f"{rand.choice(books)} {rand.randint(1, 3)}", 'front matter', 'other'])
+        error_string = rand.choice([None, f"\\v {i % 7} text", '\\v 1 same text'])
+        errors.append((error_cat, location, error_string))
+    return errors
+
+
+def test_error_store(new_usfm_check):
+    rand = random.Random(1)
+    sc = new_usfm_check()
+    errors = random_errors(rand, 3000)
+    locations, strings = defaultdict(list), defaultdict(list)
+    for error_cat, location, error_string in errors:
+        sc.record_error(error_cat, location, error_string, mark_up=[(location[:3], 'color:red;')])
+        locations[error_cat].append(location)
+        if error_string:
+            strings[(error_cat, location)].append(error_string)
+    assert len(sc.errors) == len(errors)
+    for error_cat in locations:
+        assert sc.errors.locations(error_cat) == locations[error_cat]
+        assert sc.errors.sorted_locations(error_cat, sc.location_sort) \
+               == sorted(locations[error_cat], key=sc.location_sort)
+        location_strings = sc.errors.location_strings(error_cat)
+        for location in locations[error_cat]:
+            assert sc.errors.has_location(error_cat, location)
+            assert location_strings.get(location, []) == strings[(error_cat, location)]
+            for error_string in set(strings[(error_cat, location)]):
+                n_mark_ups = strings[(error_cat, location)].count(error_string)
+                assert sc.errors.mark_up(error_cat, location, error_string) \
+                       == [(location[:3], 'color:red;')] * n_mark_ups
+    assert not sc.errors.has_location(('Errors', 'Category 1'), 'nowhere')
+    assert sc.errors.sorted_locations(('Errors', 'no such category'), sc.location_sort) == []
+
+
+def test_error_store_merge(new_usfm_check):
+    rand = random.Random(2)
+    errors = random_errors(rand, 2000)
+    sc = new_usfm_check()
+    for error_cat, location, error_string in errors:
+        sc.record_error(error_cat, location, error_string)
+    merged_sc = new_usfm_check()
+    for part in (errors[:700], errors[700:]):
+        part_sc = new_usfm_check()
+        for error_cat, location, error_string in part:
+            part_sc.record_error(error_cat, location, error_string)
+        merged_sc.merge_partial_state(part_sc.partial_state())
+    assert merged_sc.error_report() == sc.error_report()
+    assert merged_sc.error_report(html_p=True).count('<li>') == sc.error_report(html_p=True).count('<li>')
+
+
+def main():
+    rand = random.Random(3)
+    errors = random_errors(rand, 200000)
+    sc = usfm_check.UsfmCheck()
+    sc.bible_config = BibleUtilities()
+    start_time = time.perf_counter()
+    for error_cat, location, error_string in errors:
+        sc.record_error(error_cat, location, error_string)
+    record_duration = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    report = sc.error_report()
+    report_duration = time.perf_counter() - start_time
+    print(f"{len(errors)} errors ({len(sc.errors.values)} distinct locations and strings): "
+          f"record {record_duration:.3f} sec, text report {report_duration:.3f} sec ({len(report)} characters)")
+
+
+if __name__ == "__main__":
+    main()
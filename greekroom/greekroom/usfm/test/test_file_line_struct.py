@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+# Checks the single-pass construction of FileLineStruct (lines of a USFM file, with continuation lines combined
+# and lines split before chapter and verse tags), and (main) measures it on a file with a very long line.
+
+from pathlib import Path
+import random
+import regex
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+from ualign_utilities import BibleUtilities
+
+
+def file_line_struct(text: str) -> tuple[usfm_check.FileLineStruct, usfm_check.UsfmCheck]:
+    sc = usfm_check.UsfmCheck()
+    sc.bible_config = BibleUtilities()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = Path(tmp_dir) / "19PSATEST.SFM"
+        filename.write_text(text, newline='')
+        sc.current_filename = filename
+        return usfm_check.FileLineStruct(filename, sc=sc), sc
+
+
+def test_combine_and_split_lines():
+    text = ("\\id PSA\n\\c 1\n\\q1\n\\v 1 Blessed is the one\n\\q2 who does not walk\n"
+            "\\v 2 but whose delight \\v 3 That person\n\\s1 Heading \\c 2\n\\v 1 Why\n")
+    fls, sc = file_line_struct(text)
+    assert [ls.s for ls in fls] == ["\\id PSA\n", "\\c 1\n", "\\q1\n", "\\v 1 Blessed is the one\n",
+                                    "\\q2 who does not walk\n", "\\v 2 but whose delight ",
+                                    "\\v 3 That person\n\\s1 Heading ", "\\c 2\n", "\\v 1 Why\n"]
+    ls = fls.lines[6]
+    assert (ls.prev_ls, ls.next_ls) == (fls.lines[5], fls.lines[7])
+    assert (ls.from_line_number, ls.from_col, ls.to_line_number, ls.to_col) == (6, 24, 7, 12)
+    assert fls.lines[0].prev_ls is None
+    assert fls.lines[-1].next_ls is None
+    error_cat = ('Auto-repairable errors', 'Unexpected multiple instances of the same tag in same line', '\\v')
+    assert [location.split(' (')[0] for location in sc.errors.locations(error_cat)] == ['19PSATEST.SFM l.6']
+    # continuation lines of \q1, \v are combined (up to the next one-liner tag), material before \c is split off
+    fls, _ = file_line_struct("\\q1 line one\nline two\n\\p\n\\v 1 text \\f + \\ft note\nmore\\f*\n\\b\nend \\c 2\n")
+    assert [ls.s for ls in fls] == ["\\q1 line one\nline two\n\\p\n", "\\v 1 text \\f + \\ft note\nmore\\f*\n\\b\nend ",
+                                    "\\c 2\n"]
+    assert [ls.revised_lines for ls in fls.lines[0].original_lines] == [[fls.lines[0]]] * 3
+    assert [ls.s for ls in fls.lines[1].original_lines] == ["\\v 1 text \\f + \\ft note\nmore\\f*\n\\b\n", "end "]
+
+
+def test_line_positions():
+    rand = random.Random(1)
+    pieces = ['\\v 1 a', '\\v 2 b ', '\\c 3', ' ', 'text', '\\q1', '\\q2 x', '\\p', '\\s1 head', '\\f + \\ft n\\f*',
+              '  \\v 4', '\\rem r', '\\m', '\r']
+    for _ in range(300):
+        text = ''.join(rand.choice(pieces) + rand.choice([' ', '\n', '\n', '', '\r\n'])
+                       for _ in range(rand.randint(1, 30)))
+        fls, _ = file_line_struct(text)
+        assert ''.join(ls.s for ls in fls) == text
+        raw_lines = [ls.s for ls in fls.raw_lines]
+        for index, ls in enumerate(fls):
+            assert ls.index == index
+            assert len(regex.findall(r'\S.*?\\[cv]\b', ls.s, regex.DOTALL)) <= (1 if index == 0 else 0)
+            remaining_text = ''.join(raw_lines[ls.from_line_number - 1:])[ls.from_col - 1:]
+            assert remaining_text.startswith(ls.s)
+
+
+def main():
+    text = "\\id PSA\n\\c 1\n\\p " + ' '.join(f"\\v {i} text of verse {i}" for i in range(1, 20001)) + "\n"
+    start_time = time.perf_counter()
+    fls, _ = file_line_struct(text)
+    print(f"FileLineStruct for a line with 20000 verses ({len(text)} characters): {len(fls)} lines "
+          f"in {time.perf_counter() - start_time:.3f} sec")
+
+
+if __name__ == "__main__":
+    main()
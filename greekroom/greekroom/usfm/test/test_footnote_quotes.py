@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+# Checks footnote quote lookup in verse texts (UsfmCheck.find_quote_in_verse_text with a VerseTextIndex)
+# against the original per-quote regex search, and (main) benchmarks both.
+
+from pathlib import Path
+import random
+import regex
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+
+
+def reference_find_quote_in_verse_text(quote: str, verse_text: str) -> str | None:
+    """Original implementation: case-insensitive search with the quote's regex form."""
+    if (position := verse_text.lower().find(quote.lower())) >= 0:
+        return verse_text[position:position+len(quote)]
+    re_quote = usfm_check.UsfmCheck.regex_form(quote)
+    if m := regex.search(re_quote, verse_text, flags=regex.IGNORECASE | regex.DOTALL):
+        return m[0]
+    return None
+
+
+alphabet = ['a', 'b', 'A', 'σ', 'ς', 'Σ', 'ß', 'İ', 'i', 'ǅ', 'K', 'K', '.', ' ', ' ', '  ', ' ', '\t', '\n',
+            '…', '...', '(', '*', '\\', '[']
+foldable_alphabet = [c for c in alphabet if c not in ('ß', 'İ')]  # mostly exercise index (rather than regex)
+
+
+def random_verse_and_quote(rand: random.Random) -> tuple[str, str]:
+    chars = alphabet if rand.random() < 0.2 else foldable_alphabet
+    verse_text = ''.join(rand.choice(chars) for _ in range(rand.randint(0, 30)))
+    start = rand.randint(0, len(verse_text))
+    quote = verse_text[start:start + rand.randint(0, 12)]
+    # perturb quote: change case, whitespace and insert ellipses
+    quote = ''.join(c.upper() if rand.random() < 0.2 else c for c in quote)
+    quote = regex.sub(r'\s+', lambda m: rand.choice([' ', m[0], '\t ']), quote)
+    for _ in range(rand.randint(0, 2)):
+        position = rand.randint(0, len(quote))
+        quote = quote[:position] + rand.choice(['…', '...', ' … ', '....']) + quote[position + rand.randint(0, 4):]
+    return verse_text, quote
+
+
+def test_find_quote_in_verse_text():
+    rand = random.Random(1)
+    cases = [('In the beginning God created', 'the BEGINNING'), ('In the  beginning\nGod', 'the beginning god'),
+             ('Jesus wept. And then he left.', 'Jesus … left'), ('a b a b a b', 'a…b'), ('a b c', 'a … … c'),
+             ('a  b', 'a … b'), ('λόγος ἦν', 'ΛΌΓΟΣ'), ('Straße', 'STRASSE'), ('x', ''), ('', 'x'),
+             ('a.b', '...'),
+             ('He said (so) [sic]', 'said (so) [s'), ('a\\b', 'A\\B…')]
+    cases += [random_verse_and_quote(rand) for _ in range(20000)]
+    n_found = 0
+    for verse_text, quote in cases:
+        result = usfm_check.UsfmCheck.find_quote_in_verse_text(quote, verse_text)
+        assert result == reference_find_quote_in_verse_text(quote, verse_text), (verse_text, quote)
+        n_found += result is not None
+    assert 0 < n_found < len(cases)
+
+
+def test_verse_text_index_reuse():
+    verse_text = 'The  Word was with God, and the Word was God.'
+    verse_text_index = usfm_check.VerseTextIndex(verse_text)
+    for quote in ('the word', 'WITH god… god', 'word … was', 'Word is'):
+        assert (usfm_check.UsfmCheck.find_quote_in_verse_text(quote, verse_text, verse_text_index)
+                == reference_find_quote_in_verse_text(quote, verse_text))
+
+
+def main():
+    rand = random.Random(2)
+    words = ['and', 'he', 'said', 'Go', 'now,', 'to', 'the', 'people', 'of', 'the', 'city.', 'Lord', 'Σίμων']
+    verses = []
+    for _ in range(10000):
+        verse_text = ' '.join(rand.choice(words) for _ in range(rand.randint(10, 60)))
+        tokens = verse_text.split()
+        quotes = []
+        for _ in range(4):  # study-Bible style: several footnotes per verse, with ellipses and case differences
+            start = rand.randint(0, len(tokens) - 1)
+            quote = ' '.join(tokens[start:start + rand.randint(1, 6)])
+            quotes.append(rand.choice([quote, quote.upper(), quote.replace(' ', ' … ', 1), quote + ' xyz']))
+        verses.append((verse_text, quotes))
+    start_time = time.perf_counter()
+    results = [usfm_check.UsfmCheck.find_quote_in_verse_text(quote, verse_text, verse_text_index)
+               for verse_text, quotes in verses
+               for verse_text_index in [usfm_check.VerseTextIndex(verse_text)]
+               for quote in quotes]
+    duration = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    reference_results = [reference_find_quote_in_verse_text(quote, verse_text)
+                         for verse_text, quotes in verses for quote in quotes]
+    reference_duration = time.perf_counter() - start_time
+    print(f"Footnote quotes in {len(verses)} verses ({len(results)} quotes): index {duration:.3f} sec, "
+          f"regex per quote {reference_duration:.3f} sec, speed-up {reference_duration / duration:.1f}x, "
+          f"same results: {results == reference_results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+# Checks that USFM tag data (tag properties and explanations) loaded once per process (shared by UsfmCheck
+# instances) or from the precompiled cache is the same as tag data read from the data files, that stale cache files
+# are deleted,
+# and (main) measures UsfmCheck construction time.
+
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+
+data_dir = Path(usfm_check.__file__).resolve().parent
+
+
+def tag_data_from_data_files() -> tuple[dict, dict]:
+    sc = usfm_check.UsfmCheck()
+    sc.tag_props, sc.explanation_id_to_explanation = {}, {}
+    sc.read_tag_prop_data(data_dir / "Bible_USFM_tag_data.jsonl")
+    sc.read_usfm_explanations(data_dir / "Bible_USFM_explanations.txt")
+    return sc.tag_props, sc.explanation_id_to_explanation
+
+
+def new_tag_data() -> tuple[dict, dict]:
+    """Tag data of a new UsfmCheck, as in a new process (cache directory: $GREEKROOM_CACHE_DIR)"""
+    usfm_check.loaded_tag_data.clear()
+    sc = usfm_check.UsfmCheck()
+    return sc.tag_props, sc.explanation_id_to_explanation
+
+
+def test_tag_data_cache(greekroom_cache_dir: Path):
+    os.makedirs(greekroom_cache_dir)
+    stale_filename = greekroom_cache_dir / 'tag-data-earlier-version.pickle'
+    stale_filename.write_bytes(b'tag data of an earlier version')
+    cold_tag_data = new_tag_data()  # cold: from data files
+    reference_tag_data = tag_data_from_data_files()
+    assert len(reference_tag_data[0]) > 100
+    assert cold_tag_data == reference_tag_data
+    cache_filenames = list(greekroom_cache_dir.glob('tag-data-*.pickle'))
+    assert len(cache_filenames) == 1 and not stale_filename.exists()
+    assert new_tag_data() == reference_tag_data  # from precompiled cache
+    cache_filenames[0].write_bytes(b'corrupted')
+    assert new_tag_data() == reference_tag_data  # unreadable cache: from data files
+    # shared within process
+    assert usfm_check.UsfmCheck().tag_props is usfm_check.UsfmCheck().tag_props
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ['GREEKROOM_CACHE_DIR'] = cache_dir
+        for name in ('data files', 'precompiled cache'):
+            start_time = time.perf_counter()
+            new_tag_data()
+            print(f"First UsfmCheck in process ({name}): {(time.perf_counter() - start_time) * 1000:.2f} ms")
+    n = 1000
+    start_time = time.perf_counter()
+    for _ in range(n):
+        usfm_check.UsfmCheck()
+    print(f"Further UsfmCheck instances: {(time.perf_counter() - start_time) / n * 1e6:.0f} µs each")
+
+
+if __name__ == "__main__":
+    main()
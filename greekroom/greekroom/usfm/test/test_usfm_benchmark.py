@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+
+# Deterministic generator of synthetic USFM projects (up to 66 books with verse counts from versification/data/vref.txt)
+# of configurable size and markup density (footnotes, cross-references, poetry, nested character styles),
+# including pathological long lines, and (main) a usfm_check benchmark runner reporting books per second,
+# peak RSS and time per phase (read_file, checks, extract, reports). Checker changes (e.g. to tokenization or
+# caching) should be measured with it, e.g.:
+#   test_usfm_benchmark.py                        # full 66-book synthetic project, default densities
+#   test_usfm_benchmark.py --books 12 --footnotes 0.8 --workers 4 --json benchmarks.jsonl
+#   test_usfm_benchmark.py -d PROJECT-DIR         # existing project
+
+import argparse
+import contextlib
+import io
+import json
+from pathlib import Path
+import random
+import regex
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+from ualign_utilities import BibleUtilities
+
+vref_filename = Path(__file__).resolve().parent.parent.parent / "versification" / "data" / "vref.txt"
+words = ['and', 'the', 'lord', 'said', 'unto', 'moses', 'go', 'down', 'into', 'egypt', 'people', 'light',
+         'darkness', 'water', 'city', 'king', 'house', 'of', 'israel', 'he', 'they', 'came', 'spoke', 'word']
+
+
+def book_chapter_verse_counts() -> dict[str, list[int]]:
+    """Number of verses per chapter for books of the Old and New Testament, in canonical order"""
+    result = {}
+    with open(vref_filename) as f:
+        for line in f:
+            book, chapter_verse = line.split()
+            chapter, verse = (int(i) for i in chapter_verse.split(':'))
+            chapter_verse_counts = result.setdefault(book, [])
+            if len(chapter_verse_counts) < chapter:
+                chapter_verse_counts.append(0)
+            chapter_verse_counts[chapter - 1] = max(chapter_verse_counts[chapter - 1], verse)
+    bible_config = BibleUtilities()
+    return {book: result[book] for book in bible_config.ot_books + bible_config.nt_books}
+
+
+class SyntheticProjectWriter:
+    """Writes a synthetic USFM project. Densities are probabilities per verse."""
+
+    def __init__(self, seed: int = 1, footnotes: float = 0.3, cross_references: float = 0.2, poetry: float = 0.2,
+                 nesting: float = 0.1, max_nesting_depth: int = 6, errors: float = 0.02,
+                 n_long_lines_per_book: int = 1, long_line_n_segments: int = 2000):
+        self.rand = random.Random(seed)
+        self.footnotes, self.cross_references, self.poetry = footnotes, cross_references, poetry
+        self.nesting, self.max_nesting_depth, self.errors = nesting, max_nesting_depth, errors
+        self.n_long_lines_per_book = n_long_lines_per_book
+        self.long_line_n_segments = long_line_n_segments
+        self.bible_config = BibleUtilities()
+
+    def text(self, n: int) -> str:
+        return ' '.join(self.rand.choice(words) for _ in range(n))
+
+    def ref(self) -> str:
+        return f"{self.rand.choice(self.bible_config.nt_books)} {self.rand.randint(1, 9)}:{self.rand.randint(1, 20)}"
+
+    def nested_character_styles(self, depth: int) -> str:
+        """E.g. \\add a \\+nd b \\+w c|strong="H1"\\+w* d\\+nd* e\\add*"""
+        tags = [self.rand.choice(['nd', 'add', 'bd', 'it', 'wj', 'qt']) for _ in range(depth)]
+        s = f"\\w {self.text(1)}|strong=\"H{self.rand.randint(1, 9999)}\"\\w*" if depth == 1 \
+            else f"\\+w {self.text(1)}|strong=\"H{self.rand.randint(1, 9999)}\"\\+w*"
+        for tag in reversed(tags[1:]):
+            s = f"\\+{tag} {self.text(1)} {s} {self.text(1)}\\+{tag}*"
+        return f"\\{tags[0]} {self.text(2)} {s} {self.text(1)}\\{tags[0]}*"
+
+    def verse_lines(self, book: str, chapter: int, verse: int) -> list[str]:
+        rand = self.rand
+        content = [self.text(rand.randint(5, 15))]
+        if rand.random() < self.nesting:
+            content.append(self.nested_character_styles(rand.randint(2, self.max_nesting_depth)))
+        if rand.random() < self.footnotes:
+            quote = content[0].split()[rand.randint(0, 2)]
+            content.append(f"\\f + \\fr {chapter}:{verse} \\fq {quote}…\\fq* \\ft {self.text(6)} {self.ref()}\\f*")
+        if rand.random() < self.cross_references:
+            content.append(f"\\x - \\xo {chapter}.{verse} \\xt {self.ref()}; {self.ref()}\\x* {self.text(3)}")
+        if rand.random() < self.errors:
+            content.append(rand.choice(['the the', '\\xyz odd', '/bd slash \\bd*', '\\nd unclosed', '\\add*']))
+        if rand.random() < self.poetry:
+            return ["\\q1\n", f"\\v {verse} {' '.join(content)}\n", f"\\q2 {self.text(5)} \\qs Selah\\qs*\n"]
+        return [f"\\v {verse} {' '.join(content)}\n"]
+
+    def long_line(self, chapter: int, verse: int) -> str:
+        """Pathological line: e.g. unsegmented poetry, long table row or verse with thousands of tags"""
+        n = self.long_line_n_segments
+        kind = self.rand.choice(['verse', 'poetry', 'table'])
+        if kind == 'verse':
+            return (f"\\v {verse} " + ' '.join(f"{self.text(2)} \\w w{i}|strong=\"H{i}\"\\w* \\add x\\add* "
+                                               f"\\f + \\fr {chapter}:{verse} \\ft note\\f*" for i in range(n)) + "\n")
+        elif kind == 'poetry':
+            return f"\\q1 \\v {verse} " + ' '.join(f"{self.text(4)} \\qs Selah\\qs* \\nd Lord\\nd*"
+                                                  for _ in range(n)) + "\n"
+        else:
+            return f"\\tr \\tc1 \\v {verse} " + ' '.join(f"\\tc{1 + i % 3} cell {i}" for i in range(n)) + "\n"
+
+    def book_lines(self, book: str, chapter_verse_counts: list[int]) -> list[str]:
+        name = book.title()
+        lines = [f"\\id {book} synthetic test project\n", f"\\h {name}\n", f"\\toc1 {name}\n", f"\\toc2 {name}\n",
+                 f"\\mt1 {name}\n"]
+        long_line_chapters = set(self.rand.sample(range(1, len(chapter_verse_counts) + 1),
+                                                  min(self.n_long_lines_per_book, len(chapter_verse_counts))))
+        for chapter, n_verses in enumerate(chapter_verse_counts, 1):
+            lines.extend([f"\\c {chapter}\n", f"\\s1 {self.text(4)}\n", "\\p\n"])
+            for verse in range(1, n_verses + 1):
+                if self.rand.random() < self.errors / 4:
+                    continue  # missing verse
+                if (chapter in long_line_chapters) and (verse == n_verses):
+                    lines.append(self.long_line(chapter, verse))
+                else:
+                    lines.extend(self.verse_lines(book, chapter, verse))
+        return lines
+
+    def write(self, directory: Path, n_books: int = 66, chapter_fraction: float = 1.0) -> list[Path]:
+        """Writes the first n_books books, with the first chapter_fraction of their chapters (at least 1)"""
+        filenames = []
+        for book, chapter_verse_counts in list(book_chapter_verse_counts().items())[:n_books]:
+            n_chapters = max(1, round(len(chapter_verse_counts) * chapter_fraction))
+            filename = directory / f"{self.bible_config.book_to_book_number[book]:02d}{book}SYN.SFM"
+            filename.write_text(''.join(self.book_lines(book, chapter_verse_counts[:n_chapters])))
+            filenames.append(filename)
+        return filenames
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process and its (waited-for) worker processes (ru_maxrss in KB on Linux)"""
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+
+
+def run_benchmark(filenames: list[Path], n_workers: int = 1, html_p: bool = True) -> dict:
+    """Runs usfm_check phases as in usfm_check.main (stderr output suppressed), returns time per phase etc."""
+    phase_durations = {}
+    sc = usfm_check.UsfmCheck()
+    sc.bible_config = BibleUtilities()
+    sc.misc_data_dict = {}
+    start_time = time.perf_counter()
+    with contextlib.redirect_stderr(io.StringIO()):
+        sc.read_files(filenames, n_workers)
+        phase_durations['read_file'] = time.perf_counter() - start_time
+        phase_start_time = time.perf_counter()
+        sc.check_for_missing_verses()
+        sc.check_bible_text_extracts()
+        sc.check_for_inconsistent_ellipses()
+        sc.final_check()
+        sc.error_propagation()
+        phase_durations['checks'] = time.perf_counter() - phase_start_time
+        phase_start_time = time.perf_counter()
+        extract_size = sum(len(str(bte)) for bte in sc.bible_text_extract_spool)
+        phase_durations['extract'] = time.perf_counter() - phase_start_time
+        phase_start_time = time.perf_counter()
+        report_size = len(sc.tag_stats()) + sum(len(part) for part in sc.error_report_parts())
+        if html_p:
+            report_size += len(sc.tag_stats(html_p=True)) + sum(len(part)
+                                                                 for part in sc.html_error_report_parts(n_workers))
+        phase_durations['reports'] = time.perf_counter() - phase_start_time
+    duration = time.perf_counter() - start_time
+    return {'n_books': len(filenames), 'n_bytes': sum(filename.stat().st_size for filename in filenames),
+            'n_workers': n_workers, 'n_errors': sc.error_counts[()], 'extract_size': extract_size,
+            'report_size': report_size, 'duration': round(duration, 3),
+            'books_per_sec': round(len(filenames) / duration, 2),
+            'phase_durations': {phase: round(d, 3) for phase, d in phase_durations.items()},
+            'peak_rss_mb': round(peak_rss_mb(), 1)}
+
+
+def test_synthetic_project_is_deterministic():
+    with tempfile.TemporaryDirectory() as tmp_dir1, tempfile.TemporaryDirectory() as tmp_dir2:
+        filenames1 = SyntheticProjectWriter(seed=5).write(Path(tmp_dir1), n_books=3, chapter_fraction=0.1)
+        filenames2 = SyntheticProjectWriter(seed=5).write(Path(tmp_dir2), n_books=3, chapter_fraction=0.1)
+        assert [filename.name for filename in filenames1] == ['01GENSYN.SFM', '02EXOSYN.SFM', '03LEVSYN.SFM']
+        assert [filename.read_text() for filename in filenames1] == [filename.read_text() for filename in filenames2]
+
+
+def test_synthetic_project_markup():
+    book_lines = SyntheticProjectWriter(seed=2, footnotes=1.0, nesting=1.0, max_nesting_depth=5,
+                                        long_line_n_segments=300).book_lines('PHM', [25])
+    text = ''.join(book_lines)
+    assert max(len(line) for line in book_lines) > 5000
+    assert '\\f + \\fr 1:7 ' in text
+    assert len(regex.findall(r'\\\+[a-z]+ ', text)) > 25
+    assert book_chapter_verse_counts()['PHM'] == [25]
+    assert len(book_chapter_verse_counts()) == 66
+
+
+def test_benchmark_run():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filenames = SyntheticProjectWriter(seed=3, errors=0.2, long_line_n_segments=100)\
+            .write(Path(tmp_dir), n_books=2, chapter_fraction=0.1)
+        result = run_benchmark(filenames)
+    assert set(result['phase_durations']) == {'read_file', 'checks', 'extract', 'reports'}
+    assert result['n_books'] == 2
+    assert result['n_errors'] > 0
+    assert result['extract_size'] > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='usfm_check benchmark on a synthetic (or existing) USFM project')
+    parser.add_argument('-d', '--dir', type=Path, default=None, metavar='EXISTING-PROJECT-DIRECTORY')
+    parser.add_argument('--keep', type=Path, default=None, metavar='DIRECTORY',
+                        help='write synthetic project to this directory (default: temporary directory)')
+    parser.add_argument('--books', type=int, default=66, metavar='N', help='number of books (default: 66)')
+    parser.add_argument('--chapter_fraction', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--footnotes', type=float, default=0.3, help='density per verse (default: 0.3)')
+    parser.add_argument('--cross_references', type=float, default=0.2, help='density per verse (default: 0.2)')
+    parser.add_argument('--poetry', type=float, default=0.2, help='density per verse (default: 0.2)')
+    parser.add_argument('--nesting', type=float, default=0.1, help='density per verse (default: 0.1)')
+    parser.add_argument('--max_nesting_depth', type=int, default=6)
+    parser.add_argument('--long_lines', type=int, default=1, metavar='N', help='long lines per book (default: 1)')
+    parser.add_argument('--workers', type=int, default=1, metavar='N')
+    parser.add_argument('--no_html', action='store_true', help='skip HTML report rendering')
+    parser.add_argument('--json', type=str, default=None, metavar='JSONL-FILENAME',
+                        help='(optional) append result (with parameters) to this file')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.dir:
+            filenames = sorted(filename for filename in args.dir.iterdir()
+                               if regex.search(r'\.u?sfm$', filename.name, regex.IGNORECASE))
+        else:
+            directory = args.keep or Path(tmp_dir)
+            directory.mkdir(parents=True, exist_ok=True)
+            start_time = time.perf_counter()
+            filenames = SyntheticProjectWriter(seed=args.seed, footnotes=args.footnotes,
+                                               cross_references=args.cross_references, poetry=args.poetry,
+                                               nesting=args.nesting, max_nesting_depth=args.max_nesting_depth,
+                                               n_long_lines_per_book=args.long_lines)\
+                .write(directory, n_books=args.books, chapter_fraction=args.chapter_fraction)
+            sys.stderr.write(f"Wrote {len(filenames)} synthetic books to {directory} "
+                             f"in {time.perf_counter() - start_time:.1f} sec\n")
+        result = run_benchmark(filenames, n_workers=args.workers, html_p=not args.no_html)
+    phases = ', '.join(f"{phase} {duration:.2f}" for phase, duration in result['phase_durations'].items())
+    print(f"{result['n_books']} books ({result['n_bytes'] / 1e6:.1f} MB, {result['n_errors']} errors/warnings): "
+          f"{result['books_per_sec']:.2f} books/sec, {result['duration']:.2f} sec ({phases}), "
+          f"peak RSS {result['peak_rss_mb']:.0f} MB")
+    if args.json:
+        with open(args.json, 'a') as f_json:
+            f_json.write(json.dumps({'parameters': {key: str(value) if isinstance(value, Path) else value
+                                                    for key, value in vars(args).items() if key != 'json'},
+                                     **result}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+# Stress test of USFM line tokenization (UsfmObject/UsfmElement) on very long lines,
+# such as unsegmented poetry or tables with many cells.
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+from ualign_utilities import BibleUtilities
+
+
+def usfm_object(sc: usfm_check.UsfmCheck, line: str) -> usfm_check.UsfmObject:
+    sc.current_line = line
+    return usfm_check.UsfmObject(line, sc, 'test.SFM', 1, 1)
+
+
+def elements_with_tag(elements: list, tag: str) -> list:
+    result = []
+    stack = list(elements)
+    while stack:
+        element = stack.pop()
+        if isinstance(element, usfm_check.UsfmElement):
+            if element.tag == tag:
+                result.append(element)
+            stack.extend(element.sub_elements)
+    return result
+
+
+def long_verse_line(n: int) -> str:
+    return ("\\v 1 " + " ".join(f"text {i} \\w w{i}|strong=\"H{i}\"\\w* \\add x\\add* \\f + \\fr 1:1 \\ft note\\f*"
+                                for i in range(n)) + "\n")
+
+
+def long_poetry_line(n: int) -> str:
+    return "\\q1 " + " ".join(f"line {i} of poetry \\qs Selah\\qs* \\nd Lord\\nd*" for i in range(n)) + "\n"
+
+
+def long_table_row(n: int) -> str:
+    return "\\tr " + " ".join(f"\\tc{1 + i % 3} cell {i}" for i in range(n)) + "\n"
+
+
+def test_element_positions(new_usfm_check):
+    sc = new_usfm_check()
+    line = "\\v 1 a \\w b|x=\"y\"\\w* c\n"
+    so = usfm_object(sc, line)
+    assert so.flat_print() == line
+    w_element = elements_with_tag(so.elements, 'w')[0]
+    assert w_element.start_position == (1, line.index('\\w ') + 1)
+    assert w_element.end_position == (1, line.index('\\w*') + len('\\w*') + 1)
+    assert w_element.attributes == {}
+    assert w_element.right_arg_s == '|x="y"'
+
+
+def test_long_verse_line(new_usfm_check):
+    sc = new_usfm_check()
+    n = 5000
+    line = long_verse_line(n)
+    so = usfm_object(sc, line)
+    assert so.flat_print() == line
+    assert len(elements_with_tag(so.elements, 'w')) == n
+    assert len(elements_with_tag(so.elements, 'f')) == n
+    so.check('test.SFM l.1')
+
+
+def test_long_poetry_line(new_usfm_check):
+    sc = new_usfm_check()
+    n = 5000
+    line = long_poetry_line(n)
+    so = usfm_object(sc, line)
+    assert so.flat_print() == line
+    assert len(elements_with_tag(so.elements, 'qs')) == n
+
+
+def test_long_table_row(new_usfm_check):
+    sc = new_usfm_check()
+    n = 5000
+    line = long_table_row(n)
+    so = usfm_object(sc, line)
+    assert so.flat_print() == line
+    assert sum(len(elements_with_tag(so.elements, f'tc{i}')) for i in (1, 2, 3)) == n
+
+
+def test_linear_scaling(new_usfm_check):
+    # Tokenization time should grow (roughly) linearly with line length; generous bound to avoid flakiness.
+    sc = new_usfm_check()
+    durations = []
+    for n in (1000, 4000):
+        line = long_verse_line(n)
+        start_time = time.perf_counter()
+        usfm_object(sc, line)
+        durations.append(time.perf_counter() - start_time)
+    assert durations[1] < 10 * durations[0]
+
+
+def main():
+    sc = usfm_check.UsfmCheck()
+    sc.bible_config = BibleUtilities()
+    for name, make_line in (('verse', long_verse_line), ('poetry', long_poetry_line), ('table', long_table_row)):
+        for n in (1000, 4000, 16000):
+            line = make_line(n)
+            start_time = time.perf_counter()
+            so = usfm_object(sc, line)
+            duration = time.perf_counter() - start_time
+            print(f"{name:6} n={n:5} length={len(line):7}  {duration:.3f} sec  round-trip: {so.flat_print() == line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+# Checks that reading files in parallel worker processes (usfm_check --workers N) and
+# reading files with a cache of per-file results (usfm_check --cache) yield the same merged results
+# as reading them sequentially, also for continuation files without \id, which continue the chapter and verse
+# of the previous file.
+
+from pathlib import Path
+import sys
+import tempfile
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+from ualign_utilities import BibleUtilities
+
+books = (('41MAT', 'MAT', 'Matthew'), ('42MRK', 'MRK', 'Mark'), ('43LUK', 'LUK', 'Luke'))
+
+
+def write_project(directory: Path) -> list[Path]:
+    filenames = []
+    for number_id, book_id, book_name in books:
+        filename = directory / f"{number_id}TEST.SFM"
+        lines = [f"\\id {book_id} test\n", f"\\toc1 {book_name}\n", f"\\mt1 {book_name}\n"]
+        for chapter in (1, 2):
+            lines.append(f"\\c {chapter}\n\\p\n")
+            for verse in range(1, 6):
+                if (chapter, verse) == (2, 3):
+                    continue  # missing verse
+                lines.append(f"\\v {verse} the the word in {books[verse % 3][2]} {chapter}:{verse} "
+                             f"\\f + \\fr {chapter}:{verse} \\fq word…\\fq* \\ft note\\f* \\xyz odd\n")
+        filename.write_text(''.join(lines))
+        filenames.append(filename)
+    # continuation file without \id, continuing chapter 2 of the previous file and sharing its extract keys
+    filename = directory / "43LUKb.SFM"
+    filename.write_text("\\c 3\n\\p\n\\v 1 more text in Luke 3:1\n")
+    filenames.append(filename)
+    return filenames
+
+
+def check_results(filenames: list[Path], n_workers: int = 1, cache_dir: Path | None = None) \
+        -> tuple[str, str, str, str]:
+    sc = usfm_check.UsfmCheck()
+    sc.bible_config = BibleUtilities()
+    sc.misc_data_dict = {}
+    if cache_dir:
+        sc.cache = usfm_check.PartialStateCache(cache_dir, sc)
+    sc.read_files(filenames, n_workers)
+    sc.check_for_missing_verses()
+    sc.check_bible_text_extracts()
+    sc.check_for_inconsistent_ellipses()
+    sc.final_check()
+    sc.error_propagation()
+    extracts = ''.join(str(bte) for bte in sc.bible_text_extract_spool)
+    return sc.tag_stats(), sc.error_report(), extracts, str(dict(sc.error_counts))
+
+
+def test_parallel_equals_sequential():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filenames = write_project(Path(tmp_dir))
+        sequential_results = check_results(filenames, 1)
+        parallel_results = check_results(filenames, 3)
+    assert 'Found self-reference' in sequential_results[1]
+    assert 'Book starts with chapter' not in sequential_results[1]
+    for sequential_result, parallel_result in zip(sequential_results, parallel_results):
+        assert sequential_result == parallel_result
+
+
+def test_cached_equals_cold():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filenames = write_project(Path(tmp_dir))
+        cache_dir = Path(tmp_dir) / 'cache'
+        cold_results = check_results(filenames, cache_dir=cache_dir)
+        assert len(list(cache_dir.glob('*.pickle'))) == len(filenames) - 1  # not the continuation file
+        assert check_results(filenames, cache_dir=cache_dir) == cold_results
+        # edit one book; only that book is re-read
+        filenames[1].write_text(filenames[1].read_text().replace('\\v 4 ', '\\v 44 '))
+        edited_cold_results = check_results(filenames)
+        assert edited_cold_results != cold_results
+        assert check_results(filenames, n_workers=2, cache_dir=cache_dir) == edited_cold_results
+        assert len(list(cache_dir.glob('*.pickle'))) == len(filenames)
+
+
+def main():
+    test_parallel_equals_sequential()
+    print("Parallel results equal sequential results.")
+    test_cached_equals_cold()
+    print("Cached results equal cold results.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+# Checks that error reports written in parts (UsfmCheck.error_report_parts) and HTML reports with verses colored
+# in chunks in worker processes while the report is written (UsfmCheck.html_error_report_parts) are the same as the
+# sequentially built reports, and (main) measures both ways of rendering the HTML error report.
+
+import multiprocessing
+import os
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # usfm_check imports sibling ualign_utilities
+import usfm_check
+from ualign_utilities import BibleUtilities
+
+
+def usfm_check_with_errors(seed: int, n: int) -> usfm_check.UsfmCheck:
+    rand = random.Random(seed)
+    sc = usfm_check.UsfmCheck()
+    sc.bible_config = BibleUtilities()
+    error_cats = [('Errors', 'Missing closing tag', '\\f'), ('Errors', 'Missing space after open tag', '\\w'),
+                  ('Warnings', 'Consecutive duplicate words', 'the the'), ('Errors', 'Missing verse number'),
+                  ('Silent', 'Missing closing tag', '\\f')]
+    for i in range(n):
+        book = rand.choice(['GEN', 'EXO', 'MAT', 'MRK', 'JHN'])
+        location = f"{book} {rand.randint(1, 3)}:{rand.randint(1, 9)}"
+        verse = rand.choice([f"\\v {i % 9} In the the beginning \\f + \\ft note", '\\v 2 \\wword\\w* <b>',
+                             f"\\v {i % 5} text \\f + \\fr 1:1 \\ft note\\f* more  "])
+        sc.record_error(rand.choice(error_cats), location, verse)
+    sc.error_propagation()
+    return sc
+
+
+def html_error_report(sc: usfm_check.UsfmCheck) -> str:
+    usfm_check.n_toggle_indexes = 0
+    return sc.error_report(html_p=True)
+
+
+def test_error_report_parts():
+    sc = usfm_check_with_errors(1, 500)
+    for html_p in (False, True):
+        usfm_check.n_toggle_indexes = 0
+        report = sc.error_report(html_p=html_p)
+        usfm_check.n_toggle_indexes = 0
+        assert ''.join(sc.error_report_parts(html_p=html_p)) == report
+
+
+def test_color_verses_in_parallel(monkeypatch):
+    sc = usfm_check_with_errors(2, 500)
+    report = html_error_report(sc)
+    assert '<span style="color:red;">' in report
+    monkeypatch.setattr(usfm_check.UsfmCheck, 'colored_verse_chunk_size', 7)  # many chunks
+    if 'fork' in multiprocessing.get_all_start_methods():
+        n_verses = sum(1 for _ in sc.report_verses())
+        assert n_verses > 100
+        assert [job for job, _ in sc.colored_verse_stream(3)] == list(sc.report_verses())
+    color_verse, colored_in_main_process = usfm_check.UsfmCheck.color_verse, []
+    main_pid = os.getpid()
+
+    def recorded_color_verse(self, *args):
+        if os.getpid() == main_pid:
+            colored_in_main_process.append(args)
+        return color_verse(self, *args)
+
+    monkeypatch.setattr(usfm_check.UsfmCheck, 'color_verse', recorded_color_verse)
+    usfm_check.n_toggle_indexes = 0
+    assert ''.join(sc.html_error_report_parts(3)) == report
+    if 'fork' in multiprocessing.get_all_start_methods():
+        assert not colored_in_main_process  # all verses colored by the workers
+    assert sc.colored_verses is None
+
+
+def main():
+    sc = usfm_check_with_errors(3, 50000)
+    start_time = time.perf_counter()
+    report = html_error_report(sc)
+    duration = time.perf_counter() - start_time
+    n_workers = max(2, multiprocessing.cpu_count())
+    start_time = time.perf_counter()
+    usfm_check.n_toggle_indexes = 0
+    parallel_report = ''.join(sc.html_error_report_parts(n_workers))
+    parallel_duration = time.perf_counter() - start_time
+    print(f"HTML error report ({len(sc.errors)} errors): sequential {duration:.3f} sec, "
+          f"verses colored by {n_workers} workers {parallel_duration:.3f} sec, "
+          f"same report: {parallel_report == report}")
+
+
+if __name__ == "__main__":
+    main()
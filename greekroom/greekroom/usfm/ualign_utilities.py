@@ -318,6 +318,9 @@ class BibleRefSpan:
 
 class BibleUtilities:
     # For books and their standard abbreviations, see doc at https://ubsicap.github.io/usfm/identification/books.html
+    snt_id_regex = regex.compile(r'([A-Z1-3][A-Z][A-Z])\s+(\d+):(\d+[ab]?)$')
+    parsed_snt_ids = {}  # key: snt_id  value: (book, chapter, verse) or None (see parse_snt_id)
+
     def __init__(self, config_dirs: list[str] | None = None):
         self.ot_books = ('GEN', 'EXO', 'LEV', 'NUM', 'DEU', 'JOS', 'JDG', 'RUT', '1SA', '2SA',
                          '1KI', '2KI', '1CH', '2CH', 'EZR', 'NEH', 'EST', 'JOB', 'PSA', 'PRO',
@@ -406,17 +409,28 @@ class BibleUtilities:
             if (m := regex.search(r'([A-Z1-3][A-Z][A-Z])\s+(\d+):(\d+[ab]?(?:-\d+[ab]?)?)$', snt_id)) \
             else None
 
+    @staticmethod
+    def parse_snt_id(snt_id) -> Tuple[str, str, str] | None:
+        """Returns book, chapter, verse of a sentence ID such as 'GEN 1:1' (memoized, as sentence IDs recur)"""
+        if (result := BibleUtilities.parsed_snt_ids.get(snt_id, False)) is not False:
+            return result
+        result = m.group(1, 2, 3) if (m := BibleUtilities.snt_id_regex.search(snt_id)) else None
+        if len(BibleUtilities.parsed_snt_ids) >= 1000000:
+            BibleUtilities.parsed_snt_ids.clear()
+        BibleUtilities.parsed_snt_ids[snt_id] = result
+        return result
+
     @staticmethod
     def book(snt_id) -> str | None:
-        return m.group(1) if (m := regex.search(r'([A-Z1-3][A-Z][A-Z])\s+(\d+):(\d+[ab]?)$', snt_id)) else None
+        return parsed_snt_id[0] if (parsed_snt_id := BibleUtilities.parse_snt_id(snt_id)) else None
 
     @staticmethod
     def chapter(snt_id) -> str | None:
-        return m.group(2) if (m := regex.search(r'([A-Z1-3][A-Z][A-Z])\s+(\d+):(\d+[ab]?)$', snt_id)) else None
+        return parsed_snt_id[1] if (parsed_snt_id := BibleUtilities.parse_snt_id(snt_id)) else None
 
     @staticmethod
     def verse(snt_id) -> str | None:
-        return m.group(3) if (m := regex.search(r'([A-Z1-3][A-Z][A-Z])\s+(\d+):(\d+[ab]?)$', snt_id)) else None
+        return parsed_snt_id[2] if (parsed_snt_id := BibleUtilities.parse_snt_id(snt_id)) else None
 
     def load_bible_verse_props(self, filename: str | Path) -> int:
         """Returns True for success"""
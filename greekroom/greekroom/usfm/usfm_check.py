@@ -6,23 +6,32 @@
 
 from __future__ import annotations
 import argparse
-from collections import defaultdict
+from array import array
+from collections import defaultdict, deque
 import datetime
+import hashlib
+import itertools
 import json
 import math
+import multiprocessing
 import os
 from os import listdir
 from os.path import isfile, join
 from pathlib import Path
+import pickle
 import regex
 import sys
-from typing import List, Tuple
+import tempfile
+from typing import Iterator, List, Tuple
 from greekroom.gr_utilities import general_util
 from ualign_utilities import BibleUtilities, DocumentConfiguration, ScriptDirection, BibleRefSpan, DataManager
 import unicodedata as ud
 
 n_usfm_objects = 0
 n_toggle_indexes = 0
+worker_config = {}  # UsfmCheck configuration in worker processes, set by init_worker
+loaded_tag_data = {}  # key: data directory value: (tag_props, explanation_id_to_explanation), see load_tag_data
+render_worker_sc = None  # UsfmCheck shared with forked workers of colored_verse_stream
 
 
 def html_head(title: str, date: str, meta_title: str) -> str:
@@ -531,19 +540,154 @@ class SmartFindall:
         return result
 
 
+class LetterNgramCounter:
+    """Letter n-gram counts (n = 1 ... max_ngram_len) of weighted tokens, bordered by spaces.
+    By default, all n-grams are counted exactly in a single pass; memory is then NOT bounded, but grows with
+    the number of distinct n-grams (up to max_ngram_len times the total length of the token types).
+    With a frequency floor min_count > 1, n-grams are counted level by level (by length): an n-gram is only
+    counted if its prefix and suffix (n-1)-grams reach the floor, and n-grams below the floor are pruned
+    after each level, so all n-grams reaching the floor are still counted exactly.
+    N-grams longer than max_exact_len (if set) are not stored, but counted in a count-min sketch of fixed size
+    (sketch_depth x sketch_width counters, conservative update), which bounds memory; their counts might be
+    overestimated."""
+
+    def __init__(self, max_ngram_len: int = 14, min_count: int = 1, max_exact_len: int | None = None,
+                 sketch_width: int = 1 << 18, sketch_depth: int = 4):
+        self.max_ngram_len = max_ngram_len
+        self.min_count = max(1, min_count)
+        self.max_exact_len = max_ngram_len if max_exact_len is None else min(max_exact_len, max_ngram_len)
+        self.counts = {}  # n-grams up to max_exact_len
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.sketch = None  # count-min sketch for longer n-grams
+        self.bordered_tokens = []  # elements: (' ' + token + ' ', token count)
+        self.size = 0  # total length of bordered tokens (types)
+        self.reported = set()
+
+    def single_pass(self) -> bool:
+        return (self.min_count == 1) and (self.max_exact_len == self.max_ngram_len)
+
+    def count(self, token_counts: dict[str, int]) -> None:
+        self.bordered_tokens = [(' ' + token + ' ', count) for token, count in token_counts.items()]
+        self.size = sum(len(bordered_token) for bordered_token, _ in self.bordered_tokens)
+        if self.single_pass():
+            counts = defaultdict(int)
+            for bordered_token, count in self.bordered_tokens:
+                max_pos = len(bordered_token)
+                for start_pos in range(max_pos):
+                    for end_pos in range(start_pos + 1, min(start_pos + self.max_ngram_len, max_pos) + 1):
+                        counts[bordered_token[start_pos:end_pos]] += count
+            self.counts = counts
+            return
+        tokens = self.bordered_tokens
+        for n in range(1, self.max_ngram_len + 1):
+            tokens = [token_count for token_count in tokens if len(token_count[0]) >= n]
+            if not tokens:
+                break
+            if n > self.max_exact_len:
+                self.count_level_in_sketch(tokens, n)
+                continue
+            level_counts = defaultdict(int)
+            for bordered_token, count in tokens:
+                for start_pos in range(len(bordered_token) - n + 1):
+                    ngram = bordered_token[start_pos:start_pos + n]
+                    if (n == 1) or ((ngram[:-1] in self.counts) and (ngram[1:] in self.counts)):
+                        level_counts[ngram] += count
+            for ngram, count in level_counts.items():
+                if count >= self.min_count:
+                    self.counts[ngram] = count
+
+    def sketch_indexes(self, ngram: str) -> list[int]:
+        # double hashing: index in row r based on h1 + r * h2
+        h = hash(ngram)
+        h1, h2 = h & 0xFFFFFFFF, ((h >> 32) & 0xFFFFFFFF) | 1
+        return [row * self.sketch_width + (h1 + row * h2) % self.sketch_width for row in range(self.sketch_depth)]
+
+    def count_level_in_sketch(self, tokens: list[tuple[str, int]], n: int) -> None:
+        if self.sketch is None:
+            self.sketch = array('q', [0]) * (self.sketch_depth * self.sketch_width)
+        sketch = self.sketch
+        level_ngram_indexes = []
+        for bordered_token, count in tokens:
+            for start_pos in range(len(bordered_token) - n + 1):
+                ngram = bordered_token[start_pos:start_pos + n]
+                if (self.get(ngram[:-1]) >= self.min_count) and (self.get(ngram[1:]) >= self.min_count):
+                    level_ngram_indexes.append((self.sketch_indexes(ngram), count))
+        # update after the whole level, as queries above are for (n-1)-grams of the same sketch
+        for indexes, count in level_ngram_indexes:
+            # conservative update: raise counters only as far as needed for new estimate (min + count)
+            new_estimate = min(sketch[index] for index in indexes) + count
+            for index in indexes:
+                if sketch[index] < new_estimate:
+                    sketch[index] = new_estimate
+
+    def get(self, ngram: str, default: int = 0) -> int:
+        if len(ngram) <= self.max_exact_len:
+            return self.counts.get(ngram, default)
+        elif self.sketch is None or len(ngram) > self.max_ngram_len:
+            return default
+        else:
+            sketch = self.sketch
+            return min(sketch[index] for index in self.sketch_indexes(ngram)) or default
+
+    def __getitem__(self, ngram: str) -> int:
+        return self.get(ngram)
+
+    def ngrams(self, min_len: int = 1) -> Iterator[str]:
+        """Distinct n-grams (reaching the frequency floor) of length min_len or more, in order of first occurrence.
+        N-grams in the sketch are deduplicated only if marked as reported."""
+        if self.single_pass():
+            for ngram in self.counts.keys():
+                if len(ngram) >= min_len:
+                    yield ngram
+            return
+        seen = set()
+        for bordered_token, _ in self.bordered_tokens:
+            max_pos = len(bordered_token)
+            for start_pos in range(max_pos):
+                for end_pos in range(start_pos + min_len, min(start_pos + self.max_ngram_len, max_pos) + 1):
+                    ngram = bordered_token[start_pos:end_pos]
+                    if (ngram in seen) or (ngram in self.reported) or (self.get(ngram) < self.min_count):
+                        continue
+                    if len(ngram) <= self.max_exact_len:
+                        seen.add(ngram)
+                    yield ngram
+
+    def mark_reported(self, ngram: str) -> None:
+        if len(ngram) > self.max_exact_len:
+            self.reported.add(ngram)
+
+
 class CorpusModel:
+    # Paired delimiters (see count_paired_delimiters): opening delimiter not preceded by a word;
+    # followed by a word; closing delimiter preceded by a word (reverse match, start: letter position)
+    # and not followed by a word.
+    opening_delimiter_context_re = regex.compile(r'(?<!\pL\pM*\pP*)')
+    first_letter_after_opening_delimiter_re = regex.compile(r'\pP*\pL')
+    last_letter_before_closing_delimiter_re = regex.compile(r'(?r)\pL\pM*\pP*')
+    closing_delimiter_context_re = regex.compile(r'(?!\pP*\pL)')
+
     def __init__(self, sc: UsfmCheck | None = None):
         self.sc = sc
         self.lc_token_count = defaultdict(int)
         self.lc_pre_number_count = defaultdict(int)
         self.lc_post_number_count = defaultdict(int)
         self.matching_punct_candidates = "()[]{}«»»«‹››‹⌞⌟（）［］【】「」『』《》〈〉“”‘’„”‚’''\"\""
+        self.paired_delimiters = [(self.matching_punct_candidates[i], self.matching_punct_candidates[i+1])
+                                  for i in range(0, len(self.matching_punct_candidates) - 1, 2)]
+        self.delimiter_roles = defaultdict(list)  # key: delimiter char, value: list of (index, opens, closes)
+        for index, (left_punct, right_punct) in enumerate(self.paired_delimiters):
+            self.delimiter_roles[left_punct].append((index, True, left_punct == right_punct))
+            if right_punct != left_punct:
+                self.delimiter_roles[right_punct].append((index, False, True))
+        self.delimiter_re = regex.compile('[' + guard_regex(''.join(self.delimiter_roles)) + '\n]')
         self.num_pattern1 = r"\d+(?:[.,]\d{3})+(?!\d)"
         self.num_pattern2 = r"\d+(?:[-‑–—:.,/]\d+)+"
         self.pattern_count = defaultdict(int)
         self.paired_delimiter_count = defaultdict(int)
-        self.letter_ngram_count = defaultdict(int)
+        self.letter_ngram_counter: LetterNgramCounter | None = None
         self.letter_ngram_size = 0
+        self.letter_ngram_pmi_outliers = []  # elements: (n-gram, count, pmi_min, pmi_max, s1, count1, s2, count2)
         self.n_logs = 0
 
     @staticmethod
@@ -590,14 +734,9 @@ class CorpusModel:
                     pass
                 else:
                     self.lc_post_number_count[next_token.lower()] += 1
-        i = 0
         self.n_logs += 1
-        while i+1 <= len(self.matching_punct_candidates):
-            left_punct, right_punct = self.matching_punct_candidates[i], self.matching_punct_candidates[i+1]
-            g_left_punct, g_right_punct = guard_regex(left_punct), guard_regex(right_punct)
-            i += 2
-            re = fr'(?<!\pL\pM*\pP*){g_left_punct}\pP*\pL.*?\pL\pM*\pP*{g_right_punct}(?!\pP*\pL)'
-            self.paired_delimiter_count[(left_punct, right_punct)] += len(regex.findall(re, s))
+        for paired_delimiter, count in zip(self.paired_delimiters, self.count_paired_delimiters(s)):
+            self.paired_delimiter_count[paired_delimiter] += count
         num1_list = regex.findall(self.num_pattern1, s)
         num2_list = regex.findall(self.num_pattern2, s)
         for num2 in num2_list:
@@ -609,6 +748,47 @@ class CorpusModel:
                 p = regex.sub(r'DDD', 'Number3', p)
                 self.pattern_count[p] += 1
 
+    def count_paired_delimiters(self, s: str) -> list[int]:
+        """For each paired delimiter, counts the non-overlapping (leftmost, shortest) single-line spans
+        left ... right that start and end with a word, i.e. matches of
+        (?<!\\pL\\pM*\\pP*)left\\pP*\\pL.*?\\pL\\pM*\\pP*right(?!\\pP*\\pL)
+        All paired delimiters are counted in a single scan over the delimiters in s."""
+        counts = [0] * len(self.paired_delimiters)
+        open_spans = {}  # key: index of paired delimiter; value: position of first letter after opening delimiter
+        for m in self.delimiter_re.finditer(s):
+            c, position = m.group(), m.start()
+            if c == '\n':
+                open_spans.clear()
+                continue
+            for index, opens, closes in self.delimiter_roles[c]:
+                if (first_letter_position := open_spans.get(index)) is not None:
+                    if (closes
+                            and (m2 := self.last_letter_before_closing_delimiter_re.match(s, 0, position))
+                            and (m2.start() > first_letter_position)
+                            and self.closing_delimiter_context_re.match(s, position + 1)):
+                        counts[index] += 1
+                        del open_spans[index]
+                elif (opens
+                      and self.opening_delimiter_context_re.match(s, position)
+                      and (m2 := self.first_letter_after_opening_delimiter_re.match(s, position + 1))):
+                    open_spans[index] = m2.end() - 1
+        return counts
+
+    count_attributes = ('lc_token_count', 'lc_pre_number_count', 'lc_post_number_count', 'pattern_count',
+                        'paired_delimiter_count')
+
+    def partial_state(self) -> dict:
+        d = {attribute: getattr(self, attribute) for attribute in self.count_attributes}
+        d['n_logs'] = self.n_logs
+        return d
+
+    def merge_partial_state(self, d: dict) -> None:
+        for attribute in self.count_attributes:
+            counts = getattr(self, attribute)
+            for key, count in d[attribute].items():
+                counts[key] += count
+        self.n_logs += d['n_logs']
+
     def stats(self) -> dict:
         d = {'pre-number-token': {}, 'post-number-token': {}}
         for token in self.lc_pre_number_count.keys():
@@ -623,28 +803,26 @@ class CorpusModel:
                 d['post-number-token'][token] = (post_number_token_count, token_count)
         return d
 
-    def letter_ngram_stats(self):
-        for lc_token in self.lc_token_count.keys():
-            lc_token_count = self.lc_token_count[lc_token]
-            bordered_token = ' ' + lc_token + ' '
-            self.letter_ngram_size += len(bordered_token)
-            max_pos = len(bordered_token)
-            for start_pos in range(max_pos):
-                for end_pos in range(start_pos + 1, min(start_pos + 15, max_pos + 1)):
-                    sub_s = bordered_token[start_pos:end_pos]
-                    self.letter_ngram_count[sub_s] += lc_token_count
-        hapaxes = []
-        for sub_token in self.letter_ngram_count.keys():
-            sub_token_len = len(sub_token)
-            sub_token_count = self.letter_ngram_count[sub_token]
-            if sub_token_count == 1 and sub_token_len <= 4 and regex.match(r'\pL+$', sub_token):
-                hapaxes.append(sub_token)
+    def letter_ngram_stats(self, min_count: int = 1, max_exact_len: int | None = None) -> None:
+        """Reports letter n-grams (length 7+) with low PMI for all splits into two parts.
+        min_count: frequency floor for n-grams; max_exact_len: longer n-grams are counted in a count-min sketch.
+        With the defaults, all n-grams are counted exactly, in memory that is not bounded (see LetterNgramCounter)."""
+        self.letter_ngram_counter = LetterNgramCounter(min_count=min_count, max_exact_len=max_exact_len)
+        self.letter_ngram_counter.count(self.lc_token_count)
+        self.letter_ngram_size = self.letter_ngram_counter.size
+        self.letter_ngram_pmi_outliers = []
+        # Plain dict lookup (fast) unless counter has a count-min sketch.
+        # Sub-n-grams of a counted n-gram are counted, as they are at least as frequent.
+        ngram_count = self.letter_ngram_counter.counts if self.letter_ngram_counter.sketch is None \
+            else self.letter_ngram_counter
+        for sub_token in self.letter_ngram_counter.ngrams(min_len=7):
+            sub_token_count = ngram_count[sub_token]
             pmi_min, pmi_max = 99, -99
             best_s1, best_s2 = None, None
-            for mid in range(1, sub_token_len):
+            for mid in range(1, len(sub_token)):
                 s1, s2 = sub_token[:mid], sub_token[mid:]
-                pmi1 = pmi(self.letter_ngram_count[s1],
-                           self.letter_ngram_count[s2],
+                pmi1 = pmi(ngram_count[s1],
+                           ngram_count[s2],
                            sub_token_count,
                            self.letter_ngram_size,
                            smoothing=0.3)
@@ -653,17 +831,14 @@ class CorpusModel:
                     best_s1, best_s2 = s1, s2
                 if pmi1 < pmi_min:
                     pmi_min = pmi1
-            if sub_token_len > 6 and pmi_max < -2.5:
-                count1 = self.letter_ngram_count[best_s1]
-                count2 = self.letter_ngram_count[best_s2]
-                sys.stderr.write(f"{sub_token} {self.letter_ngram_count[sub_token]} {pmi_min}:{pmi_max}"
+            if pmi_max < -2.5:
+                count1 = ngram_count[best_s1]
+                count2 = ngram_count[best_s2]
+                self.letter_ngram_counter.mark_reported(sub_token)
+                self.letter_ngram_pmi_outliers.append((sub_token, sub_token_count, pmi_min, pmi_max,
+                                                       best_s1, count1, best_s2, count2))
+                sys.stderr.write(f"{sub_token} {sub_token_count} {pmi_min}:{pmi_max}"
                                  f" {best_s1} ({count1}) {best_s2} ({count2})\n")
-        """
-        for hapax in sorted(hapaxes, key=lambda x: (len(x), x)):
-            sys.stderr.write(f"{hapax} ")
-        sys.stderr.write("\n")
-        """
-        # PMI
 
     def report_stats(self, filename: str | Path | None):
         sc = self.sc
@@ -779,6 +954,31 @@ class BibleTextExtracts:
             result += json.dumps(extract) + "\n"
         return result
 
+    @classmethod
+    def from_dict(cls, d: dict) -> BibleTextExtracts:
+        """Inverse of vars(bte); partial states store plain dicts, independent of module name."""
+        bte = cls((d['book_id'], d['chapter_number'], d['verse_number']))
+        bte.__dict__.update(d)
+        return bte
+
+    def merge(self, other: BibleTextExtracts) -> None:
+        """Appends the extracts of another BibleTextExtracts with the same key (from another file)."""
+        if other.verse_text and other.verse_text.get('txt'):
+            if self.verse_text and self.verse_text.get('txt'):
+                if self.verse_text['txt'][-1] not in " \n":
+                    self.verse_text['txt'] += ' '
+                self.verse_text['txt'] += other.verse_text['txt']
+            else:
+                self.verse_text = other.verse_text
+        for footnote in other.footnotes:
+            footnote["f#"] = len(self.footnotes) + 1
+            self.footnotes.append(footnote)
+        for figure in other.figures:
+            figure["fig#"] = len(self.figures) + 1
+            self.figures.append(figure)
+        self.titles.extend(other.titles)
+        self.misc_texts.extend(other.misc_texts)
+
     @staticmethod
     def update_line_info(so: UsfmObject, verse_text_d: dict) -> None:
         if ((old_l := verse_text_d.get('l'))
@@ -1047,12 +1247,145 @@ class BibleTextExtracts:
         return None
 
 
+class BibleTextExtractSpool:
+    """Bible text extracts of the files read so far, as one segment per file, spooled to a temporary file,
+    so that memory use does not grow with the number of files. Extracts with the same key in several files
+    (e.g. a book split across files) are merged when read back, in order of first occurrence."""
+    def __init__(self):
+        self.f = None
+        self.segment_offsets = []
+        self.key_count = defaultdict(int)  # key: (book_id, chapter_number, verse_number) value: number of segments
+
+    def __len__(self) -> int:
+        return len(self.key_count)
+
+    def add_segment(self, extracts: list[tuple[tuple, dict]]) -> None:
+        """extracts elements: (key, vars(bte))"""
+        if not extracts:
+            return
+        if self.f is None:
+            self.f = tempfile.TemporaryFile()
+        self.segment_offsets.append(self.f.seek(0, os.SEEK_END))
+        pickle.dump(extracts, self.f, protocol=pickle.HIGHEST_PROTOCOL)
+        for key, _ in extracts:
+            self.key_count[key] += 1
+
+    def segments(self) -> Iterator[list[tuple[tuple, dict]]]:
+        for offset in self.segment_offsets:
+            self.f.seek(offset)
+            yield pickle.load(self.f)
+
+    def __iter__(self) -> Iterator[BibleTextExtracts]:
+        shared_btes = {}  # extracts with keys in several segments, merged across segments
+        if any(count > 1 for count in self.key_count.values()):
+            for segment in self.segments():
+                for key, bte_d in segment:
+                    if self.key_count[key] > 1:
+                        bte = BibleTextExtracts.from_dict(bte_d)
+                        if merged_bte := shared_btes.get(key):
+                            merged_bte.merge(bte)
+                        else:
+                            shared_btes[key] = bte
+        for segment in self.segments():
+            for key, bte_d in segment:
+                if self.key_count[key] == 1:
+                    yield BibleTextExtracts.from_dict(bte_d)
+                elif bte := shared_btes.pop(key, None):
+                    yield bte
+
+    def close(self) -> None:
+        if self.f:
+            self.f.close()
+            self.f = None
+
+
+class VerseTextIndex:
+    """Index of a verse text for footnote quote lookup (UsfmCheck.find_quote_in_verse_text):
+    normalized text (case-folded, whitespace groups reduced to a single space) with offsets of normalized
+    characters into the verse text. Quotes (including ellipses) are located by string search in the normalized
+    text, with the same result as a case-insensitive search with the quote's UsfmCheck.regex_form.
+    The normalized text is built on first use, as most quotes are found in the lower-case verse text."""
+
+    whitespace_re = regex.compile(r'\s+')
+    ellipsis_re = regex.compile(r'(?:\.{3,}|…)')
+
+    def __init__(self, verse_text: str):
+        self.verse_text = verse_text
+        self.lower_verse_text = verse_text.lower()
+        self.normalized_text = None
+        self.offsets = None  # offsets[i]: position in verse_text of normalized character i
+        self.foldable = True
+
+    @classmethod
+    def normalize(cls, s: str) -> str | None:
+        """Case-folded s with whitespace groups reduced to a single space.
+        Returns None if s contains characters that case-insensitive regex matching folds differently, i.e. with
+        multi-character case folding (e.g. ß, İ) or Turkic dotless ı (matching I)."""
+        folded_s = s.casefold()
+        if (len(folded_s) != len(s)) or ('ı' in s):
+            return None
+        return cls.whitespace_re.sub(' ', folded_s)
+
+    def build(self) -> None:
+        verse_text = self.verse_text
+        if (normalized_text := self.normalize(verse_text)) is None:
+            self.foldable = False
+            return
+        self.offsets = array('l')
+        position = 0
+        for m in self.whitespace_re.finditer(verse_text):
+            self.offsets.extend(range(position, m.start() + 1))
+            position = m.end()
+        self.offsets.extend(range(position, len(verse_text) + 1))
+        self.normalized_text = normalized_text
+
+    def quote_segments(self, quote: str) -> list[str] | None:
+        """Normalized parts of quote between ellipses, or None if the quote is outside the scope of the index,
+        i.e. with a line break, a character that can't be folded, or a whitespace-only part between ellipses."""
+        if self.foldable and (self.normalized_text is None):
+            self.build()
+        if (not self.foldable) or ('\n' in quote):
+            return None
+        segments = [self.normalize(segment) for segment in self.ellipsis_re.split(quote)]
+        if (None in segments) or ((len(segments) > 1) and (' ' in segments)):
+            return None
+        return segments
+
+    def find(self, quote: str) -> str | None:
+        """Like a search with regex_form(quote): leftmost match, with ellipses matching as much as possible."""
+        segments = self.quote_segments(quote)
+        if segments is None:
+            if m := regex.search(UsfmCheck.regex_form(quote), self.verse_text,
+                                 flags=regex.IGNORECASE | regex.DOTALL):
+                return m[0]
+            return None
+        text = self.normalized_text
+        if (start := text.find(segments[0])) < 0:
+            return None
+        end = start + len(segments[0])
+        after_space = segments[0].endswith(' ')
+        last_index = len(segments) - 1
+        for index, segment in enumerate(segments[1:], 1):
+            # Earliest position for middle parts, latest for the last part (as in greedy regex matching of ellipses)
+            find = text.rfind if index == last_index else text.find
+            if after_space and segment.startswith(' '):
+                # Whitespace before and after ellipses may match the same whitespace group of at least 2 characters.
+                position = find(segment, end - 1)
+                if (position == end - 1) and (self.offsets[end] - self.offsets[end - 1] < 2):
+                    position = find(segment, end)
+            else:
+                position = find(segment, end)
+            if position < 0:
+                return None
+            end = position + len(segment)
+            if segment:
+                after_space = segment.endswith(' ')
+        return self.verse_text[self.offsets[start]:self.offsets[end]]
+
 class LineStruct:
     def __init__(self, s: str,
                  line: int | None = None,       # starting with 1
                  filename: str | None = None,
-                 prev_ls: LineStruct | None = None,
-                 next_ls: LineStruct | None = None,
                  from_line_number: int | None = None,
                  to_line_number: int | None = None,
                  from_col: int | None = None,   # starting with 1
@@ -1063,8 +1396,6 @@ class LineStruct:
         self.repaired_s = None
         self.filename = filename
         self.line_number = line
-        self.prev_ls = prev_ls
-        self.next_ls = next_ls
         self.from_line_number = from_line_number
         self.to_line_number = to_line_number
         self.from_col = from_col
@@ -1075,6 +1406,18 @@ class LineStruct:
         self.book_id = None
         self.chapter = None
         self.verse = None
+        self.fls_lines = None  # array of lines (FileLineStruct.lines) that includes this line
+        self.index = None      # index in self.fls_lines
+
+    @property
+    def prev_ls(self) -> LineStruct | None:
+        return self.fls_lines[self.index - 1] if self.index else None
+
+    @property
+    def next_ls(self) -> LineStruct | None:
+        if (self.fls_lines is not None) and (self.index + 1 < len(self.fls_lines)):
+            return self.fls_lines[self.index + 1]
+        return None
 
     def file_loc(self, revised_line_number_p: bool = False) -> tuple[str, str, str]:
         # returns primary surf location (e.g. book/chapter/verse), secondary surf location (e.g. filename/line_number)
@@ -1121,14 +1464,21 @@ class LineStruct:
 
 
 class FileLineStruct:
+    """Lines of a USFM file, read in a single pass into an array of LineStructs (self.lines), in which
+    continuation lines of \\v, \\q etc. are combined (see expand_usfm_verse) and lines are split before
+    chapter and verse tags (if not at the beginning of the line), so that each line starts with at most one of them.
+    Neighbors are accessed by index (LineStruct.prev_ls, LineStruct.next_ls)."""
+    anchor_tag_regex = regex.compile(r'\s*\\(?:v|q\d?|qm\d?|qc|qr|ip|periph|rem)\b')
+    tag_regex = regex.compile(r'\\([a-z]+\d?)')
+    chapter_verse_tag_regex = regex.compile(r'\\([cv])\b')
+    non_space_regex = regex.compile(r'\S')
+
     def __init__(self,
                  filename: str | Path | None = None,       # preferred arg
                  lines: list[str] | None = None,           # alternative arg
                  sc: UsfmCheck | None = None):
-        self.line_structs = {}  # key: line_number, value: LineStruct
-        self.first_ls = None
-        self.last_ls = None
-        self.current_ls = None
+        self.raw_lines = []           # one LineStruct per line in file
+        self.lines = []               # LineStructs after combining and splitting lines
         self.carriage_returns = []    # line numbers with \r
         self.only_linefeeds = []      # line numbers with \n but without carriage_return \r
         self.n_linefeeds = 0          # number of lines with linefeed \n
@@ -1136,23 +1486,23 @@ class FileLineStruct:
         self.filename = filename
         if filename and not lines:
             with open(filename, 'r', newline='') as f:
-                # lines = f.read().rstrip('\n').split('\n')
                 lines = f.readlines()
-                for i, line in enumerate(lines, 1):
-                    if line.endswith('\r\n'):
-                        self.carriage_returns.append(i)
-                        self.n_linefeeds += 1
-                    elif line.endswith('\n'):
-                        self.only_linefeeds.append(i)
-                        self.n_linefeeds += 1
-                    ls = LineStruct(line, line=i, from_line_number=i, to_line_number=i, from_col=1, to_col=len(line),
-                                    filename=os.path.basename(self.filename))
-                    self.line_structs[i] = ls
-                    if prev_ls := self.line_structs.get(i-1):
-                        prev_ls.next_ls = ls
-                        ls.prev_ls = prev_ls
-                self.first_ls = self.line_structs[1]
-                self.last_ls = self.line_structs[len(lines)]
+        if lines:
+            basename = os.path.basename(filename) if filename else None
+            for i, line in enumerate(lines, 1):
+                if line.endswith('\r\n'):
+                    self.carriage_returns.append(i)
+                    self.n_linefeeds += 1
+                elif line.endswith('\n'):
+                    self.only_linefeeds.append(i)
+                    self.n_linefeeds += 1
+                self.raw_lines.append(LineStruct(line, line=i, from_line_number=i, to_line_number=i, from_col=1,
+                                                 to_col=len(line), filename=basename))
+            if sc:
+                self.scan(sc)
+            else:
+                for ls in self.raw_lines:
+                    self.add_line(ls)
         n_carriage_returns = len(self.carriage_returns)
         n_only_linefeeds = len(self.only_linefeeds)
         if n_carriage_returns > 0 and n_carriage_returns == self.n_linefeeds:
@@ -1183,37 +1533,43 @@ class FileLineStruct:
             # sys.stderr.write(f"EOL for {filename}: \\r: {n_carriage_returns} \\n: {self.n_linefeeds}\n")
             sc.record_error(error_cat, error_location, error_context)
 
-    def combine_lines(self, lss: list[LineStruct]) -> LineStruct:
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __iter__(self) -> Iterator[LineStruct]:
+        return iter(self.lines)
+
+    def add_line(self, ls: LineStruct) -> None:
+        ls.fls_lines, ls.index = self.lines, len(self.lines)
+        self.lines.append(ls)
+
+    def replace_last_line(self, ls: LineStruct) -> None:
+        ls.fls_lines, ls.index = self.lines, len(self.lines) - 1
+        self.lines[-1] = ls
+
+    @staticmethod
+    def combine_lines(lss: list[LineStruct]) -> LineStruct:
         comb_ls = LineStruct(''.join(map(lambda x: x.s, lss)),
                              filename=lss[0].filename,
                              from_line_number=lss[0].from_line_number,
                              to_line_number=lss[-1].to_line_number,
                              from_col=lss[0].from_col,
                              to_col=lss[-1].to_col,
-                             prev_ls=lss[0].prev_ls,
-                             next_ls=lss[-1].next_ls,
                              original_lines=lss)
-        if prev_ls := lss[0].prev_ls:
-            prev_ls.next_ls = comb_ls
-        else:
-            self.first_ls = comb_ls
-        if next_ls := lss[-1].next_ls:
-            next_ls.prev_ls = comb_ls
-        else:
-            self.last_ls = comb_ls
         for orig_ls in lss:
             orig_ls.revised_lines.append(comb_ls)
         return comb_ls
 
-    def split_line(self, ls: LineStruct, s_fragments: list[str], _sc: UsfmCheck) -> List[LineStruct]:
+    @staticmethod
+    def split_line(ls: LineStruct, s_fragments: list[str]) -> List[LineStruct]:
         """Splits line and returns list of new split LineStruct"""
         current_from_line_number = ls.from_line_number
         current_from_col = ls.from_col
         new_lss = []
         for s_fragment in s_fragments:
             n_newlines = s_fragment.count('\n')
-            s_after_last_newline = regex.sub(r'.*\n', '', s_fragment)
-            to_col = len(s_after_last_newline) if n_newlines else current_from_col + len(s_fragment) - 1
+            to_col = len(s_fragment) - s_fragment.rfind('\n') - 1 if n_newlines \
+                else current_from_col + len(s_fragment) - 1
             new_ls = LineStruct(s_fragment,
                                 filename=ls.filename,
                                 from_line_number=current_from_line_number,
@@ -1221,99 +1577,95 @@ class FileLineStruct:
                                 from_col=current_from_col,
                                 to_col=to_col,
                                 original_lines=[ls])
-            if new_lss:
-                new_ls.prev_ls = new_lss[-1]
-                new_lss[-1].next_ls = new_ls
             new_lss.append(new_ls)
             current_from_line_number = new_ls.to_line_number
             current_from_col = new_ls.to_col + 1
         ls.revised_lines = new_lss
-        prev_ls = ls.prev_ls
-        new_lss[0].prev_ls = prev_ls
-        if prev_ls:
-            prev_ls.next_ls = new_lss[0]
-        else:
-            self.first_ls = new_lss[0]
-        next_ls = ls.next_ls
-        new_lss[-1].next_ls = next_ls
-        if next_ls:
-            next_ls.prev_ls = new_lss[-1]
-        else:
-            self.last_ls = new_lss[-1]
         return new_lss
 
-    def split_usfm_chapters_and_verses(self, sc: UsfmCheck) -> None:
-        next_ls = self.first_ls
-        while current_ls := next_ls:
-            next_ls = current_ls.next_ls
-            if m := regex.match(r'(.*?)(\\[cv]\b.*)', current_ls.s, regex.DOTALL):
-                s_fragment, rest = m.group(1, 2)
-                if regex.search(r'\S', m.group(1)):
-                    prev_ls = current_ls.prev_ls
-                    # sys.stderr.write(f"  ** GHJ1 {prev_ls.s} + {current_ls.s}\n")
-                    split_lines = self.split_line(current_ls, [s_fragment, rest], sc)
-                    if prev_ls:
-                        _combined_line = self.combine_lines([prev_ls, split_lines[0]])
-                        # sys.stderr.write(f"  ** GHJ2 {_combined_line.s} + {split_lines[1].s}\n")
-                    else:
-                        sc.n_operations_in_split_usfm_chapters_and_verses += 1
-                        # sys.stderr.write(f"  ** GHJ3 {split_lines[0].s} + {split_lines[1].s}\n")
-            if regex.search(r'\\[cv]\b.*\\[cv]\b', current_ls.s, regex.DOTALL):
-                error_location = f"{os.path.basename(sc.current_filename)} l.{current_ls.from_line_number}"
-                error_location = sc.add_versification(error_location, ignore_chapter=True)
-                for core_tag in ('c', 'v'):
-                    if regex.search(fr'\\{core_tag}\b.*\\{core_tag}\b', current_ls.s, regex.DOTALL):
-                        error_cat = ('Auto-repairable errors',
-                                     'Unexpected multiple instances of the same tag in same line', f'\\{core_tag}')
-                        sc.record_error(error_cat, error_location, current_ls.s)
-                if regex.search(r'\\c\b', current_ls.s) and regex.search(r'\\v\b', current_ls.s,
-                                                                         regex.DOTALL):
-                    error_cat = ('Auto-repairable errors',
-                                 'Unexpected occurrence of both chapter and verse tags on the same line')
-                    sc.record_error(error_cat, error_location, current_ls.s)
-                s_fragments = []
-                rest = current_ls.s
-                while m := regex.match(r'(.*?\S.*?)(\\[cv]\b.*)', rest, regex.DOTALL):
-                    s_fragment, rest = m.group(1, 2)
-                    s_fragments.append(s_fragment)
-                s_fragments.append(rest)
-                if len(s_fragments) > 1:
-                    self.split_line(current_ls, s_fragments, sc)
-                    sc.n_operations_in_split_usfm_chapters_and_verses += 1
-                    sc.n_additional_lines_in_split_usfm_chapters_and_verses += len(s_fragments) - 1
-                    # sys.stderr.write(f"SPLIT {self.filename} {current_ls.from_line_number} {repr(s_fragments)}\n")
-
-    @staticmethod
-    def expand_usfm_verse(anchor_ls: LineStruct, next_ls: LineStruct, sc: UsfmCheck) -> bool:
+    @classmethod
+    def expand_usfm_verse(cls, anchor_ls: LineStruct, next_ls: LineStruct, sc: UsfmCheck) -> bool:
         # Determines whether next_ls should be combined with anchor_ls as a continuation of \v, \q etc.
         if next_ls.from_line_number - anchor_ls.from_line_number >= 20:
             return False
-        for tag in regex.findall(r'\\([a-z]+\d?)', next_ls.s):   # \f, \x etc. ok, but not \id, \c, \v
-            if sc.tag_props.get(('paragraph-format', sc.core_tag(tag)[0])):
+        for tag in cls.tag_regex.findall(next_ls.s):   # \f, \x etc. ok, but not \id, \c, \v
+            core_tag = sc.core_tag(tag)[0]
+            if sc.tag_props.get(('paragraph-format', core_tag)):
                 pass
-            elif sc.tag_props.get(('table-content', sc.core_tag(tag)[0])):
+            elif sc.tag_props.get(('table-content', core_tag)):
                 pass
-            elif sc.tag_props.get(('one-liner', sc.core_tag(tag)[0])):
+            elif sc.tag_props.get(('one-liner', core_tag)):
                 return False
         return True
 
-    def expand_usfm_verses(self, sc: UsfmCheck) -> None:
-        # Combines lines anchor_ls \v, \q etc. with any continuation line (non-one-liners, e.g. plain text)
-        current_ls = self.first_ls
-        while current_ls:
-            expanded_lss = [current_ls]
-            if regex.match(r'\s*\\(?:v|q\d?|qm\d?|qc|qr|ip|periph|rem)\b', current_ls.s):
-                while next_ls := current_ls.next_ls:
-                    if self.expand_usfm_verse(expanded_lss[0], next_ls, sc):
-                        expanded_lss.append(next_ls)
-                        current_ls = next_ls
-                    else:
-                        break
-                if len(expanded_lss) > 1:
-                    self.combine_lines(expanded_lss)
-                    sc.n_operations_in_expand_usfm_verses += 1
-                    sc.n_fewer_lines_in_expand_usfm_verses += len(expanded_lss) - 1
-            current_ls = expanded_lss[-1].next_ls
+    def scan(self, sc: UsfmCheck) -> None:
+        """Single pass over self.raw_lines, building self.lines."""
+        raw_lines = self.raw_lines
+        n_raw_lines = len(raw_lines)
+        i = 0
+        while i < n_raw_lines:
+            # Combines lines anchor_ls \v, \q etc. with any continuation line (non-one-liners, e.g. plain text)
+            anchor_ls = raw_lines[i]
+            j = i + 1
+            if self.anchor_tag_regex.match(anchor_ls.s):
+                while (j < n_raw_lines) and self.expand_usfm_verse(anchor_ls, raw_lines[j], sc):
+                    j += 1
+            if j - i > 1:
+                ls = self.combine_lines(raw_lines[i:j])
+                sc.n_operations_in_expand_usfm_verses += 1
+                sc.n_fewer_lines_in_expand_usfm_verses += j - i - 1
+            else:
+                ls = anchor_ls
+            i = j
+            self.split_chapters_and_verses(ls, sc)
+
+    def split_chapters_and_verses(self, ls: LineStruct, sc: UsfmCheck) -> None:
+        """Adds ls to self.lines, split before any chapter or verse tag preceded by other material on the line.
+        Material before the first chapter or verse tag is appended to the previous line (if any)."""
+        s = ls.s
+        cv_matches = list(self.chapter_verse_tag_regex.finditer(s))
+        if not cv_matches:
+            self.add_line(ls)
+            return
+        positions = [m.start() for m in cv_matches]
+        first_non_space_position = self.non_space_regex.search(s).start()
+        if len(cv_matches) >= 2:
+            error_location = f"{os.path.basename(sc.current_filename)} l.{ls.from_line_number}"
+            error_location = sc.add_versification(error_location, ignore_chapter=True)
+            core_tags = [m.group(1) for m in cv_matches]
+            for core_tag in ('c', 'v'):
+                if core_tags.count(core_tag) >= 2:
+                    error_cat = ('Auto-repairable errors',
+                                 'Unexpected multiple instances of the same tag in same line', f'\\{core_tag}')
+                    sc.record_error(error_cat, error_location, s)
+            if ('c' in core_tags) and ('v' in core_tags):
+                error_cat = ('Auto-repairable errors',
+                             'Unexpected occurrence of both chapter and verse tags on the same line')
+                sc.record_error(error_cat, error_location, s)
+        # split before any chapter/verse tag that is preceded by non-space material
+        split_indexes = [k for k, position in enumerate(positions) if position > first_non_space_position]
+        if not split_indexes:
+            self.add_line(ls)
+            return
+        if len(cv_matches) >= 2:
+            sc.n_operations_in_split_usfm_chapters_and_verses += 1
+            sc.n_additional_lines_in_split_usfm_chapters_and_verses += len(split_indexes)
+        if (split_indexes[0] == 0) and self.lines:
+            # material before first chapter/verse tag is appended to previous line
+            prefix_ls, ls = self.split_line(ls, [s[:positions[0]], s[positions[0]:]])
+            self.replace_last_line(self.combine_lines([self.lines[-1], prefix_ls]))
+            split_indexes.pop(0)
+            if not split_indexes:
+                self.add_line(ls)
+                return
+            s, offset = ls.s, positions[0]
+        else:
+            offset = 0
+            if split_indexes[0] == 0:
+                sc.n_operations_in_split_usfm_chapters_and_verses += 1
+        boundaries = [0] + [positions[k] - offset for k in split_indexes] + [len(s)]
+        for split_ls in self.split_line(ls, [s[start:end] for start, end in zip(boundaries, boundaries[1:])]):
+            self.add_line(split_ls)
 
 
 class UsfmObject:
@@ -1324,7 +1676,8 @@ class UsfmObject:
         self.open_elements = []
         self.open_tags = []
         self.s = s                             # full string, can include newline characters
-        self.rest = s                          # still to be processed
+        self.len_s = len(s)
+        self.pos = 0                           # position in self.s; self.s[self.pos:] still to be processed
         self.current_filename = filename
         self.current_line_number = start_line_number  # starting at 1
         self.current_column = start_column     # starting at 1
@@ -1373,22 +1726,26 @@ class UsfmObject:
     def current_position(self) -> tuple[int, int]:
         return self.current_line_number, self.current_column
 
+    tag_regex = regex.compile(r'(.*?)(\\\+?[a-z]+[0-9]*[ \*]?)', flags=regex.IGNORECASE | regex.DOTALL)
+
     def process_usfm_elements(self):
-        while self.rest:
-            if m3 := regex.match(r'(.*?)(\\\+?[a-z]+[0-9]*[ \*]?)(.*)$', self.rest,
-                                 flags=regex.IGNORECASE | regex.DOTALL):
-                pre, tag, rest = m3.group(1, 2, 3)
+        # Scans self.s with a cursor (self.pos), as opposed to repeatedly slicing off the rest of the string,
+        # which would be quadratic for long lines.
+        while self.pos < self.len_s:
+            if m3 := self.tag_regex.match(self.s, self.pos):
+                pre, tag = m3.group(1, 2)
                 if pre != '':
                     self.elements.append(pre)
                     self.update_current_position(pre)
                 if tag.endswith('*'):
-                    UsfmElement(self)
+                    UsfmElement.parse(self)
                     self.update_current_position(tag)
                 else:
-                    UsfmElement(self)
-            elif self.rest != '':
-                self.elements.append(self.rest)
-                self.update_current_position(self.rest)
+                    UsfmElement.parse(self)
+            else:
+                rest = self.s[self.pos:]
+                self.elements.append(rest)
+                self.update_current_position(rest)
 
     def update_current_position(self, s: str):
         if n_newlines := s.count('\n'):
@@ -1396,7 +1753,7 @@ class UsfmObject:
             self.current_column = len(s.replace(r'.*\n', '')) + 1
         else:
             self.current_column += + len(s)
-        self.rest = self.rest[len(s):]
+        self.pos = min(self.pos + len(s), self.len_s)
 
     def pop_last_stack_element(self) -> UsfmElement | None:
         if self.open_elements:
@@ -1502,7 +1859,18 @@ class UsfmObject:
 
 
 class UsfmElement:
+    open_tag_regex = regex.compile(r'(\\\+?[a-z]+(?![a-z\*])[0-9]*(?![0-9\*])(?: |\r\n|\n)?)',
+                                   flags=regex.IGNORECASE | regex.DOTALL)
+    close_tag_regex = regex.compile(r'(\\\+?[a-z]+[0-9]*\*)', flags=regex.DOTALL)
+    verse_arg_regex = regex.compile(r'(\s*\d+(?:[ab](?=\s)|)\u200F?(?:[-,]\d+(?:[ab](?=\s)|))*\s*)')
+    chapter_arg_regex = regex.compile(r'(\s*[0-9]+\s*)')
+    footnote_arg_regex = regex.compile(r'(\s*(?:\+|-|[a-zA-Z0-9]+)\s*)')
+    attribute_arg_regex = regex.compile(r'([^\\\|]*)(\|[^\\]*)\\')
+    sub_element_tag_regex = regex.compile(r'(.*?)(\\\+?[a-z]+[0-9]*(?: |\*|))', flags=regex.IGNORECASE | regex.DOTALL)
+
     def __init__(self, so: UsfmObject):
+        """Builds element from the open or close tag (and any args) at current position of so.
+        Sub-elements are processed by UsfmElement.parse."""
         global n_usfm_objects
         n_usfm_objects += 1
         self.id = f"i{n_usfm_objects}"
@@ -1522,9 +1890,9 @@ class UsfmElement:
         sc = so.sc
         versification = sc.versification()
         # open tag
-        if m2 := regex.match(r'(\\\+?[a-z]+(?![a-z\*])[0-9]*(?![0-9\*])(?: |\r\n|\n)?)(.*)$', so.rest,
-                             flags=regex.IGNORECASE | regex.DOTALL):
-            tag, rest = m2.group(1, 2)
+        if m2 := self.open_tag_regex.match(so.s, so.pos):
+            tag = m2.group(1)
+            rest_pos = m2.end()
             self.tag, registered_p, missing_space, missing_1_p, missing_backslash, plus_p, close_p = sc.core_tag(tag)
             self.open_tag = tag.rstrip()
             tag_is_immediately_self_closing = sc.tag_props.get(('immediately-self-closing', self.tag))
@@ -1535,11 +1903,11 @@ class UsfmElement:
                 self.attributes['newline-after-tag'] = '\n'
             if missing_space:
                 self.attributes['missing-space-after-tag'] = True
-                if rest and sc.tag_is_registered(self.tag):
+                if rest_pos < so.len_s and sc.tag_is_registered(self.tag):
                     error_cat = ('Auto-repairable errors', 'Open tag', 'Missing space after open tag', self.open_tag)
                     error_context = sc.current_line
                     error_context += (f"  [Note: {self.open_tag} is followed by "
-                                      f"{print_char_unicode_name(rest[0])}]")
+                                      f"{print_char_unicode_name(so.s[rest_pos])}]")
                     sc.record_error(error_cat, versification, error_context)
             if (sc.current_line
                     and sc.tag_props.get(('one-liner', self.tag))
@@ -1551,7 +1919,7 @@ class UsfmElement:
                 if len(tags) >= 2:
                     error_cat = ('Errors', 'Unexpected multiple instances of the same tag in same line',
                                  '\\' + self.tag)
-                    if versification not in sc.error_locations[error_cat]:
+                    if not sc.errors.has_location(error_cat, versification):
                         for _ in tags:
                             sc.record_error(error_cat, versification, sc.current_line)
                 if not tag_at_start_of_line_p:
@@ -1596,19 +1964,19 @@ class UsfmElement:
             so.sc.record_tag(self.tag, open_tag=self.open_tag)
             # Check for any args (e.g. \v number, \c number, \f +, \w content|attributes\w* etc.)
             if self.tag == 'v':
-                if m := regex.match(r'(\s*\d+(?:[ab](?=\s)|)\u200F?(?:[-,]\d+(?:[ab](?=\s)|))*\s*)', so.rest):
+                if m := self.verse_arg_regex.match(so.s, so.pos):
                     self.left_arg_s = m.group(1)
                     so.update_current_position(self.left_arg_s)
             elif self.tag == 'c':
-                if m := regex.match(r'(\s*[0-9]+\s*)', so.rest):
+                if m := self.chapter_arg_regex.match(so.s, so.pos):
                     self.left_arg_s = m.group(1)
                     so.update_current_position(self.left_arg_s)
             elif self.tag in ('f', 'ef', 'fe'):
-                if m := regex.match(r'(\s*(?:\+|-|[a-zA-Z0-9]+)\s*)', so.rest):
+                if m := self.footnote_arg_regex.match(so.s, so.pos):
                     self.left_arg_s = m.group(1)
                     so.update_current_position(self.left_arg_s)
             elif sc.tag_props.get(('can-have-attributes', self.tag)):  # e.g. \w word|attributes\w*
-                if m := regex.match(r'([^\\\|]*)(\|[^\\]*)\\', so.rest):
+                if m := self.attribute_arg_regex.match(so.s, so.pos):
                     arg_s = m.group(1)
                     so.attach_element(arg_s)
                     self.right_arg_s = m.group(2)
@@ -1632,8 +2000,8 @@ class UsfmElement:
                                 if i < len(fig_args) and fig_args[i]:
                                     self.attributes[fig_attribute] = fig_args[i]
         # close tag
-        elif m2 := regex.match(r'(\\\+?[a-z]+[0-9]*\*)(.*)$', so.rest, regex.DOTALL):
-            tag, rest = m2.group(1, 2)
+        elif m2 := self.close_tag_regex.match(so.s, so.pos):
+            tag = m2.group(1)
             self.tag, registered_p, missing_space, missing_1_p, missing_backslash, plus_p, close_p = sc.core_tag(tag)
             self.close_tag = tag
             so.update_current_position(tag)
@@ -1642,71 +2010,96 @@ class UsfmElement:
             so.sc.record_tag(self.tag, close_tag=self.close_tag)
         else:
             error_cat = ('Errors', 'Paired tags', 'Missing open tag', 'Check code')
-            error_context = f"rest:{so.rest}"
+            error_context = f"rest:{so.s[so.pos:]}"
             so.sc.record_error(error_cat, versification, error_context)
         if 'new' in so.verbose:
             sys.stderr.write(f"New {self.open_tag or self.close_tag} {versification} {self.id}\n")
 
-        prev_rest_length = math.inf
-        while so.rest:
-            if len(so.rest) >= prev_rest_length:
-                break
-            else:
-                prev_rest_length = len(so.rest)
-            if m3 := regex.match(r'(.*?)(\\\+?[a-z]+[0-9]*(?: |\*|))(.*)$', so.rest,
-                                 flags=regex.IGNORECASE | regex.DOTALL):
-                pre, tag, rest = m3.group(1, 2, 3)
-                if pre != '':
-                    so.attach_element(pre)
-                if tag.endswith('*'):
-                    core_tag, registered_p, missing_space, missing_1_p, missing_backslash, plus_p, close_p \
-                        = sc.core_tag(tag)
-                    if self.tag:
-                        if (core_tag == self.tag) and self.is_open:
-                            so.update_current_position(tag)
+    @staticmethod
+    def parse(so: UsfmObject) -> UsfmElement:
+        """Builds element at current position of so, and then its sub-elements (and their sub-elements etc.)
+        This uses an explicit stack rather than recursion, as a long line (e.g. unsegmented poetry or a table)
+        can contain thousands of tags that are not explicitly closed, each nested under the previous one."""
+        element = UsfmElement(so)
+        # stack entries: [element, so.pos at element's previous scan step, pending close-tag check after child]
+        stack = [[element, -1, None]]
+        while stack:
+            frame = stack[-1]
+            se, prev_pos, pending_check = frame
+            if pending_check:
+                frame[2] = None
+                tag, child = pending_check
+                if so.s.startswith(tag, so.pos):
+                    location = f"{so.current_filename} l.{so.current_line_number}:{so.current_column}"
+                    sys.stderr.write(f"** Warning: check code X1 {location} {child.tag} {tag}::{so.s[so.pos:]}::\n")
+            if (so.pos >= so.len_s) or (so.pos <= prev_pos):
+                stack.pop()
+                continue
+            frame[1] = so.pos
+            finished, child, close_tag = se.scan_sub_element()
+            if finished:
+                stack.pop()
+            elif child:
+                if close_tag:
+                    frame[2] = (close_tag, child)
+                stack.append([child, -1, None])
+        return element
+
+    def scan_sub_element(self) -> tuple[bool, UsfmElement | None, str | None]:
+        """Processes the next text and tag at current position.
+        Returns (finished, new child element to be scanned next, close tag to be checked after child)"""
+        so = self.so
+        sc = so.sc
+        if m3 := self.sub_element_tag_regex.match(so.s, so.pos):
+            pre, tag = m3.group(1, 2)
+            if pre != '':
+                so.attach_element(pre)
+            if tag.endswith('*'):
+                core_tag, registered_p, missing_space, missing_1_p, missing_backslash, plus_p, close_p \
+                    = sc.core_tag(tag)
+                if self.tag:
+                    if (core_tag == self.tag) and self.is_open:
+                        so.update_current_position(tag)
+                        self.end_position = so.current_position()
+                        self.close_tag = tag.rstrip()
+                        self.is_open = False
+                        so.sc.record_tag(self.tag, close_tag=self.close_tag, new_tag=False)
+                        so.pop_last_stack_element()
+                        if 'closing' in so.verbose:
+                            print(f"Direct-closing {self.id} {self.open_tag} {self.close_tag} {self.end_position}"
+                                  f" {so.open_tags}")
+                        return True, None, None
+                    elif core_tag in so.open_tags:
+                        while o := so.last_open_element():
+                            assert (isinstance(o, UsfmElement))
                             self.end_position = so.current_position()
-                            self.close_tag = tag.rstrip()
                             self.is_open = False
-                            so.sc.record_tag(self.tag, close_tag=self.close_tag, new_tag=False)
-                            so.pop_last_stack_element()
-                            if 'closing' in so.verbose:
-                                print(f"Direct-closing {self.id} {self.open_tag} {self.close_tag} {self.end_position}"
-                                      f" {so.open_tags}")
-                            return
-                        elif core_tag in so.open_tags:
-                            while o := so.last_open_element():
-                                assert (isinstance(o, UsfmElement))
-                                self.end_position = so.current_position()
-                                self.is_open = False
-                                if o.tag == core_tag:
-                                    so.update_current_position(tag)
-                                    o.end_position = so.current_position()
-                                    o.close_tag = tag.rstrip()
-                                    o.is_open = False
-                                    so.sc.record_tag(o.tag, close_tag=o.close_tag, new_tag=False)
-                                    so.pop_last_stack_element()
-                                    if 'closing' in so.verbose:
-                                        sys.stderr.write(f"Matching-closing {o.id} {o.open_tag} {o.close_tag}"
-                                                         f" {o.end_position} {so.open_tags}\n")
-                                    return
-                                else:
-                                    o.end_position = so.current_position()
-                                    o.close_tag = None
-                                    o.is_open = False
-                                    so.pop_last_stack_element()
-                                    if 'closing' in so.verbose:
-                                        sys.stderr.write(f"Self-closing {o.id} {o.open_tag} {o.close_tag}"
-                                                         f" {o.end_position} {so.open_tags}\n")
-                        else:
-                            se = UsfmElement(so)
-                            if so.rest.startswith(tag):
-                                location = f"{so.current_filename} l.{so.current_line_number}:{so.current_column}"
-                                sys.stderr.write(f"** Warning: check code X1 {location} {se.tag} {tag}::{so.rest}::\n")
-                                # so.update_current_position(tag)
-                else:
-                    UsfmElement(so)
-            elif so.rest != '':
-                so.attach_element(so.rest)
+                            if o.tag == core_tag:
+                                so.update_current_position(tag)
+                                o.end_position = so.current_position()
+                                o.close_tag = tag.rstrip()
+                                o.is_open = False
+                                so.sc.record_tag(o.tag, close_tag=o.close_tag, new_tag=False)
+                                so.pop_last_stack_element()
+                                if 'closing' in so.verbose:
+                                    sys.stderr.write(f"Matching-closing {o.id} {o.open_tag} {o.close_tag}"
+                                                     f" {o.end_position} {so.open_tags}\n")
+                                return True, None, None
+                            else:
+                                o.end_position = so.current_position()
+                                o.close_tag = None
+                                o.is_open = False
+                                so.pop_last_stack_element()
+                                if 'closing' in so.verbose:
+                                    sys.stderr.write(f"Self-closing {o.id} {o.open_tag} {o.close_tag}"
+                                                     f" {o.end_position} {so.open_tags}\n")
+                    else:
+                        return False, UsfmElement(so), tag
+            else:
+                return False, UsfmElement(so), None
+        elif so.pos < so.len_s:
+            so.attach_element(so.s[so.pos:])
+        return False, None, None
 
     def __str__(self):
         return self.pprint()
@@ -2064,6 +2457,7 @@ class ReferenceStats:
         self.book_name_normalization = dict[str]()
         self.keywords = defaultdict(list)  # key: 'chapter', 'verse', 'to', 'this', 'next', ... value: list(str)
         self.n_error_messages = 0
+        self.candidates = []  # elements: (versification, line, list of (tag, candidate, number))
 
         self.connector_re = '[-–—:.,]'
         if sc and sc.doc_config:
@@ -2121,68 +2515,271 @@ class ReferenceStats:
                         sys.stderr.write(f"Cannot process \\xt: {ref_text.strip()} :: {evidence_text.strip()} "
                                          f"{self.sc.current_filename} {self.sc.current_line_number_start}\n")
 
-    def check_so(self, so: UsfmObject) -> None:
+    def collect_candidates(self, so: UsfmObject) -> None:
+        """Collects (unchecked) reference candidates of a line. They are checked by check_candidates
+        only after all files have been read, i.e. with the complete book name evidence."""
+        candidate_tuples = []
         for element in so.elements:
             if isinstance(element, UsfmElement):
-                self.check_se(element, so)
+                self.collect_se_candidates(element, candidate_tuples)
+        if candidate_tuples:
+            self.candidates.append((so.versification, so.s.strip(), candidate_tuples))
 
-    def check_se(self, se: UsfmElement, so: UsfmObject) -> None:
-        sc = so.sc
-        ref_words = {}  # default
-        if sc.doc_config and sc.doc_config.ref_words:
-            ref_words = sc.doc_config.ref_words.get(sc.lang_code, {})
-        chapter_keywords = ref_words.get('_CHAPTER_', [])
-        chapter_keywords_lc = [x.lower() for x in chapter_keywords]
-        verse_keywords = ref_words.get('_VERSE_', [])
-        verse_keywords_lc = [x.lower() for x in verse_keywords]
+    def collect_se_candidates(self, se: UsfmElement, candidate_tuples: list[tuple[str, str, str]]) -> None:
+        # candidate_tuples elements: (tag, candidate, number)
         for sub_element in se.sub_elements:
             if isinstance(sub_element, UsfmElement):
-                self.check_se(sub_element, so)
+                self.collect_se_candidates(sub_element, candidate_tuples)
             elif isinstance(sub_element, str):
                 if se.tag not in ('xt', 'fr', 'r', 'cl', 'id'):
                     left_context, rest = '', sub_element
-                    candidate_tuples = []
                     while m := regex.match(fr'(.*?)(\d+(?:{self.connector_re}\d+)*)(.*)$', rest):
                         pre, num, rest = m.group(1, 2, 3)
                         left_context += pre
                         if m2 := regex.search(fr"((?:\b(?:[1-9]|\pL\pM*)(?:\pL\pM*|')*\s+)?\pL\pM*(?:\pL\pM*|')*)\s+$",
                                               left_context):
-                            candidate_tuples.append((m2.group(1), num))
+                            candidate_tuples.append((se.tag, m2.group(1), num))
                         left_context += num
-                    for candidate_tuple in candidate_tuples:
-                        num = candidate_tuple[1]
-                        cand0 = candidate_tuple[0]
-                        cand1 = regex.sub(r'^\S+\s+', '', cand0)
-                        candidates = [cand0]
-                        if cand1 != cand0:
-                            candidates.append(cand1)
-                        for sub_cand in candidates:
-                            ref = " ".join([sub_cand, num])
-                            if sub_cand in self.book_name_evidence_types:
-                                brs = BibleRefSpan(so.versification)
-                                brs_ref = BibleRefSpan(ref, sc.ref_stats.book_name_to_book_id)
-                                loc_contains_ref = brs_ref.contains(brs)
-                                if loc_contains_ref:
-                                    error_cat = ('Info', 'Found self-reference', f'\\{se.tag}')
-                                    mark_up = [(ref, 'color:green;')]
-                                else:
-                                    error_cat = ('Alerts', 'Consider adding reference tags (e.g. \\xt)', f'\\{se.tag}')
-                                    mark_up = [(ref, 'color:red;')]
-                                sc.record_error(error_cat, so.versification, so.s.strip(), mark_up=mark_up)
-                                # sys.stderr.write(f'  Consider adding \\xt under \\{se.tag} to: '
-                                #                  f'{ref} ({so.versification}; '
-                                #                  f'{so.current_filename} l.{so.current_line_number - 1})\n')
-                            elif sub_cand.lower() in chapter_keywords_lc:
-                                error_cat = ('Info', 'Found chapter reference', f'\\{se.tag}')
-                                mark_up = [(ref, 'color:red;')]
-                                sc.record_error(error_cat, so.versification, so.s.strip(), mark_up=mark_up)
-                            elif sub_cand.lower() in verse_keywords_lc:
-                                error_cat = ('Info', 'Found verse reference', f'\\{se.tag}')
-                                mark_up = [(ref, 'color:red;')]
-                                sc.record_error(error_cat, so.versification, so.s.strip(), mark_up=mark_up)
+
+    def check_candidates(self) -> None:
+        sc = self.sc
+        ref_words = {}  # default
+        if sc.doc_config and sc.doc_config.ref_words:
+            ref_words = sc.doc_config.ref_words.get(sc.lang_code, {})
+        chapter_keywords = ref_words.get('_CHAPTER_', [])
+        chapter_keywords_lc = [x.lower() for x in chapter_keywords]
+        verse_keywords = ref_words.get('_VERSE_', [])
+        verse_keywords_lc = [x.lower() for x in verse_keywords]
+        for versification, s, candidate_tuples in self.candidates:
+            for tag, cand0, num in candidate_tuples:
+                cand1 = regex.sub(r'^\S+\s+', '', cand0)
+                candidates = [cand0]
+                if cand1 != cand0:
+                    candidates.append(cand1)
+                for sub_cand in candidates:
+                    ref = " ".join([sub_cand, num])
+                    if sub_cand in self.book_name_evidence_types:
+                        brs = BibleRefSpan(versification)
+                        brs_ref = BibleRefSpan(ref, self.book_name_to_book_id)
+                        loc_contains_ref = brs_ref.contains(brs)
+                        if loc_contains_ref:
+                            error_cat = ('Info', 'Found self-reference', f'\\{tag}')
+                            mark_up = [(ref, 'color:green;')]
+                        else:
+                            error_cat = ('Alerts', 'Consider adding reference tags (e.g. \\xt)', f'\\{tag}')
+                            mark_up = [(ref, 'color:red;')]
+                        sc.record_error(error_cat, versification, s, mark_up=mark_up)
+                    elif sub_cand.lower() in chapter_keywords_lc:
+                        error_cat = ('Info', 'Found chapter reference', f'\\{tag}')
+                        mark_up = [(ref, 'color:red;')]
+                        sc.record_error(error_cat, versification, s, mark_up=mark_up)
+                    elif sub_cand.lower() in verse_keywords_lc:
+                        error_cat = ('Info', 'Found verse reference', f'\\{tag}')
+                        mark_up = [(ref, 'color:red;')]
+                        sc.record_error(error_cat, versification, s, mark_up=mark_up)
+
+    def partial_state(self) -> dict:
+        return {'book_name_evidence_types': self.book_name_evidence_types,
+                'reference_count': self.reference_count,
+                'book_name_to_book_id': self.book_name_to_book_id,
+                'book_name_normalization': self.book_name_normalization,
+                'n_error_messages': self.n_error_messages,
+                'candidates': self.candidates}
+
+    def merge_partial_state(self, d: dict) -> None:
+        for book_name, evidence_types in d['book_name_evidence_types'].items():
+            merged_evidence_types = self.book_name_evidence_types[book_name]
+            for evidence_type in evidence_types:
+                # 'config' evidence is shared by all partial states; 'xt' is recorded only once per book name
+                if (evidence_type not in ('config', 'xt')) or (evidence_type not in merged_evidence_types):
+                    merged_evidence_types.append(evidence_type)
+        for key, count in d['reference_count'].items():
+            self.reference_count[key] += count
+        for book_name, book_id in d['book_name_to_book_id'].items():
+            self.book_name_to_book_id.setdefault(book_name, book_id)
+        for book_name, norm_book_name in d['book_name_normalization'].items():
+            self.book_name_normalization.setdefault(book_name, norm_book_name)
+        self.n_error_messages += d['n_error_messages']
+        self.candidates.extend(d['candidates'])
+
+
+class ErrorStore:
+    """Locations and strings of errors recorded by UsfmCheck.record_error, stored in columns, one row per recorded
+    error location, with ids of interned error categories and values (locations and error strings).
+    For reports, locations are sorted by integer rank, with UsfmCheck.location_sort applied only once per
+    distinct location."""
+
+    def __init__(self):
+        self.values = []  # interned locations and error strings
+        self.value_ids = {}
+        self.categories = []  # interned error categories (tuples)
+        self.category_ids = {}
+        self.category_column = array('l')
+        self.location_column = array('l')  # value id
+        self.string_column = array('l')  # value id, -1 for no error string
+        self.category_rows = {}  # key: category id value: array of row numbers
+        self.category_locations = set()  # elements: (category id, location id)
+        self.mark_ups = {}  # key: (category id, location id, string id) value: list of (sub-str, style)
+        self.location_ranks = None  # location rank by value id, see location_rank_table
+        self.n_ranked_values = 0
+
+    def __len__(self) -> int:
+        return len(self.location_column)
+
+    def value_id(self, value: str) -> int:
+        if (value_id := self.value_ids.get(value)) is None:
+            value_id = self.value_ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def category_id(self, error_cat: tuple) -> int:
+        if (category_id := self.category_ids.get(error_cat)) is None:
+            category_id = self.category_ids[error_cat] = len(self.categories)
+            self.categories.append(error_cat)
+            self.category_rows[category_id] = array('l')
+        return category_id
+
+    def add(self, error_cat: tuple, error_loc: str, error_string: str | None,
+            mark_up: list[tuple[str, str]] | None = None) -> None:
+        category_id, location_id = self.category_id(error_cat), self.value_id(error_loc)
+        string_id = self.value_id(error_string) if error_string else -1
+        self.add_row(category_id, location_id, string_id)
+        if mark_up and error_string:
+            self.mark_ups.setdefault((category_id, location_id, string_id), []).extend(mark_up)
+
+    def add_row(self, category_id: int, location_id: int, string_id: int) -> None:
+        self.category_rows[category_id].append(len(self.location_column))
+        self.category_column.append(category_id)
+        self.location_column.append(location_id)
+        self.string_column.append(string_id)
+        self.category_locations.add((category_id, location_id))
+
+    def has_location(self, error_cat: tuple, error_loc: str) -> bool:
+        return (self.category_ids.get(error_cat), self.value_ids.get(error_loc)) in self.category_locations
+
+    def rows(self, error_cat: tuple) -> array:
+        if (category_id := self.category_ids.get(error_cat)) is None:
+            return array('l')
+        return self.category_rows[category_id]
+
+    def locations(self, error_cat: tuple) -> list[str]:
+        """Locations of error_cat in recording order (including duplicates)"""
+        return [self.values[self.location_column[row]] for row in self.rows(error_cat)]
+
+    def location_strings(self, error_cat: tuple) -> dict[str, list[str]]:
+        """Error strings of error_cat by location, in recording order"""
+        result = {}
+        for row in self.rows(error_cat):
+            if (string_id := self.string_column[row]) >= 0:
+                result.setdefault(self.values[self.location_column[row]], []).append(self.values[string_id])
+        return result
+
+    def mark_up(self, error_cat: tuple, error_loc: str, error_string: str) -> list[tuple[str, str]]:
+        key = (self.category_ids.get(error_cat), self.value_ids.get(error_loc), self.value_ids.get(error_string))
+        return self.mark_ups.get(key, [])
+
+    def location_rank_table(self, location_sort) -> array:
+        """Ranks of locations by value id: locations with equal location_sort keys have the same rank."""
+        if (self.location_ranks is None) or (self.n_ranked_values != len(self.values)):
+            location_keys = {location_id: location_sort(self.values[location_id])
+                             for location_id in set(self.location_column)}
+            self.location_ranks = array('l', [0]) * len(self.values)
+            rank, prev_key = 0, None
+            for location_id in sorted(location_keys, key=location_keys.get):
+                key = location_keys[location_id]
+                if key != prev_key:
+                    rank += 1
+                    prev_key = key
+                self.location_ranks[location_id] = rank
+            self.n_ranked_values = len(self.values)
+        return self.location_ranks
+
+    def sorted_locations(self, error_cat: tuple, location_sort) -> list[str]:
+        """Locations of error_cat (including duplicates), sorted by location_sort (stable)"""
+        location_ranks = self.location_rank_table(location_sort)
+        location_ids = sorted((self.location_column[row] for row in self.rows(error_cat)),
+                              key=location_ranks.__getitem__)
+        return [self.values[location_id] for location_id in location_ids]
+
+    def partial_state(self) -> dict:
+        return {'values': self.values, 'categories': self.categories, 'category_column': self.category_column,
+                'location_column': self.location_column, 'string_column': self.string_column,
+                'mark_ups': self.mark_ups}
+
+    def merge_partial_state(self, d: dict) -> None:
+        value_ids = [self.value_id(value) for value in d['values']]
+        category_ids = [self.category_id(error_cat) for error_cat in d['categories']]
+        for category_id, location_id, string_id in zip(d['category_column'], d['location_column'],
+                                                       d['string_column']):
+            self.add_row(category_ids[category_id], value_ids[location_id],
+                         value_ids[string_id] if string_id >= 0 else -1)
+        for (category_id, location_id, string_id), mark_up in d['mark_ups'].items():
+            key = (category_ids[category_id], value_ids[location_id], value_ids[string_id])
+            self.mark_ups.setdefault(key, []).extend(mark_up)
+
+
+class PartialStateCache:
+    """Persistent cache of per-file partial states (see UsfmCheck.partial_state), one pickle file per USFM file.
+    The key is a hash of the file content and name, the checker version (source code and tag data files)
+    and the check configuration, so any change to these results in a fresh read of the file."""
+    cache_format_version = 3
+
+    def __init__(self, directory: str | Path, sc: UsfmCheck):
+        self.directory = Path(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        script_dir = Path(os.path.realpath(__file__)).parent
+        version_hash = hashlib.sha256(f"usfm_check cache {self.cache_format_version}\n".encode())
+        for filename in (os.path.realpath(__file__), sys.modules[BibleUtilities.__module__].__file__,
+                         script_dir / "Bible_USFM_tag_data.jsonl", script_dir / "Bible_USFM_explanations.txt"):
+            with open(filename, 'rb') as f:
+                version_hash.update(f.read())
+        doc_config_d = vars(sc.doc_config) if sc.doc_config else None
+        version_hash.update(repr((sc.user, sc.lang_code, doc_config_d, sc.misc_data_dict)).encode())
+        self.version_fingerprint = version_hash.hexdigest()
+
+    def key(self, filename: Path) -> str:
+        file_hash = hashlib.sha256(self.version_fingerprint.encode())
+        file_hash.update(os.path.basename(filename).encode() + b'\0')
+        with open(filename, 'rb') as f:
+            file_hash.update(f.read())
+        return file_hash.hexdigest()
+
+    def load(self, key: str) -> dict | None:
+        try:
+            with open(self.directory / f"{key}.pickle", 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ValueError) as error:
+            sys.stderr.write(f"Ignoring unreadable cache file {key}.pickle: {error}\n")
+            return None
+
+    def store(self, key: str, d: dict) -> None:
+        filename = self.directory / f"{key}.pickle"
+        tmp_filename = self.directory / f"{key}.{os.getpid()}.tmp"
+        with open(tmp_filename, 'wb') as f:
+            pickle.dump(d, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filename, filename)  # atomic, in case of concurrent runs
 
 
 class UsfmCheck:
+    # Merging of per-file partial states (see partial_state, merge_partial_state and check_files_in_parallel)
+    summed_attributes = ('stats_counts', 'error_counts', 'repair_counts', 'repair_message_counts',
+                         'extract_ignore_tag_count', 'log_message_count', 'log_count_dict', 'other_tag_count_dict')
+    summed_int_attributes = ('n_operations_in_expand_usfm_verses', 'n_fewer_lines_in_expand_usfm_verses',
+                             'n_operations_in_split_usfm_chapters_and_verses',
+                             'n_additional_lines_in_split_usfm_chapters_and_verses')
+    set_union_attributes = ('stats_key_values', 'error_key_values', 'repair_key_values')
+    list_concat_attributes = ('tag_locations', 'repair_locations')
+    dict_update_attributes = ('error_id_to_error_tuple', 'repair_id_to_repair_tuple',
+                              'error_cat_element_to_explanation_id')
+    # state at the end of a file, taken over from the last file
+    end_of_file_attributes = ('current_book_id', 'current_book_name', 'current_book', 'current_chapter',
+                              'current_verse', 'current_verse_s', 'current_filename', 'current_line',
+                              'current_line_number_start', 'current_line_number_end',
+                              'chapters_in_book', 'verses_in_chapter')
+    tag_data_cache_format_version = 1  # see load_tag_data
+    colored_verse_chunk_size = 200  # verses per worker task, see colored_verse_stream
 
     def __init__(self, directory: str | Path | None = None, user: str | None = None,
                  doc_config: DocumentConfiguration | None = None,
@@ -2206,9 +2803,9 @@ class UsfmCheck:
         self.stats_counts = defaultdict(int)          # key: (tag, open/close_tag)
         self.error_key_values = defaultdict(set)
         self.error_counts = defaultdict(int)
-        self.error_locations = defaultdict(list)
-        self.error_strings = defaultdict(list)
-        self.error_sub_strings = defaultdict(list)
+        self.errors = ErrorStore()  # error locations and strings
+        self.colored_verses: Iterator | None = None  # ((verse, error_cat, error_loc), colored verse) in report order
+        self.next_colored_verse: tuple | None = None   # next element of self.colored_verses, not yet used
         self.error_id_to_error_tuple = {}
         self.bible_config: BibleUtilities | None = None
         self.tag_locations = defaultdict(list)
@@ -2226,7 +2823,8 @@ class UsfmCheck:
         self.repair_locations = defaultdict(list)
         self.repair_id_to_repair_tuple = {}
         self.repair_message_counts = defaultdict(int)
-        self.bible_text_extract_dict = {}  # key: (book_id, chapter_number, verse_number) value: BibleTextExtracts
+        self.bible_text_extract_dict = {}  # extracts of current file; key: (book_id, chapter_number, verse_number)
+        self.bible_text_extract_spool = BibleTextExtractSpool()  # extracts of previously read files
         self.extract_ignore_tag_count = defaultdict(int)
         self.log_message_count = defaultdict(int)
         self.log_count_dict = defaultdict(int)
@@ -2236,17 +2834,16 @@ class UsfmCheck:
         self.doc_config = doc_config
         self.lang_code = lang_code
         self.ref_stats = ReferenceStats(self)
-        self.so_list: list[UsfmObject] = []
         self.corpus_model = CorpusModel(sc=self)
         self.ellipsis_counts = defaultdict(int)      # key: (?:...|....|…)
         self.ellipsis_locations = defaultdict(list)  # as above  # value: (verse-id, footnote)
         self.misc_data_dict = None
+        self.cache: PartialStateCache | None = None
 
         script_path = os.path.realpath(__file__)
         script_dir = Path(script_path).parent
         # sys.stderr.write(f"script dir: {script_dir}\n")
-        self.read_tag_prop_data(script_dir / "Bible_USFM_tag_data.jsonl")
-        self.read_usfm_explanations(script_dir / "Bible_USFM_explanations.txt")
+        self.load_tag_data(script_dir)
 
     def core_tag(self, s: str, norm1: bool = True) -> tuple[str, bool, bool, bool, bool, bool, bool]:
         registered_p, missing_space, missing_1_p, missing_backslash, plus_p, close_p \
@@ -2305,13 +2902,7 @@ class UsfmCheck:
             if (error_acc_cat == error_cat) or (not count_only_full_error_cat):
                 self.error_counts[error_acc_cat] += 1
             if error_loc and (error_sub_cat_index == len(error_cat) - 1):  # full error_cat
-                self.error_locations[error_cat].append(error_loc)
-                if error_string:
-                    self.error_strings[(error_cat, error_loc)].append(error_string)
-                    if mark_up:
-                        key_tuple = (error_cat, error_loc, error_string)
-                        self.error_sub_strings[key_tuple] += mark_up
-                        # sys.stderr.write(f" ! error_sub_strings({key_tuple}) {self.error_sub_strings[key_tuple]}\n")
+                self.errors.add(error_cat, error_loc, error_string, mark_up)
 
     def location_sort(self, s: str | LineStruct) -> tuple[int, int, int, str]:
         # target filename and line number, e.g. 44JHN_abc.SFM l.151
@@ -2400,8 +2991,9 @@ class UsfmCheck:
                 #                  f"{e_error_cat} {e_count} {e_count2}\n")
                 if e_count and e_count2 and ((e_count / e_count2) >= 0.3):
                     new_error_cat = ('Info',) + i_error_cat[1:]
-                    for error_location in self.error_locations[i_error_cat]:
-                        for error_string in self.error_strings[(i_error_cat, error_location)]:
+                    error_strings = self.errors.location_strings(i_error_cat)
+                    for error_location in self.errors.locations(i_error_cat):
+                        for error_string in error_strings.get(error_location, []):
                             self.record_error(new_error_cat, error_location, error_string)
 
     @staticmethod
@@ -2445,6 +3037,67 @@ class UsfmCheck:
                     return quote_without_punct_suffix, punct_suffix
         return None, None
 
+    def colored_verse(self, s: str, error_cat: tuple, error_loc: str) -> str:
+        """Verse s colored for the HTML error report, taken from self.colored_verses (colored in parallel, in report
+        order, see html_error_report_parts) if available."""
+        if self.colored_verses is not None:
+            if self.next_colored_verse is None:
+                self.next_colored_verse = next(self.colored_verses, None)
+            if self.next_colored_verse and (self.next_colored_verse[0] == (s, error_cat, error_loc)):
+                colored_s, self.next_colored_verse = self.next_colored_verse[1], None
+                return colored_s
+        return self.color_verse(s, error_cat, error_loc)
+
+    def report_verses(self, error_pre_cat: tuple = ()) -> Iterator[tuple[str, tuple, str]]:
+        """(verse, error_cat, error_loc) of the verses of the error report, in report order (see error_report_parts)"""
+        for error_sub_cat in sorted(self.error_key_values[error_pre_cat],
+                                    key=lambda x: self.error_sub_cat_sort(error_pre_cat + (x,))):
+            error_cat = error_pre_cat + (error_sub_cat,)
+            if error_cat == ('Silent',):
+                continue
+            if error_strings := self.errors.location_strings(error_cat):
+                prev_loc = None
+                for error_loc in self.errors.sorted_locations(error_cat, self.location_sort):
+                    if error_loc != prev_loc:  # skip duplicate locations
+                        prev_loc = error_loc
+                        for string in error_strings.get(error_loc) or ():
+                            yield string.rstrip(), error_cat, error_loc
+            yield from self.report_verses(error_cat)
+
+    def colored_verse_stream(self, n_workers: int) -> Iterator[tuple[tuple[str, tuple, str], str]]:
+        """Colors the verses of the HTML error report in forked worker processes (which share this UsfmCheck,
+        incl. recorded errors, without pickling it), in chunks of colored_verse_chunk_size verses in report order.
+        At most two chunks per worker are in flight, so the colored verses held in memory are bounded."""
+        global render_worker_sc
+        verses = self.report_verses()
+        chunks = iter(lambda: list(itertools.islice(verses, self.colored_verse_chunk_size)), [])
+        render_worker_sc = self
+        try:
+            with multiprocessing.get_context('fork').Pool(n_workers) as pool:
+                pending = deque((chunk, pool.apply_async(color_verses_in_worker, (chunk,)))
+                                for chunk in itertools.islice(chunks, 2 * n_workers))
+                while pending:
+                    chunk, colored_strings = pending.popleft()
+                    colored_strings = colored_strings.get()
+                    if next_chunk := next(chunks, None):
+                        pending.append((next_chunk, pool.apply_async(color_verses_in_worker, (next_chunk,))))
+                    yield from zip(chunk, colored_strings)
+        finally:
+            render_worker_sc = None
+
+    def html_error_report_parts(self, n_workers: int = 1) -> Iterator[str]:
+        """HTML error report in parts (see error_report_parts), with verses colored by n_workers worker processes
+        while the report is written (see colored_verse_stream)."""
+        if (n_workers <= 1) or ('fork' not in multiprocessing.get_all_start_methods()):
+            yield from self.error_report_parts(html_p=True)
+            return
+        self.colored_verses = self.colored_verse_stream(n_workers)
+        try:
+            yield from self.error_report_parts(html_p=True)
+        finally:
+            self.colored_verses.close()  # terminates worker pool
+            self.colored_verses = self.next_colored_verse = None
+
     def color_verse(self, s: str, error_cat: tuple, error_loc: str) -> str:
         orig_s = s
         s = guard_html(s)
@@ -2562,14 +3215,14 @@ class UsfmCheck:
                 key_tuple2 = (error_cat2, error_loc, orig_s)
                 key_tuples.append(key_tuple2)
             for i, key_tuple in enumerate(key_tuples):
-                if mark_up := self.error_sub_strings[key_tuple]:
+                if mark_up := self.errors.mark_up(*key_tuple):
                     for mark_up_element in mark_up:
                         ref, style = mark_up_element
                         ref_g = guard_html(ref)
                         # sys.stderr.write(f" ? error_sub_strings({key_tuple}) {s} => {ref_g} :: {style}\n")
                         s = regex.sub(rf'\b({ref_g})\b', fr'<span style="{style}">\1</span>', s)
                 elif i == 0:
-                    sys.stderr.write(f" ? error_sub_strings({key_tuple}) {s} => ???\n")
+                    sys.stderr.write(f" ? error mark-up({key_tuple}) {s} => ???\n")
         elif "Footnote quotation does not appear in verse" in error_cat:
             last_error_component = error_cat[-1]
             f_quotation = last_error_component.removeprefix('Footnote quotation: ')
@@ -2633,20 +3286,21 @@ class UsfmCheck:
         return s
 
     def error_report(self, error_pre_cat: tuple = (), html_p: bool = False) -> str:
-        # f_html_out is None: plain text format
+        return ''.join(self.error_report_parts(error_pre_cat, html_p))
+
+    def error_report_parts(self, error_pre_cat: tuple = (), html_p: bool = False) -> Iterator[str]:
+        """Error report (plain text or HTML) in parts, e.g. to be written to a file as they are rendered."""
         global n_toggle_indexes
-        if error_pre_cat:
-            result = ''
-        else:
+        if not error_pre_cat:
             n = self.error_counts[()]
             s = '' if n == 1 else 's'
             title = f'Report of {n} error{s}/warning{s}/alert{s}/info{s}'
-            result = f"<h3>{title}</h3>\n" if html_p else f"{title}:\n"
+            yield f"<h3>{title}</h3>\n" if html_p else f"{title}:\n"
         indent0 = (' ' * 4 * (len(error_pre_cat) + 0))
         indent1 = (' ' * 4 * (len(error_pre_cat) + 1))
         indent2 = (' ' * 4 * (len(error_pre_cat) + 2))
         if html_p:
-            result += indent0 + "<ul>\n"
+            yield indent0 + "<ul>\n"
             li = "<li> "
         else:
             li = ""
@@ -2657,7 +3311,7 @@ class UsfmCheck:
                 continue
             out_error_sub_cat = self.color_error_cat_element(error_sub_cat, error_pre_cat) \
                 if html_p else error_sub_cat
-            result += f"{indent1}{li}{out_error_sub_cat} ({self.error_counts[error_pre_cat + (error_sub_cat,)]})"
+            yield f"{indent1}{li}{out_error_sub_cat} ({self.error_counts[error_pre_cat + (error_sub_cat,)]})"
             if html_p:
                 explanation_id = self.error_cat_element_to_explanation_id.get(error_sub_cat)
                 explanation = self.explanation_id_to_explanation.get(explanation_id) if explanation_id else None
@@ -2668,24 +3322,26 @@ class UsfmCheck:
                     style_clause = 'style="color:navy; text-decoration:underline;font-weight:bold;"'
                     onclick_clause = f"""onclick="toggle_info('{toggle_index}');" """
                     toggle_text = f"""&nbsp; &nbsp; <span {style_clause} {onclick_clause}>Explain</span>"""
-                    result += toggle_text
+                    yield toggle_text
                     explanation_box = (f"<table border='1' cellpadding='10' cellspacing='1' bgcolor='#FCFCE3'>"
                                        f"<tr><td>{explanation}</td></tr></table>")
-                    result += f"<br>\n<div id='{toggle_index}' style='display:none;'>{explanation_box}</div>"
-            error_locations = sorted(self.error_locations[error_cat], key=self.location_sort)
+                    yield f"<br>\n<div id='{toggle_index}' style='display:none;'>{explanation_box}</div>"
+            error_locations = self.errors.sorted_locations(error_cat, self.location_sort)
+            error_strings = self.errors.location_strings(error_cat)  # key: error_loc
             if html_p:
-                result += indent2 + "<ul>\n"
-            if any([self.error_strings[(error_cat, error_loc)] for error_loc in error_locations]):
-                result += '\n'
+                yield indent2 + "<ul>\n"
+            if error_strings:
+                yield '\n'
                 elements = []
                 prev_loc = None
                 for error_loc in error_locations:
                     if error_loc != prev_loc:  # skip duplicate locations
                         prev_loc = error_loc
-                        if strings := self.error_strings[(error_cat, error_loc)]:
+                        if strings := error_strings.get(error_loc):
                             for string in strings:
                                 string = string.rstrip()
-                                colored_string = self.color_verse(string, error_cat, error_loc) if html_p else string
+                                colored_string = self.colored_verse(string, error_cat, error_loc) \
+                                    if html_p else string
                                 elements.append(f"{indent2}{li}{error_loc}: {colored_string}")
                         else:
                             elements.append(f"{indent2}{error_loc}")
@@ -2699,25 +3355,24 @@ class UsfmCheck:
                     style_clause = 'style="color:navy; text-decoration:underline;font-weight:bold;"'
                     onclick_clause = f"""onclick="toggle_info('{toggle_index}');" """
                     toggle_text = f"""<span {style_clause} {onclick_clause}>Show {n_more} more entries</span>"""
-                    result += '\n'.join(bundled_elements[:max1]) + '\n'
-                    result += f'<br> {toggle_text}</ul>\n'
-                    result += f"<div id='{toggle_index}' style='display:none;'><ul>\n"
-                    result += '\n'.join(bundled_elements[max1:]) + '\n'
-                    result += f'</ul></div><ul>\n'
+                    yield '\n'.join(bundled_elements[:max1]) + '\n'
+                    yield f'<br> {toggle_text}</ul>\n'
+                    yield f"<div id='{toggle_index}' style='display:none;'><ul>\n"
+                    yield '\n'.join(bundled_elements[max1:]) + '\n'
+                    yield f'</ul></div><ul>\n'
                 else:
-                    result += '\n'.join(bundled_elements) + '\n'
+                    yield '\n'.join(bundled_elements) + '\n'
             else:
                 max_n_bundles_to_show = 300
                 bundles = self.bundle_duplicates(error_locations)
                 if (len(bundles) > max_n_bundles_to_show) and ("Warnings" in error_cat):
                     bundles = bundles[:max_n_bundles_to_show] + ['...']
-                result += ' ' + ', '.join(bundles) + '\n'
+                yield ' ' + ', '.join(bundles) + '\n'
             if html_p:
-                result += indent2 + "</ul>\n"
-            result += self.error_report(error_cat, html_p)
+                yield indent2 + "</ul>\n"
+            yield from self.error_report_parts(error_cat, html_p)
         if html_p:
-            result += indent0 + "</ul>\n"
-        return result
+            yield indent0 + "</ul>\n"
 
     def record_tag(self, tag: str, open_tag: str | None = None, close_tag: str | None = None, new_tag: bool = True):
         self.stats_key_values['tag'].add(tag)
@@ -2915,8 +3570,7 @@ class UsfmCheck:
         return result
 
     def final_check(self):
-        for so in self.so_list:
-            self.ref_stats.check_so(so)
+        self.ref_stats.check_candidates()
         for tag2a in self.stats_key_values['tag']:
             if tag2a.endswith('1') and self.tag_locations[tag2a]:
                 tag2b = tag2a[:-1]
@@ -2940,6 +3594,45 @@ class UsfmCheck:
         for tag in self.user_defined_tags:
             self.record_error(("Warnings", "User-defined tags"), tag, None)
 
+    def load_tag_data(self, data_dir: Path) -> None:
+        """Sets tag_props and explanation_id_to_explanation from Bible_USFM_tag_data.jsonl and
+        Bible_USFM_explanations.txt in data_dir. The tag data is loaded only once per process and shared
+        (read-only) by all UsfmCheck instances. It is loaded from a precompiled pickle in the tag data cache
+        directory, keyed by a hash of the data files and this source code, or, if not available, from the data files
+        themselves (and then stored in the cache directory, replacing tag data cache files of earlier versions)."""
+        if tag_data := loaded_tag_data.get(data_dir):
+            self.tag_props, self.explanation_id_to_explanation = tag_data
+            return
+        tag_data_filename = data_dir / "Bible_USFM_tag_data.jsonl"
+        explanations_filename = data_dir / "Bible_USFM_explanations.txt"
+        version_hash = hashlib.sha256(f"usfm_check tag data {self.tag_data_cache_format_version}\n".encode())
+        for filename in (os.path.realpath(__file__), tag_data_filename, explanations_filename):
+            with open(filename, 'rb') as f:
+                version_hash.update(f.read())
+        cache_dir = general_util.cache_dir()
+        cache_filename = cache_dir / f"tag-data-{version_hash.hexdigest()}.pickle"
+        try:
+            with open(cache_filename, 'rb') as f:
+                self.tag_props, self.explanation_id_to_explanation = pickle.load(f)
+        except FileNotFoundError:
+            self.read_tag_prop_data(tag_data_filename)
+            self.read_usfm_explanations(explanations_filename)
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_filename = cache_dir / f"tag-data.{os.getpid()}.tmp"
+                with open(tmp_filename, 'wb') as f:
+                    pickle.dump((self.tag_props, self.explanation_id_to_explanation), f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_filename, cache_filename)  # atomic, in case of concurrent runs
+                general_util.prune_cache_files(cache_filename, "tag-data-*.pickle")
+            except OSError as error:
+                sys.stderr.write(f"Could not store precompiled tag data in {cache_dir}: {error}\n")
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as error:
+            sys.stderr.write(f"Ignoring unreadable tag data cache file {cache_filename}: {error}\n")
+            self.read_tag_prop_data(tag_data_filename)
+            self.read_usfm_explanations(explanations_filename)
+        loaded_tag_data[data_dir] = (self.tag_props, self.explanation_id_to_explanation)
+
     def add_item_to_tag_prop_list(self, key, item):
         if self.tag_props.get(key) is None:
             self.tag_props[key] = []
@@ -3396,37 +4089,30 @@ class UsfmCheck:
             self.current_book_id: str | None = None
             self.current_book_name: str | None = None
             self.current_book: str | None = None
+            if self.starts_with_book_id(filename):
+                self.current_chapter = 0
+                self.current_verse = None
+                self.current_verse_s = None
+            # else: continuation file, continuing the chapter and verse of the previous file
             if self.repair_dir:
                 repair_filename = self.repair_dir / file_basename
                 general_util.mkdirs_in_path(repair_filename)
                 self.repair_fh = open(repair_filename, 'w')
             fls = FileLineStruct(filename, sc=self)
             merge_markers = ('=======', '<<<<<<<', '>>>>>>>', '|||||||')
-            next_ls = fls.first_ls
-            while current_ls := next_ls:
-                next_ls = current_ls.next_ls
+            for current_ls in fls.raw_lines:
                 line = current_ls.s
                 line_number = current_ls.from_line_number
-                if (current_ls == fls.first_ls) and regex.match(r'\\id ', line):
-                    self.current_chapter = 0
-                    self.current_verse = None
-                    self.current_verse_s = None
                 for merge_marker in merge_markers:
                     if merge_marker in line:
                         error_cat = ('Severe errors', 'Unexpected merge conflict marker', merge_marker)
                         error_location = f"{file_basename} l.{line_number}"
                         self.record_error(error_cat, error_location, line)
-            fls.expand_usfm_verses(self)
-            fls.split_usfm_chapters_and_verses(self)
-            next_ls = fls.first_ls
-            current_revised_line_number = 0
             prev_key = None
             texts_for_current_key = set()
-            while current_ls := next_ls:
+            for current_revised_line_number, current_ls in enumerate(fls, 1):
                 # if 'MAT' in str(self.current_filename):
                 # sys.stderr.write(f"  TEST {current_ls}\n")  # todo
-                current_revised_line_number += 1
-                next_ls = current_ls.next_ls
                 line = current_ls.s
                 self.current_line = line
                 self.current_line_number_start = current_ls.from_line_number
@@ -3489,7 +4175,7 @@ class UsfmCheck:
                     self.bible_text_extract_dict[key] = bte
                 bte.add_so(so)
                 bte.check(so)
-                self.so_list.append(so)
+                self.ref_stats.collect_candidates(so)
                 if key != prev_key:
                     texts_for_current_key = set()
                 verse_texts = [bte.verse_text] if bte.verse_text else []
@@ -3501,6 +4187,108 @@ class UsfmCheck:
                 prev_key = key
             if self.repair_fh:
                 self.repair_fh.close()
+            self.bible_text_extract_spool.add_segment([(key, vars(bte))
+                                                       for key, bte in self.bible_text_extract_dict.items()])
+            self.bible_text_extract_dict = {}
+
+    def partial_state(self) -> dict:
+        """Results of reading file(s), without references to USFM objects, so that they can be pickled
+        and returned from a worker process."""
+        d = {}
+        for attribute in (self.summed_attributes + self.summed_int_attributes + self.set_union_attributes
+                          + self.list_concat_attributes + self.dict_update_attributes
+                          + self.end_of_file_attributes):
+            d[attribute] = getattr(self, attribute)
+        d['filenames'] = self.filenames
+        d['user_defined_tags'] = self.user_defined_tags
+        d['bible_text_extract_segments'] = list(self.bible_text_extract_spool.segments())
+        d['errors'] = self.errors.partial_state()
+        d['ref_stats'] = self.ref_stats.partial_state()
+        d['corpus_model'] = self.corpus_model.partial_state()
+        return d
+
+    def merge_partial_state(self, d: dict) -> None:
+        """Merges the partial state of a file into this UsfmCheck. Files must be merged in reading order."""
+        for attribute in self.summed_attributes:
+            counts = getattr(self, attribute)
+            for key, count in d[attribute].items():
+                counts[key] += count
+        for attribute in self.summed_int_attributes:
+            setattr(self, attribute, getattr(self, attribute) + d[attribute])
+        for attribute in self.set_union_attributes:
+            key_values = getattr(self, attribute)
+            for key, values in d[attribute].items():
+                key_values[key].update(values)
+        for attribute in self.list_concat_attributes:
+            key_lists = getattr(self, attribute)
+            for key, values in d[attribute].items():
+                key_lists[key].extend(values)
+        for attribute in self.dict_update_attributes:
+            getattr(self, attribute).update(d[attribute])
+        for attribute in self.end_of_file_attributes:
+            setattr(self, attribute, d[attribute])
+        self.filenames.extend(d['filenames'])
+        self.user_defined_tags.update(d['user_defined_tags'])
+        for segment in d['bible_text_extract_segments']:
+            self.bible_text_extract_spool.add_segment(segment)
+        self.errors.merge_partial_state(d['errors'])
+        self.ref_stats.merge_partial_state(d['ref_stats'])
+        self.corpus_model.merge_partial_state(d['corpus_model'])
+
+    @staticmethod
+    def starts_with_book_id(filename: Path) -> bool:
+        """False for a continuation file (without \\id), which continues the chapter and verse of the previous file"""
+        with open(filename, 'r', newline='') as f:
+            return bool(regex.match(r'\\id ', f.readline()))
+
+    def read_files(self, filenames: list[Path], n_workers: int = 1) -> None:
+        """Reads and checks files. With a cache (self.cache) or with several worker processes, each file is read
+        with its own UsfmCheck, and the partial states of cached and freshly read files are merged in file order,
+        so the result depends neither on worker scheduling nor on which files were cached.
+        Continuation files (see starts_with_book_id) depend on the state at the end of the previous file, so they
+        are neither cached nor read by workers, but read by this UsfmCheck when the previous files have been merged."""
+        if (self.cache is None) and ((n_workers <= 1) or (len(filenames) <= 1)):
+            for filename in filenames:
+                self.read_file(filename)
+            return
+        continuation_files = {filename for filename in filenames if not self.starts_with_book_id(filename)}
+        cache_keys = [self.cache.key(filename) if self.cache and (filename not in continuation_files) else None
+                      for filename in filenames]
+        partial_states = [self.cache.load(cache_key) if cache_key else None for cache_key in cache_keys]
+        new_filenames = [filename for filename, d in zip(filenames, partial_states)
+                         if (d is None) and (filename not in continuation_files)]
+        if self.cache:
+            n_cached = len(filenames) - len(new_filenames) - len(continuation_files)
+            sys.stderr.write(f"Cache {self.cache.directory}: {n_cached} cached, "
+                             f"{len(new_filenames)} new file{'' if len(new_filenames) == 1 else 's'}, "
+                             f"{len(continuation_files)} continuation "
+                             f"file{'' if len(continuation_files) == 1 else 's'}\n")
+        config = {'directory': self.dir, 'user': self.user, 'doc_config': self.doc_config,
+                  'lang_code': self.lang_code, 'bible_config': self.bible_config,
+                  'misc_data_dict': self.misc_data_dict, 'repair_dir': self.repair_dir}
+        if (n_workers > 1) and (len(new_filenames) > 1):
+            pool = multiprocessing.Pool(min(n_workers, len(new_filenames)), initializer=init_worker,
+                                        initargs=(config,))
+            # imap (as opposed to imap_unordered) returns results in file order, as soon as available.
+            new_partial_states = pool.imap(read_file_in_worker, new_filenames)
+        else:
+            pool = None
+            init_worker(config)
+            new_partial_states = map(read_file_in_worker, new_filenames)
+        try:
+            for filename, cache_key, d in zip(filenames, cache_keys, partial_states):
+                if filename in continuation_files:
+                    self.read_file(filename)
+                    continue
+                if d is None:
+                    d = next(new_partial_states)
+                    if cache_key:
+                        self.cache.store(cache_key, d)
+                self.merge_partial_state(d)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
 
     @staticmethod
     def regex_form(s: str) -> str:
@@ -3525,19 +4313,21 @@ class UsfmCheck:
                 if self.current_book_id and self.current_chapter and self.current_verse:
                     self.ellipsis_locations[ellipsis_s].append((error_location, quote))
 
-    def find_quote_in_verse_text(self, quote: str, verse_text: str) -> str | None:
+    @staticmethod
+    def find_quote_in_verse_text(quote: str, verse_text: str,
+                                 verse_text_index: VerseTextIndex | None = None) -> str | None:
         """
         quote might include ellipses
         quote might have different capitalization
         quote and verse_text might have different whitespace groups
         returns sub-string of verse_text matching quote (with any ellipses expanded), case non-sensitive
+        verse_text_index (optional): index of verse_text, to be reused for several quotes of the same verse
         """
-        if (position := verse_text.lower().find(quote.lower())) >= 0:
+        if verse_text_index is None:
+            verse_text_index = VerseTextIndex(verse_text)
+        if (position := verse_text_index.lower_verse_text.find(quote.lower())) >= 0:
             return verse_text[position:position+len(quote)]
-        re_quote = self.regex_form(quote)
-        if m := regex.search(re_quote, verse_text, flags=regex.IGNORECASE | regex.DOTALL):
-            return m[0]
-        return None
+        return verse_text_index.find(quote)
 
     @staticmethod
     def error_location_based_on_bte_key(bte_key: Tuple[str, str, str]) -> str:
@@ -3553,15 +4343,16 @@ class UsfmCheck:
 
     def check_bible_text_extracts(self) -> None:
         n = 0
-        for bte_key in self.bible_text_extract_dict:
-            bte = self.bible_text_extract_dict[bte_key]
+        for bte in self.bible_text_extract_spool:
+            bte_key = (bte.book_id, bte.chapter_number, bte.verse_number)
             verse_text = bte.verse_text.get('txt') if bte.verse_text else ''
+            verse_text_index = VerseTextIndex(verse_text) if bte.footnotes else None
             for footnote in bte.footnotes:
                 footnote_text = footnote.get('txt', '')
                 for quote in footnote.get('quotes', []):
                     n += 1
                     self.register_footnote_quote_ellipses(quote, bte_key)
-                    quote_in_verse_text = self.find_quote_in_verse_text(quote, verse_text)
+                    quote_in_verse_text = self.find_quote_in_verse_text(quote, verse_text, verse_text_index)
                     if not quote_in_verse_text:
                         # quote.lower() not in verse_text.lower():
                         error_cat_element = 'Footnote quotation does not appear in verse'
@@ -3760,6 +4551,25 @@ class UsfmCheck:
         f_log.write("  </ul>\n")
 
 
+def init_worker(config: dict) -> None:
+    worker_config.clear()
+    worker_config.update(config)
+
+
+def read_file_in_worker(filename: Path) -> dict:
+    usfm_check = UsfmCheck(directory=worker_config['directory'], user=worker_config['user'],
+                           doc_config=worker_config['doc_config'], lang_code=worker_config['lang_code'])
+    usfm_check.bible_config = worker_config['bible_config']
+    usfm_check.misc_data_dict = worker_config['misc_data_dict']
+    usfm_check.repair_dir = worker_config['repair_dir']
+    usfm_check.read_file(filename)
+    return usfm_check.partial_state()
+
+
+def color_verses_in_worker(jobs: list[tuple[str, tuple, str]]) -> list[str]:
+    return [render_worker_sc.color_verse(s, error_cat, error_loc) for s, error_cat, error_loc in jobs]
+
+
 def main() -> None:
     default_config_filenames = ['BibleTranslationConfig.jsonl']
 
@@ -3783,9 +4593,27 @@ def main() -> None:
                              f'default_config_filenames ({default_config_filenames}) if not provided as arg')
     parser.add_argument('-u', '--user', type=str, default=None, help='values: dev|translator')
     parser.add_argument('-m', '--misc_data_filename', default='../morph_variants.txt')
+    parser.add_argument('--cache', type=str, default=None, metavar='CACHE-DIRECTORY',
+                        help='(optional) directory of cached per-file results; only new or changed files are re-read')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='number of worker processes reading and checking files in parallel (default: 1)')
+    parser.add_argument('--letter_ngram_min_count', type=int, default=1, metavar='N',
+                        help='frequency floor for letter n-gram statistics (default: 1, i.e. all n-grams are '
+                             'counted exactly, in unbounded memory that grows with the vocabulary)')
+    parser.add_argument('--letter_ngram_max_exact_len', type=int, default=None, metavar='N',
+                        help='(optional) count letter n-grams longer than N approximately, in bounded memory '
+                             '(default: none, i.e. memory is unbounded)')
+    parser.add_argument('--scorecard_only', action='store_true',
+                        help='write only the scorecard (no text/HTML reports, extract, corpus statistics); '
+                             "alternatively, individual outputs can be disabled by filename 'None'")
     parser.add_argument('--s1', type=str, default=None, help='for testing')
     parser.add_argument('--s2', type=str, default=None, help='for testing')
     args = parser.parse_args()
+    if args.scorecard_only:
+        args.out = args.html = args.extract = 'None'
+    for output_arg in ('out', 'html', 'scorecard', 'extract'):
+        if getattr(args, output_arg) in ('None', ):
+            setattr(args, output_arg, None)
     if args.s1 and args.s2:
         d1, d2 = StringDiff(args.s1, args.s2).diff()
         sys.stderr.write(f"D1: {d1}\n")
@@ -3842,7 +4670,7 @@ def main() -> None:
         if not os.path.isdir(usfm_check.repair_dir):
             os.mkdir(usfm_check.repair_dir, mode=0o775)
     usfm_folder = 'usfm'
-    if not os.path.isdir(usfm_folder):
+    if not args.scorecard_only and not os.path.isdir(usfm_folder):
         os.mkdir(usfm_folder, mode=0o775)
     if args.html:
         full_html_output_filename = cwd / args.html
@@ -3880,12 +4708,17 @@ def main() -> None:
         print(usfm_check.error_report())
         return
     if args.filenames:
-        for filename in args.filenames:
-            usfm_check.read_file(usfm_check.dir / filename)
+        filenames = [usfm_check.dir / filename for filename in args.filenames]
     else:
-        for filename in sorted([f for f in listdir(usfm_check.dir) if isfile(join(usfm_check.dir, f))]):
-            if regex.search(r'\.u?sfm$', filename, regex.IGNORECASE):
-                usfm_check.read_file(usfm_check.dir / filename)
+        filenames = [usfm_check.dir / filename
+                     for filename in sorted([f for f in listdir(usfm_check.dir) if isfile(join(usfm_check.dir, f))])
+                     if regex.search(r'\.u?sfm$', filename, regex.IGNORECASE)]
+    if args.cache:
+        if usfm_check.repair_dir:
+            sys.stderr.write("Ignoring --cache, as repaired files (--repair) are written only when files are read\n")
+        else:
+            usfm_check.cache = PartialStateCache(args.cache, usfm_check)
+    usfm_check.read_files(filenames, args.workers)
     usfm_check.check_for_missing_verses()
     usfm_check.check_bible_text_extracts()
     usfm_check.check_for_inconsistent_ellipses()
@@ -3900,23 +4733,25 @@ def main() -> None:
                          f"{usfm_check.n_operations_in_split_usfm_chapters_and_verses}"
                          f"/{usfm_check.n_additional_lines_in_split_usfm_chapters_and_verses}\n")
     usfm_check.final_check()
-    if args.out:
-        general_util.mkdirs_in_path(args.out)
-        f_txt = open(args.out, 'w')
-    else:
-        f_txt = sys.stdout
     usfm_check.error_propagation()
-    f_txt.write(usfm_check.tag_stats() + '\n')
-    f_txt.write(usfm_check.error_report())
+    # Text and HTML reports are written as they are rendered (rather than first built in memory).
+    if args.scorecard_only:
+        pass
+    elif args.out == '':
+        sys.stdout.write(usfm_check.tag_stats() + '\n')
+        sys.stdout.writelines(usfm_check.error_report_parts())
+    elif args.out:
+        general_util.mkdirs_in_path(args.out)
+        with open(args.out, 'w') as f_txt:
+            f_txt.write(usfm_check.tag_stats() + '\n')
+            f_txt.writelines(usfm_check.error_report_parts())
     if f_html_out:
         f_html_out.write(f"Note: These Selected USFM (Paratext format) Checks "
                          f"are new and still under development.\n")
         f_html_out.write(f"<p><hr><p>\n")
         f_html_out.write(usfm_check.tag_stats(html_p=True) + '\n')
         f_html_out.write(f"<p><hr><p>\n")
-        f_html_out.write(usfm_check.error_report(html_p=True))
-    if args.out:
-        f_txt.close()
+        f_html_out.writelines(usfm_check.html_error_report_parts(args.workers))
     if args.scorecard:
         general_util.mkdirs_in_path(args.scorecard)
         with open(args.scorecard, 'w') as f_scorecard:
@@ -3928,8 +4763,10 @@ def main() -> None:
         print_html_foot(f_html_out)
         f_html_out.close()
         sys.stderr.write(f"Wrote HTML output to {full_html_output_filename}\n")
-    usfm_check.corpus_model.letter_ngram_stats()
-    usfm_check.corpus_model.report_stats(Path(usfm_folder) / "log-keyword-candidates.txt")
+    if not args.scorecard_only:
+        usfm_check.corpus_model.letter_ngram_stats(min_count=args.letter_ngram_min_count,
+                                                   max_exact_len=args.letter_ngram_max_exact_len)
+        usfm_check.corpus_model.report_stats(Path(usfm_folder) / "log-keyword-candidates.txt")
     if usfm_check.repair_counts[()]:
         # sys.stderr.write(f"Repair-key-values:{usfm_check.repair_key_values}\n")
         # sys.stderr.write(f"Repair-counts: {usfm_check.repair_counts}\n")
@@ -3942,12 +4779,11 @@ def main() -> None:
         #     for repair_location in repair_locations[0:max_n_repair_locations]:
         #         sys.stderr.write(f"    {repair_location}\n")
         usfm_check.repair_report_to_html()
-    if args.extract and args.extract not in ('None', ):
+    if args.extract:
         try:
             general_util.mkdirs_in_path(args.extract)
             with open(args.extract, 'w') as f_extract:
-                for key in usfm_check.bible_text_extract_dict:
-                    bte = usfm_check.bible_text_extract_dict.get(key)
+                for bte in usfm_check.bible_text_extract_spool:
                     f_extract.write(str(bte))
                 if usfm_check.extract_ignore_tag_count:
                     sys.stderr.write("  In extraction, ignored tags:")
@@ -5,39 +5,66 @@
 # Input: extract.jsonl, which is built by Greek Room tool usfm_check.py (which also checks the USFM files for problems).
 # Output 1: f_usfm.txt        corpus of verses
 # Output 2: f_usfm_vref.txt   file with corresponding verse IDs (same number of lines as f_usfm.txt)
+# Output 3 (optional, -s f_usfm.vrefcorpus): vref corpus store of outputs 1 and 2 (see vref_corpus_store.py)
+# Verses are written in canonical vref.txt order (reordered in a bounded buffer, see --reorder_buffer_size).
+# Batch of projects: extract_vref_txt_from_usfm_extract_jsonl.py --batch_input_filenames p1/extract.jsonl ...
+#                        --batch_output_dir DIR --workers 8   (writes DIR/p1.txt, DIR/p1_vref.txt, DIR/p1.log, ...)
 
+from __future__ import annotations
+from array import array
 import argparse
+from bisect import bisect_left
 from collections import defaultdict
+import heapq
 import json
+import multiprocessing
+import os
 from pathlib import Path
 import regex
 import sys
+from typing import Iterator, List, TextIO, Tuple
 from greekroom.gr_utilities import general_util
+from greekroom.versification.versification import BibleStructure, Versification
+from greekroom.versification.vref_corpus_store import VrefCorpusStore
+
+default_reorder_buffer_size = 10000
+
+
+normalization_regexes = {  # precompiled, as normalize_string is applied to every verse
+    'return': regex.compile(r'\r\n'),
+    'final-newline': regex.compile(r'\n$'),
+    'non-final-newline': regex.compile(r'\n'),
+    'tilde-dash': regex.compile(r'~([-–—―])'),
+    'dash-tilde': regex.compile(r'([-–—―])~'),
+    'other-tilde': regex.compile(r'~'),
+    'multi-space': regex.compile(r' {2,}'),
+}
+verse_range_regex = regex.compile(r'(\d+)-(\d+)$')
 
 
 def normalize_string(s: str, change_count_dict: dict, change_example_dict: dict, verse_id: str | None,
                      line_number: int | None) -> str:
     no_break_space = '\u00A0'
     s0 = s
-    s, count = regex.subn(r'\r\n', '\n', s)
+    s, count = normalization_regexes['return'].subn('\n', s)
     change_count_dict['return'] += count
-    s, count = regex.subn(r'\n$', ' ', s)
+    s, count = normalization_regexes['final-newline'].subn(' ', s)
     change_count_dict['final-newline'] += count
-    s, count = regex.subn(r'\n', ' ', s)
+    s, count = normalization_regexes['non-final-newline'].subn(' ', s)
     change_count_dict['non-final-newline'] += count
-    s, count = regex.subn(r'~([-–—―])', fr'{no_break_space}\1', s)
+    s, count = normalization_regexes['tilde-dash'].subn(fr'{no_break_space}\1', s)
     change_count_dict['tilde-dash'] += count
-    s, count = regex.subn(r'([-–—―])~', fr'\1{no_break_space}', s)
+    s, count = normalization_regexes['dash-tilde'].subn(fr'\1{no_break_space}', s)
     change_count_dict['dash-tilde'] += count
     s1 = s
-    s, count = regex.subn(r'~', no_break_space, s)
+    s, count = normalization_regexes['other-tilde'].subn(no_break_space, s)
     change_count_dict['other-tilde'] += count
     l_clause = f"l.{line_number} " if line_number else ""
     r_clause = f"{verse_id} " if verse_id else ""
     if s1 != s:
         change_example_dict['other-tilde'].append(f"{l_clause}{r_clause}{shorten_text(s0, 200)}")
     s1 = s
-    s, count = regex.subn(r' {2,}', ' ', s)
+    s, count = normalization_regexes['multi-space'].subn(' ', s)
     change_count_dict['multi-space'] += count
     if s1 != s:
         change_example_dict['multi-space'].append(f"{l_clause}{r_clause}{shorten_text(s0, 200)}")
@@ -52,86 +79,253 @@ def shorten_text(s: str, max_length: int) -> str:
     return f"{s[:max_length]} ..." if len(s) > max_length else s
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument('-i', '--input_filename', type=Path, help="Input USFM extract file (jsonl)")
-    parser.add_argument('-o', '--output_filename', type=Path, help="Plain text")
-    parser.add_argument('-v', '--vref_filename', type=Path, help="vref (e.g. GEN 1:1)")
-    args = parser.parse_args()
+class VrefOrder:
+    """Canonical verse order of a vref file (default: bundled data/vref.txt), indexed by packed verse ID
+    (see BibleStructure.pack_verse_id). Verse IDs not in the vref file are placed before the next verse of their book
+    in the vref file (e.g. descriptive title 'PSA 3:0' before 'PSA 3:1'), books not in the vref file at the end."""
+    def __init__(self, bible: BibleStructure, vref_filename: str | Path | None = None):
+        self.bible = bible
+        self.vref_positions = {}  # key: packed verse ID  value: line index in vref file
+        self.book_packed_verse_ids = defaultdict(lambda: array('q'))  # key: book number  value: sorted packed IDs
+        self.book_vref_positions = defaultdict(lambda: array('q'))    # key: book number  value: line indexes
+        n_lines = 0
+        with open(vref_filename or Versification.vref_filename()) as f_vref:
+            for line_index, line in enumerate(f_vref):
+                n_lines += 1
+                if ((packed_verse_id := bible.pack_verse_id(line.strip())) is not None) \
+                        and (packed_verse_id not in self.vref_positions):
+                    self.vref_positions[packed_verse_id] = line_index
+                    packed_verse_ids = self.book_packed_verse_ids[packed_verse_id >> 21]
+                    if (not packed_verse_ids) or (packed_verse_ids[-1] < packed_verse_id):
+                        packed_verse_ids.append(packed_verse_id)
+                        self.book_vref_positions[packed_verse_id >> 21].append(line_index)
+        self.n_lines = n_lines
+
+    def position(self, verse_id: str) -> float | None:
+        """Position of verse ID in canonical order; None for verse IDs that can't be packed"""
+        if (packed_verse_id := self.bible.pack_verse_id(verse_id)) is None:
+            return None
+        if (position := self.vref_positions.get(packed_verse_id)) is not None:
+            return position
+        if packed_verse_ids := self.book_packed_verse_ids.get(packed_verse_id >> 21):
+            vref_positions = self.book_vref_positions[packed_verse_id >> 21]
+            i = bisect_left(packed_verse_ids, packed_verse_id)
+            return (vref_positions[i] if i < len(vref_positions) else vref_positions[-1] + 1) - 0.5
+        return self.n_lines + packed_verse_id
+
+
+vref_order = None  # VrefOrder of bundled vref.txt, loaded once per process (see get_vref_order)
+
+
+def get_vref_order() -> VrefOrder:
+    global vref_order
+    if vref_order is None:
+        vref_order = VrefOrder(BibleStructure())
+    return vref_order
+
+
+class ReorderBuffer:
+    """Bounded buffer that reorders verses to canonical order (see VrefOrder) as they are streamed.
+    When the buffer is full, the verse first in canonical order is released. Verses that are out of order by more
+    than the buffer size are released out of order (counted in n_out_of_order). Verse IDs that can't be packed
+    keep their place after the preceding verse."""
+    def __init__(self, max_size: int, order: VrefOrder):
+        self.max_size = max_size
+        self.order = order
+        self.heap = []  # element: (position, sequence number, verse ID, text)
+        self.n_added = 0
+        self.last_position = -1.0           # of verse added last
+        self.last_released_position = -1.0
+        self.n_out_of_order = 0
+
+    def add(self, verse_id: str, txt: str) -> Iterator[Tuple[str, str]]:
+        """Adds verse; yields verses (verse ID, text) released from the buffer"""
+        if (position := self.order.position(verse_id)) is None:
+            position = self.last_position
+        self.last_position = position
+        heapq.heappush(self.heap, (position, self.n_added, verse_id, txt))
+        self.n_added += 1
+        while len(self.heap) > self.max_size:
+            yield self.release()
+
+    def flush(self) -> Iterator[Tuple[str, str]]:
+        while self.heap:
+            yield self.release()
+
+    def release(self) -> Tuple[str, str]:
+        position, _, verse_id, txt = heapq.heappop(self.heap)
+        if position < self.last_released_position:
+            self.n_out_of_order += 1
+        else:
+            self.last_released_position = position
+        return verse_id, txt
+
+
+def extract_verses(f_in: TextIO, change_count_dict: dict, change_example_dict: dict, f_log: TextIO,
+                   counts: dict) -> Iterator[Tuple[str, str]]:
+    """Streams verse IDs and normalized texts of verses and descriptive titles of a USFM extract (jsonl),
+    record by record, in extract order. Updates counts 'lines', 'verses', 'descriptive-titles'."""
     line_number = 0
-    n_verses = 0
-    n_descriptive_titles = 0
-    change_count_dict = defaultdict(int)
-    change_example_dict = defaultdict(list)
-    general_util.mkdirs_in_path(args.output_filename)
-    general_util.mkdirs_in_path(args.vref_filename)
-    with (open(args.input_filename) as f_in,
-          open(args.output_filename, 'w') as f_out,
-          open(args.vref_filename, 'w') as f_vref):
-        for line in f_in:
-            line_number += 1
-            line = line.strip()
-            if line.startswith("{"):
-                if d := json.loads(line):
-                    bk = d.get("bk")
-                    c = preferred_none_value(d.get("c"), 0)
-                    v = preferred_none_value(d.get("v"), 0)
-                    txt = d.get("txt")
-                    entry_type = d.get("type")
-                    tag = d.get("tag")
-                    if bk and txt and (entry_type == "v"):
-                        verse_id = f"{bk} {c}:{v}"
-                        txt = normalize_string(txt, change_count_dict, change_example_dict, verse_id, line_number)
-                        if c and v:
-                            if m := regex.match(r'(\d+)-(\d+)$', v):
-                                from_s, to_s = m.group(1, 2)
-                                from_i, to_i = int(from_s), int(to_s)
-                                if from_i < to_i:
-                                    texts = [txt] + (['<range>'] * (to_i - from_i))
-                                    for verse_number in range(from_i, to_i+1):
-                                        sys.stderr.write(f"{from_i}-{to_i} {verse_number} ''{txt}'' {texts} {verse_number-from_i}\n")
-                                        f_out.write(f"{texts[verse_number-from_i]}\n")
-                                        f_vref.write(f"{bk} {c}:{verse_number}\n")
-                                        n_verses += 1
-                                else:
-                                    sys.stderr.write(f"Skipping  {verse_id}  due to bad range  "
-                                                     f"{shorten_text(txt, 200)}\n")
-                            else:
-                                f_out.write(f"{txt}\n")
-                                f_vref.write(f"{verse_id}\n")
-                                n_verses += 1
-                        elif txt and (entry_type == "v"):
-                            sys.stderr.write(f"Skipping  {verse_id}  {shorten_text(txt, 200)}\n")
-                    if bk and txt and (entry_type == "o") and (tag == "d"):
-                        provisional_verse_id = f"{bk} ch.{c} descriptive-title"
-                        txt = normalize_string(txt, change_count_dict, change_example_dict, provisional_verse_id,
-                                               line_number)
-                        if c:
-                            if bk == "PSA":
-                                descriptive_title_id = f"{bk} {c}:0"
-                            elif (bk == "HAB") and (c == 3):
-                                descriptive_title_id = f"{bk} {c}:20"
+    for line in f_in:
+        line_number += 1
+        counts['lines'] = line_number
+        line = line.strip()
+        if line.startswith("{"):
+            if d := json.loads(line):
+                bk = d.get("bk")
+                c = preferred_none_value(d.get("c"), 0)
+                v = preferred_none_value(d.get("v"), 0)
+                txt = d.get("txt")
+                entry_type = d.get("type")
+                tag = d.get("tag")
+                if bk and txt and (entry_type == "v"):
+                    verse_id = f"{bk} {c}:{v}"
+                    txt = normalize_string(txt, change_count_dict, change_example_dict, verse_id, line_number)
+                    if c and v:
+                        if m := verse_range_regex.match(v):
+                            from_s, to_s = m.group(1, 2)
+                            from_i, to_i = int(from_s), int(to_s)
+                            if from_i < to_i:
+                                texts = [txt] + (['<range>'] * (to_i - from_i))
+                                for verse_number in range(from_i, to_i+1):
+                                    f_log.write(f"{from_i}-{to_i} {verse_number} ''{txt}'' {texts} "
+                                                f"{verse_number-from_i}\n")
+                                    counts['verses'] += 1
+                                    yield f"{bk} {c}:{verse_number}", texts[verse_number-from_i]
                             else:
-                                descriptive_title_id = None
-                                sys.stderr.write(f"Unexpected descriptive title in {d}\n")
-                            if descriptive_title_id:
-                                f_out.write(f"{txt}\n")
-                                f_vref.write(f"{descriptive_title_id}\n")
-                                n_descriptive_titles += 1
-                                # sys.stderr.write(f'Descriptive title {verse_id} "{txt}"\n')
+                                f_log.write(f"Skipping  {verse_id}  due to bad range  {shorten_text(txt, 200)}\n")
+                        else:
+                            counts['verses'] += 1
+                            yield verse_id, txt
+                    elif txt and (entry_type == "v"):
+                        f_log.write(f"Skipping  {verse_id}  {shorten_text(txt, 200)}\n")
+                if bk and txt and (entry_type == "o") and (tag == "d"):
+                    provisional_verse_id = f"{bk} ch.{c} descriptive-title"
+                    txt = normalize_string(txt, change_count_dict, change_example_dict, provisional_verse_id,
+                                           line_number)
+                    if c:
+                        if bk == "PSA":
+                            descriptive_title_id = f"{bk} {c}:0"
+                        elif (bk == "HAB") and (c == 3):
+                            descriptive_title_id = f"{bk} {c}:20"
                         else:
-                            sys.stderr.write(f"Skipping  {provisional_verse_id}  {shorten_text(txt, 200)}\n")
-    sys.stderr.write(f"Extracted {n_verses} verses and {n_descriptive_titles} descriptive titles "
-                     f"from {line_number} lines.\n")
-    sys.stderr.write(f"Change counts: {change_count_dict}\n")
+                            descriptive_title_id = None
+                            f_log.write(f"Unexpected descriptive title in {d}\n")
+                        if descriptive_title_id:
+                            counts['descriptive-titles'] += 1
+                            yield descriptive_title_id, txt
+                    else:
+                        f_log.write(f"Skipping  {provisional_verse_id}  {shorten_text(txt, 200)}\n")
+
+
+def extract_vref_txt(input_filename: str | Path, output_filename: str | Path, vref_filename: str | Path,
+                     f_log: TextIO = sys.stderr, reorder_buffer_size: int = default_reorder_buffer_size) -> dict:
+    """Streams a USFM extract (jsonl) into a corpus file and a matching verse ID file, in canonical verse order
+    (reordered in a buffer of reorder_buffer_size verses; 0: extract order), and reports to f_log.
+    Returns counts of 'lines', 'verses', 'descriptive-titles' and 'out-of-order' (verses written out of order)."""
+    counts = defaultdict(int)
+    change_count_dict = defaultdict(int)
+    change_example_dict = defaultdict(list)
+    reorder_buffer = ReorderBuffer(reorder_buffer_size, get_vref_order()) if reorder_buffer_size > 0 else None
+    general_util.mkdirs_in_path(str(output_filename))
+    general_util.mkdirs_in_path(str(vref_filename))
+    with (open(input_filename) as f_in,
+          open(output_filename, 'w') as f_out,
+          open(vref_filename, 'w') as f_vref):
+        verses = extract_verses(f_in, change_count_dict, change_example_dict, f_log, counts)
+        if reorder_buffer:
+            verses = (released_verse for verse in verses for released_verse in reorder_buffer.add(*verse))
+        for verse_id, txt in verses:
+            f_out.write(f"{txt}\n")
+            f_vref.write(f"{verse_id}\n")
+        if reorder_buffer:
+            for verse_id, txt in reorder_buffer.flush():
+                f_out.write(f"{txt}\n")
+                f_vref.write(f"{verse_id}\n")
+            counts['out-of-order'] = reorder_buffer.n_out_of_order
+    f_log.write(f"Extracted {counts['verses']} verses and {counts['descriptive-titles']} descriptive titles "
+                f"from {counts['lines']} lines.\n")
+    if counts['out-of-order']:
+        f_log.write(f"Wrote {counts['out-of-order']} verses out of canonical order "
+                    f"(reorder buffer size: {reorder_buffer_size})\n")
+    f_log.write(f"Change counts: {change_count_dict}\n")
     if change_example_dict:
         for example_class in change_example_dict.keys():
             examples = change_example_dict.get(example_class)
-            sys.stderr.write(f"{example_class} ({len(examples)})\n")
+            f_log.write(f"{example_class} ({len(examples)})\n")
             for i in range(min(10, len(examples))):
                 example = examples[i].replace('\n', '␤')
-                sys.stderr.write(f"   {example}\n")
-        # sys.stderr.write(f"Change examples: {change_example_dict}\n")
+                f_log.write(f"   {example}\n")
+    return counts
+
+
+def batch_output_name(input_filename: str) -> str:
+    """Name of project outputs in batch output dir, e.g. 'ABC' for 'projects/ABC/extract.jsonl'"""
+    path = Path(input_filename)
+    return path.parent.name if (path.stem == 'extract') and path.parent.name else path.stem
+
+
+def extract_in_worker(job: tuple) -> tuple:
+    input_filename, output_filename_core, reorder_buffer_size = job
+    with open(f'{output_filename_core}.log', 'w') as f_log:
+        counts = extract_vref_txt(input_filename, f'{output_filename_core}.txt', f'{output_filename_core}_vref.txt',
+                                  f_log, reorder_buffer_size)
+    return input_filename, counts['verses'], counts['descriptive-titles'], counts['out-of-order']
+
+
+def extract_batch(input_filenames: List[str], output_dir: str, n_workers: int = 1,
+                  reorder_buffer_size: int = default_reorder_buffer_size) -> List[tuple]:
+    """Extracts corpus and verse ID files of many projects, in parallel worker processes, to output_dir
+    (see batch_output_name), with a log file per project.
+    Returns a summary (input filename, number of verses, number of descriptive titles, number of verses written
+    out of order) per project."""
+    output_filename_cores = [os.path.join(output_dir, batch_output_name(input_filename))
+                             for input_filename in input_filenames]
+    if len(set(output_filename_cores)) < len(output_filename_cores):
+        raise ValueError(f"Batch input filenames with the same output name: {input_filenames}")
+    jobs = [(input_filename, output_filename_core, reorder_buffer_size)
+            for input_filename, output_filename_core in zip(input_filenames, output_filename_cores)]
+    os.makedirs(output_dir, exist_ok=True)
+    if reorder_buffer_size > 0:
+        get_vref_order()  # load once, before forking workers
+    if (n_workers > 1) and (len(jobs) > 1):
+        with multiprocessing.Pool(min(n_workers, len(jobs))) as pool:
+            return pool.map(extract_in_worker, jobs, chunksize=1)
+    return [extract_in_worker(job) for job in jobs]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input_filename', type=Path, help="Input USFM extract file (jsonl)")
+    parser.add_argument('-o', '--output_filename', type=Path, help="Plain text")
+    parser.add_argument('-v', '--vref_filename', type=Path, help="vref (e.g. GEN 1:1)")
+    parser.add_argument('-s', '--store_filename', type=Path, default=None,
+                        help="Optional vref corpus store of output (memory-mapped by other tools)")
+    parser.add_argument('--reorder_buffer_size', type=int, default=default_reorder_buffer_size, metavar='N',
+                        help=f"Max. number of verses buffered to write verses in canonical vref.txt order "
+                             f"(0: extract order; default: {default_reorder_buffer_size})")
+    parser.add_argument('--batch_input_filenames', nargs='+', metavar='FILENAME',
+                        help="USFM extract files of multiple projects (batch mode)")
+    parser.add_argument('--batch_output_dir', default='vref_batch', metavar='DIRECTORY',
+                        help="Output directory of batch mode (default: vref_batch)")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="Number of worker processes in batch mode (default: 1)")
+    args = parser.parse_args()
+    if args.batch_input_filenames:
+        summaries = extract_batch(args.batch_input_filenames, args.batch_output_dir, args.workers,
+                                  args.reorder_buffer_size)
+        for input_filename, n_verses, n_descriptive_titles, n_out_of_order in summaries:
+            out_of_order_clause = f" ({n_out_of_order} out of order)" if n_out_of_order else ""
+            sys.stderr.write(f"Extracted {n_verses} verses and {n_descriptive_titles} descriptive titles "
+                             f"from {input_filename}{out_of_order_clause}\n")
+        sys.stderr.write(f"Extracted {sum(summary[1] for summary in summaries)} verses from {len(summaries)} "
+                         f"projects to {args.batch_output_dir}\n")
+        return
+    extract_vref_txt(args.input_filename, args.output_filename, args.vref_filename, sys.stderr,
+                     args.reorder_buffer_size)
+    if args.store_filename:
+        n_lines = VrefCorpusStore.build(str(args.output_filename), str(args.vref_filename), str(args.store_filename))
+        sys.stderr.write(f"Wrote {n_lines} lines to vref corpus store {args.store_filename}\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+# Shared pytest fixtures of the versification tests
+
+import io
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from greekroom.versification.versification import BibleStructure, Versification
+
+
+@pytest.fixture
+def bible() -> BibleStructure:
+    """BibleStructure, with all standard versification schemas loaded (see Versification.load_versifications)"""
+    bible = BibleStructure()
+    if Versification.load_args is None:
+        Versification.load_versifications(bible, io.StringIO())
+    Versification.load_all_versifications()
+    return bible
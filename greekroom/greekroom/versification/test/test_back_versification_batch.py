@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+# Checks batch back-versification (BackVersification.compile_index, apply_batch) of reversified corpora,
+# refusal of batch outputs that would overwrite input corpora or each other,
+# batch diffs of back-versification files (BackVersification.diff_dirs),
+# and (main) measures back-versifying corpora one verse at a time (BackVersification.m) and with an index.
+
+from array import array
+import io
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from greekroom.versification.versification import (BackVersification, BibleStructure, ReversificationPlan,
+                                                   Versification, VersifiedCorpus)
+
+
+def reversify_corpus(schema: str, bible: BibleStructure, tmp_dir: str, verse_suffix: str = '') -> tuple:
+    """Writes a corpus in schema verse order and reversifies it to 'org'.
+    Returns corpus filename, verse ID filename, reversified corpus filename, back-versification filename."""
+    v = Versification.get_versification(schema)
+    verse_ids = [bible.verse_id(packed_verse_id) for packed_verse_id in v.packed_verse_ids]
+    corpus_filename, vref_filename, reversified_filename, bv_filename \
+        = (os.path.join(tmp_dir, f"{schema}{name}") for name in ('.txt', '_vref.txt', '_org.txt', '_bv.json'))
+    Path(corpus_filename).write_text(''.join(f"text of {verse_id}{verse_suffix}\n" for verse_id in verse_ids))
+    Path(vref_filename).write_text(''.join(verse_id + '\n' for verse_id in verse_ids))
+    plan = ReversificationPlan.from_files(v, vref_filename, Versification.vref_filename())
+    reversified_corpus = VersifiedCorpus.reversify_stream(corpus_filename, plan, reversified_filename, bible,
+                                                          io.StringIO())
+    Path(bv_filename).write_text(json.dumps(reversified_corpus.back_versification) + '\n')
+    return corpus_filename, vref_filename, reversified_filename, bv_filename
+
+
+def test_back_versify_batch(bible: BibleStructure):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_filename, vref_filename, reversified_filename, bv_filename = reversify_corpus('eng', bible, tmp_dir)
+        bv = BackVersification(bv_filename, verbose=False)
+        index = bv.compile_index(str(Versification.vref_filename()), vref_filename)
+        output_dir = os.path.join(tmp_dir, 'back')
+        os.makedirs(output_dir)
+        reversified_filename2 = os.path.join(tmp_dir, 'eng2_org.txt')
+        Path(reversified_filename2).write_text(Path(reversified_filename).read_text())
+        summaries = BackVersification.apply_batch([reversified_filename, reversified_filename2], index, output_dir, 2)
+        assert [summary[0] for summary in summaries] == [reversified_filename, reversified_filename2]
+        verses = Path(corpus_filename).read_text().splitlines()
+        back_verses = Path(output_dir, Path(reversified_filename).name).read_text().splitlines()
+        assert Path(output_dir, Path(reversified_filename2).name).read_text().splitlines() == back_verses
+        assert len(back_verses) == len(verses) and summaries[0][2] == sum(1 for verse in back_verses if verse)
+        with open(vref_filename) as f_vref, open(Versification.vref_filename()) as f_org_vref:
+            verse_ids, org_verse_ids = [line.strip() for line in f_vref], [line.strip() for line in f_org_vref]
+        org_books = set(verse_id.split()[0] for verse_id in org_verse_ids)
+        n_same, n_verses_in_org_books = 0, 0
+        for verse_id, verse, back_verse in zip(verse_ids, verses, back_verses):
+            n_verses_in_org_books += verse_id.split()[0] in org_books
+            if back_verse == verse:
+                n_same += 1
+            else:
+                assert (back_verse in ('', '<range>')) or (verse in back_verse), (verse, back_verse)
+        assert n_same > 0.99 * n_verses_in_org_books
+        reversified_verses = Path(reversified_filename).read_text().splitlines()
+        for verse_id, i, back_verse in zip(verse_ids, index, back_verses):
+            if i >= 0:
+                assert bv.back_verse_id(org_verse_ids[i]).startswith(verse_id)
+                assert back_verse == reversified_verses[i]
+
+
+def test_back_versify_batch_output_collisions():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.makedirs(os.path.join(tmp_dir, 'P2'))
+        corpus_filename, corpus_filename2 = os.path.join(tmp_dir, 'org.txt'), os.path.join(tmp_dir, 'P2', 'org.txt')
+        for filename in (corpus_filename, corpus_filename2):
+            Path(filename).write_text('verse 1\nverse 2\n')
+        index = array('q', [1, 0])
+        for corpus_filenames, output_dir in (([corpus_filename, corpus_filename2], os.path.join(tmp_dir, 'back')),
+                                             ([corpus_filename], tmp_dir)):
+            with pytest.raises(ValueError):
+                BackVersification.apply_batch(corpus_filenames, index, output_dir)
+        assert Path(corpus_filename).read_text() == 'verse 1\nverse 2\n'
+        assert not os.path.exists(os.path.join(tmp_dir, 'back'))
+
+
+def test_back_versification_diff_dirs():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dir1, dir2 = os.path.join(tmp_dir, 'bv1'), os.path.join(tmp_dir, 'bv2')
+        os.makedirs(dir1)
+        os.makedirs(dir2)
+        for dir_name, d in ((dir1, {'PSA 23:2': 'PSA 23:1', 'MAL 4:1': 'MAL 3:19'}),
+                            (dir2, {'PSA 23:2': 'PSA 23:1', 'MAL 4:1': 'MAL 3:20', 'JOL 3:1': 'JOL 2:28'})):
+            Path(dir_name, 'a.json').write_text(json.dumps(d))
+            Path(dir_name, 'b.json').write_text(json.dumps({'PSA 23:2': 'PSA 23:1'}))
+        Path(dir1, 'c.json').write_text('{}')
+        out = io.StringIO()
+        summaries = BackVersification.diff_dirs(dir1, dir2, 2, out)
+        assert [(Path(summary[0]).name, summary[2]) for summary in summaries] == [('a.json', 2), ('b.json', 0)]
+        assert summaries[0][3] == {'MAL 4:1': ('MAL 3:19', 'MAL 3:20'), 'JOL 3:1': (None, 'JOL 2:28')}
+        assert out.getvalue().splitlines()[:2] \
+               == [f"Back-versification files in only one of {dir1} and {dir2}: c.json",
+                   "Compared 2 back-versification file pairs: 1 with differences (2 differences in total)"]
+
+
+def main():
+    bible = BibleStructure()
+    Versification.load_versifications(bible, io.StringIO())
+    Versification.load_all_versifications()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _, vref_filename, reversified_filename, bv_filename = reversify_corpus('eng', bible, tmp_dir,
+                                                                               ' and more text' * 10)
+        bv = BackVersification(bv_filename, verbose=False)
+        n_corpora = 10
+        start_time = time.perf_counter()
+        for _ in range(n_corpora):
+            back_verse_by_id = {}
+            with open(Versification.vref_filename()) as f_org_vref, open(reversified_filename) as f_corpus:
+                for verse_id, verse in zip(f_org_vref, f_corpus):
+                    back_verse_by_id.setdefault(bv.m(verse_id.strip()), verse)
+            with open(vref_filename) as f_vref, open(os.path.join(tmp_dir, 'out.txt'), 'w') as f_out:
+                for verse_id in f_vref:
+                    f_out.write(back_verse_by_id.get(verse_id.strip(), '\n'))
+        print(f"Back-versified {n_corpora} corpora verse by verse in {time.perf_counter() - start_time:.3f} sec")
+        start_time = time.perf_counter()
+        index = bv.compile_index(str(Versification.vref_filename()), vref_filename)
+        print(f"Compiled back-versification index in {time.perf_counter() - start_time:.3f} sec")
+        output_dir = os.path.join(tmp_dir, 'back')
+        os.makedirs(output_dir)
+        corpus_filenames = []
+        for i in range(n_corpora):
+            corpus_filenames.append(os.path.join(tmp_dir, f"corpus{i}_org.txt"))
+            Path(corpus_filenames[-1]).write_text(Path(reversified_filename).read_text())
+        for n_workers in (1, 4):
+            start_time = time.perf_counter()
+            BackVersification.apply_batch(corpus_filenames, index, output_dir, n_workers)
+            print(f"Back-versified {n_corpora} corpora with index ({n_workers} workers) "
+                  f"in {time.perf_counter() - start_time:.3f} sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+# Checks that extract_vref_txt_from_usfm_extract_jsonl.py streams USFM extracts into corpus and verse ID files
+# in canonical vref.txt order (ReorderBuffer, VrefOrder), also in batch mode (extract_batch),
+# and (main) measures extracting a large synthetic project in extract order and in canonical order.
+
+import io
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from greekroom.versification.extract_vref_txt_from_usfm_extract_jsonl import (extract_batch, extract_vref_txt,
+                                                                             get_vref_order)
+from greekroom.versification.versification import Versification
+
+
+def write_extract_file(filename: str, books: list, seed: int = 0):
+    """USFM extract with verses of books in the given order, a verse range, descriptive titles and other entries"""
+    rand = random.Random(seed)
+    with open(Versification.vref_filename()) as f_vref:
+        verse_ids = [line.strip() for line in f_vref if line.split()[0] in books]
+    verse_ids.sort(key=lambda verse_id: books.index(verse_id.split()[0]))
+    with open(filename, 'w') as f:
+        for verse_id in verse_ids:
+            book, chapter_verse = verse_id.split()
+            chapter, verse = chapter_verse.split(':')
+            if (book == 'PSA') and (verse == '1') and (int(chapter) in (3, 4)):
+                f.write(json.dumps({'bk': book, 'c': chapter, 'v': None, 'txt': f"title of {book} {chapter}",
+                                    'type': 'o', 'tag': 'd'}) + '\n')
+            if verse_id == 'GEN 1:2':
+                continue  # part of range 'GEN 1:1-2'
+            v = '1-2' if verse_id == 'GEN 1:1' else verse
+            f.write(json.dumps({'bk': book, 'c': chapter, 'v': v, 'txt': f"text  of {verse_id}~{rand.random()}",
+                                'type': 'v'}) + '\n')
+            if verse_id == 'MAT 1:1':
+                f.write(json.dumps({'bk': book, 'c': chapter, 'v': '1,3', 'txt': "verse list", 'type': 'v'}) + '\n')
+                f.write(json.dumps({'bk': book, 'c': chapter, 'v': '1', 'txt': "footnote", 'type': 'f'}) + '\n')
+
+
+def read_verses(corpus_filename: str, vref_filename: str) -> list:
+    return list(zip(Path(vref_filename).read_text().splitlines(), Path(corpus_filename).read_text().splitlines()))
+
+
+def test_vref_order():
+    order = get_vref_order()
+    with open(Versification.vref_filename()) as f_vref:
+        verse_ids = [line.strip() for line in f_vref]
+    assert [order.position(verse_id) for verse_id in verse_ids] == list(range(len(verse_ids)))
+    assert order.position('PSA 3:1') - 1 < order.position('PSA 3:0') < order.position('PSA 3:1')
+    assert order.position('HAB 3:19') < order.position('HAB 3:20') < order.position('ZEP 1:1')
+    assert order.position('REV 22:21') < order.position('XXA 1:1')
+    assert order.position('MAT 1:1,3') is None
+
+
+def test_extract_vref_txt():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        extract_filename = os.path.join(tmp_dir, 'extract.jsonl')
+        write_extract_file(extract_filename, ['MAT', 'PSA', 'GEN', 'HAB'])
+        outputs = {}
+        for reorder_buffer_size in (0, 3, 100000):
+            corpus_filename, vref_filename = (os.path.join(tmp_dir, f"f{reorder_buffer_size}{suffix}.txt")
+                                              for suffix in ('', '_vref'))
+            f_log = io.StringIO()
+            counts = extract_vref_txt(extract_filename, corpus_filename, vref_filename, f_log, reorder_buffer_size)
+            outputs[reorder_buffer_size] = read_verses(corpus_filename, vref_filename)
+            assert counts['descriptive-titles'] == 2
+            assert (counts['out-of-order'] > 0) == (reorder_buffer_size == 3)
+            assert "Skipping  MAT 1:1,3  verse list" not in f_log.getvalue()
+        extract_order, canonical_order = outputs[0], outputs[100000]
+        assert sorted(extract_order) == sorted(canonical_order) == sorted(outputs[3])
+        assert extract_order[0][0] == 'MAT 1:1' and extract_order[1] == ('MAT 1:1,3', 'verse list')
+        assert canonical_order[0][0] == 'GEN 1:1' and canonical_order[0][1].startswith('text of GEN 1:1\u00A00.')
+        assert canonical_order[1] == ('GEN 1:2', '<range>')
+        verse_ids = [verse_id for verse_id, _ in canonical_order]
+        assert verse_ids.index('PSA 3:0') + 1 == verse_ids.index('PSA 3:1')
+        assert verse_ids.index('MAT 1:1,3') == verse_ids.index('MAT 1:1') + 1
+        assert verse_ids.index('HAB 3:19') < verse_ids.index('MAT 1:1')
+        order = get_vref_order()
+        positions = [order.position(verse_id) for verse_id in verse_ids if verse_id != 'MAT 1:1,3']
+        assert positions == sorted(positions)
+
+
+def test_extract_batch():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_filenames = []
+        for i, books in enumerate((['GEN', 'EXO'], ['MRK', 'JHN', 'LUK'], ['RUT'])):
+            os.makedirs(os.path.join(tmp_dir, f"P{i}"))
+            input_filenames.append(os.path.join(tmp_dir, f"P{i}", 'extract.jsonl'))
+            write_extract_file(input_filenames[-1], books, i)
+        output_dir = os.path.join(tmp_dir, 'vref')
+        summaries = extract_batch(input_filenames, output_dir, 2)
+        assert [summary[0] for summary in summaries] == input_filenames
+        for i, input_filename in enumerate(input_filenames):
+            corpus_filename, vref_filename = (os.path.join(tmp_dir, f"single{suffix}.txt")
+                                              for suffix in ('', '_vref'))
+            counts = extract_vref_txt(input_filename, corpus_filename, vref_filename, io.StringIO())
+            assert summaries[i][1:] == (counts['verses'], counts['descriptive-titles'], 0)
+            assert read_verses(os.path.join(output_dir, f"P{i}.txt"), os.path.join(output_dir, f"P{i}_vref.txt")) \
+                   == read_verses(corpus_filename, vref_filename)
+            assert f"Extracted {counts['verses']} verses" in Path(output_dir, f"P{i}.log").read_text()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        extract_filename = os.path.join(tmp_dir, 'extract.jsonl')
+        with open(Versification.vref_filename()) as f_vref:
+            books = list(dict.fromkeys(line.split()[0] for line in f_vref))
+        write_extract_file(extract_filename, sorted(books))
+        for reorder_buffer_size in (0, 100000):
+            start_time = time.perf_counter()
+            counts = extract_vref_txt(extract_filename, os.path.join(tmp_dir, 'f.txt'),
+                                      os.path.join(tmp_dir, 'f_vref.txt'), io.StringIO(), reorder_buffer_size)
+            print(f"Extracted {counts['verses']:,d} verses (reorder buffer size: {reorder_buffer_size}) "
+                  f"in {time.perf_counter() - start_time:.3f} sec")
+        input_filenames = []
+        for i in range(8):
+            input_filenames.append(os.path.join(tmp_dir, f"P{i}.jsonl"))
+            Path(input_filenames[-1]).write_text(Path(extract_filename).read_text())
+        for n_workers in (1, 4):
+            start_time = time.perf_counter()
+            extract_batch(input_filenames, os.path.join(tmp_dir, 'vref'), n_workers)
+            print(f"Extracted {len(input_filenames)} projects ({n_workers} workers) "
+                  f"in {time.perf_counter() - start_time:.3f} sec")
+
+
+if __name__ == "__main__":
+    main()
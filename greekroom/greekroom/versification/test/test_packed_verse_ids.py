@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+# Checks packed integer verse IDs (BibleStructure.pack_verse_id, incl. process-local book numbers), memoized verse
+# ID parsing and schema verse membership based on packed verse IDs, and (main) measures parsing the verse IDs of
+# vref.txt, loading the standard versification schemas and matching a corpus against them.
+
+import io
+import json
+from pathlib import Path
+import random
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from greekroom.usfm.ualign_utilities import BibleUtilities
+from greekroom.versification.versification import BibleStructure, Versification, VersificationMatch, VersifiedCorpus
+
+standard_mapping_dir = Path(__file__).resolve().parent.parent / 'data' / 'standard_mappings'
+
+
+def test_pack_verse_id():
+    bible = BibleStructure()
+    verse_ids = ['GEN 1:1', 'GEN 1:2', 'GEN 1:10', 'GEN 2:1', 'PSA 3:0', 'PSA 119:176', 'MAL 4:6', 'MAT 1:1',
+                 'REV 22:21', 'TOB 14:15', 'ESG 1:1a', 'ESG 1:1b']
+    packed_verse_ids = [bible.pack_verse_id(verse_id) for verse_id in verse_ids]
+    assert packed_verse_ids == sorted(packed_verse_ids)
+    assert [bible.verse_id(packed_verse_id) for packed_verse_id in packed_verse_ids] == verse_ids
+    assert bible.unpack_verse_id(bible.pack_verse_id('ESG 1:1b')) == ('ESG', 1, 1, 2)
+    assert bible.pack_verse_id('GEN 1:1') == (((1 << 16) + (1 << 8) + 1) << 5)
+    packed_verse_id = bible.pack_verse_id('XXA 2:3')  # not a Bible book
+    assert (packed_verse_id >> 21) > 100
+    assert BibleStructure().verse_id(packed_verse_id) == 'XXA 2:3'
+    assert bible.book_id(100 + int('LAO', 36)) == 'LAO'  # same book numbers in all processes
+    assert bible.persistable_packed_verse_id(packed_verse_id)
+    packed_verse_id = bible.pack_verse_id('Gen 2:3')  # dynamic (process-local) book number
+    assert (packed_verse_id >> 21) >= BibleStructure.first_dynamic_book_number
+    assert bible.verse_id(packed_verse_id) == 'Gen 2:3' and not bible.persistable_packed_verse_id(packed_verse_id)
+    for book_number in (40, max(BibleStructure.book_ids_by_number) + 1):
+        with pytest.raises(ValueError):
+            bible.book_id(book_number)
+    for verse_id in ('GEN 1:1-3', 'GEN  1:1', 'GEN 01:1', 'PSA 1:300', 'GEN 1', ''):
+        assert bible.pack_verse_id(verse_id) is None
+
+
+def test_memoized_verse_id_parsing():
+    bible = BibleStructure()
+    verse_ids = ['GEN 1:1', 'ESG 1:1a', 'XXA 2:3', 'GEN 1:1-3', 'GEN 01:1', 'GEN  1:1', 'PSA 1:300', '']
+    for _ in range(2):  # 2nd time from caches
+        assert [bible.pack_verse_id(verse_id) for verse_id in verse_ids][3:] == [None] * 5
+        assert [bible.verse_id(bible.pack_verse_id(verse_id)) for verse_id in verse_ids[:3]] == verse_ids[:3]
+        assert [Versification.split_verse_id(verse_id) for verse_id in verse_ids[:5]] \
+               == [('GEN', 1, 1, None), ('ESG', 1, '1a', None), ('XXA', 2, 3, None), ('GEN', 1, 1, 3),
+                   ('GEN', 1, 1, None)]
+        assert Versification.split_verse_id('Genesis 1') == (None, None, None, None)
+        assert [BibleUtilities.parse_snt_id(verse_id) for verse_id in ('GEN 1:1', 'GEN 1:1a', 'GEN 1:1-3')] \
+               == [('GEN', '1', '1'), ('GEN', '1', '1a'), None]
+        assert (BibleUtilities.book('REV 22:21'), BibleUtilities.chapter('REV 22:21'),
+                BibleUtilities.verse('REV 22:21')) == ('REV', '22', '21')
+    assert BibleStructure.packed_verse_id_cache['GEN 1:1-3'] is None
+    BibleStructure.packed_verse_id_cache.clear()
+    BibleStructure.verse_id_cache.clear()
+    assert bible.verse_id(bible.pack_verse_id('ESG 1:1a')) == 'ESG 1:1a'
+
+
+def test_schema_verse_membership(bible: BibleStructure):
+    for schema, v in Versification.versification_d.items():
+        with open(standard_mapping_dir / f"{schema}.json") as f:
+            max_verses_d = json.load(f)['maxVerses']
+        verse_ids = [f"{book} {chapter}:{verse}" for book, max_verses in max_verses_d.items()
+                     for chapter, max_verse in enumerate(max_verses, 1) for verse in range(1, int(max_verse) + 1)]
+        assert [bible.verse_id(packed_verse_id) for packed_verse_id in v.packed_verse_ids] == verse_ids
+        assert all(v.valid_verse_id(verse_id, bible) for verse_id in verse_ids)
+        assert all(v.dense_chapter_max_verse[book_chapter] == max_verse
+                   for book_chapter, max_verse in v.packed_chapter_max_verse.items()
+                   if book_chapter < len(v.dense_chapter_max_verse))
+        verse_id_set = set(verse_ids)
+        for verse_id in ('GEN 1:0', 'GEN 1:1a', 'GEN 1:1-2', 'GEN 01:1', 'GEN 51:1', 'PSA 150:7', 'XXA 1:1'):
+            assert v.valid_verse_id(verse_id, bible) == (verse_id in verse_id_set)
+
+
+def main():
+    bible = BibleStructure()
+    with open(Versification.vref_filename()) as f_vref:
+        verse_ids = [line.rstrip() for line in f_vref]
+    for parse in ('Parsed', 'Parsed again (memoized)'):
+        start_time = time.perf_counter()
+        packed_verse_ids = [bible.pack_verse_id(verse_id) for verse_id in verse_ids]
+        for packed_verse_id in packed_verse_ids:
+            if packed_verse_id is not None:
+                bible.verse_id(packed_verse_id)
+        for verse_id in verse_ids:
+            Versification.split_verse_id(verse_id)
+        print(f"{parse} {len(verse_ids):,d} verse IDs of vref.txt (pack, unpack, split) "
+              f"in {time.perf_counter() - start_time:.3f} sec")
+    start_time = time.perf_counter()
+    Versification.load_versifications(bible, io.StringIO())
+    Versification.load_all_versifications()
+    load_duration = time.perf_counter() - start_time
+    vc = VersifiedCorpus(None)
+    rand = random.Random(1)
+    for packed_verse_id in Versification.versification_d['eng'].packed_verse_ids:
+        if rand.random() < 0.98:
+            verse_id = bible.verse_id(packed_verse_id)
+            vc.vref2verse[verse_id] = f"text of {verse_id}"
+            book, chapter, _verse, _to_verse = Versification.split_verse_id(verse_id)
+            vc.chapters[(book, chapter)] += 1
+    sys.stderr = io.StringIO()
+    start_time = time.perf_counter()
+    costs = {schema: VersificationMatch(vc, v, bible).cost for schema, v in Versification.versification_d.items()}
+    match_duration = time.perf_counter() - start_time
+    sys.stderr = sys.__stderr__
+    print(f"Loaded {len(Versification.versification_d)} versification schemas in {load_duration:.3f} sec; "
+          f"matched corpus with {len(vc.vref2verse):,d} verses against them in {match_duration:.3f} sec; "
+          f"costs: {costs}")
+
+
+if __name__ == "__main__":
+    main()
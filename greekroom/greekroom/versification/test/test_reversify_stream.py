@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+# Checks that streaming reversification (VersifiedCorpus.reversify_stream, reversify_batch) writes the same
+# reversified corpus, back-versification and errors as load_corpus, reversify and write_corpus for all schemas,
+# that batch outputs never overwrite input corpora or each other,
+# and (main) measures both ways of reversifying a corpus.
+
+import io
+import os
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from greekroom.versification.versification import (BibleStructure, ReversificationPlan, Versification,
+                                                   VersifiedCorpus)
+
+
+def write_corpus_files(v: Versification, bible: BibleStructure, seed: int, tmp_dir: str,
+                       verse_suffix: str = '', n_swaps: int = 50) -> tuple[str, str]:
+    """Corpus in schema verse order (with mapped verses), with some empty, duplicate, <range> and shuffled lines"""
+    rand = random.Random(seed)
+    verse_ids = [bible.verse_id(packed_verse_id) for packed_verse_id in v.packed_verse_ids]
+    verse_ids += [verse_id for verse_id in v.verse_id_mapping_to_org.keys() if not v.valid_verse_id(verse_id, bible)]
+    verse_ids.sort(key=lambda verse_id: bible.pack_verse_id(verse_id) or 0)
+    verse_ids += rand.sample(verse_ids, 20) + ['XXA 1:1', 'GEN 1:1-3', '']
+    for _ in range(n_swaps):
+        i, j = rand.randrange(len(verse_ids)), rand.randrange(len(verse_ids))
+        verse_ids[i], verse_ids[j] = verse_ids[j], verse_ids[i]
+    verses = [rand.choice(['', '<range>']) if rand.random() < 0.05 else f"text of {verse_id}{verse_suffix}"
+              for verse_id in verse_ids]
+    corpus_filename, vref_filename = os.path.join(tmp_dir, f"{v.schema}.txt"), os.path.join(tmp_dir, "vref.txt")
+    Path(corpus_filename).write_text(''.join(verse + '\n' for verse in verses) + 'line without verse ID\n')
+    Path(vref_filename).write_text(''.join(verse_id + '\n' for verse_id in verse_ids))
+    return corpus_filename, vref_filename
+
+
+def reversify(corpus_filename: str, vref_filename: str, v: Versification, output_corpus_filename: str,
+              bible: BibleStructure) -> VersifiedCorpus:
+    vc = VersifiedCorpus(v.schema)
+    vc.load_corpus(corpus_filename, vref_filename, io.StringIO())
+    reversified_corpus = vc.reversify(v, io.StringIO())
+    reversified_corpus.write_corpus(output_corpus_filename, Versification.vref_filename(), bible, io.StringIO())
+    return reversified_corpus
+
+
+def test_reversify_stream(bible: BibleStructure):
+    sys.stderr, orig_stderr = io.StringIO(), sys.stderr
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for seed, v in enumerate(Versification.versification_d.values()):
+                corpus_filename, vref_filename = write_corpus_files(v, bible, seed, tmp_dir)
+                reference_filename, stream_filename = (os.path.join(tmp_dir, f"{v.schema}-{name}.txt")
+                                                       for name in ('reference', 'stream'))
+                reference_vc = reversify(corpus_filename, vref_filename, v, reference_filename, bible)
+                plan = ReversificationPlan.from_files(v, vref_filename, Versification.vref_filename())
+                stream_vc = VersifiedCorpus.reversify_stream(corpus_filename, plan, stream_filename, bible,
+                                                             io.StringIO())
+                assert Path(stream_filename).read_text() == Path(reference_filename).read_text()
+                assert stream_vc.back_versification == reference_vc.back_versification
+                assert list(stream_vc.errors.items()) == list(reference_vc.errors.items())
+                assert dict(stream_vc.warnings) == dict(reference_vc.warnings)
+                if v.schema != 'org':
+                    assert plan.merge_source_verse_ids and reference_vc.back_versification
+                # batch of corpora with the same plan
+                output_dir = os.path.join(tmp_dir, f"batch-{v.schema}")
+                os.makedirs(output_dir)
+                summaries = VersifiedCorpus.reversify_batch([corpus_filename, stream_filename], plan, output_dir,
+                                                            Versification.vref_filename(), bible, 2)
+                assert [summary[0] for summary in summaries] == [corpus_filename, stream_filename]
+                assert summaries[0][1] == stream_vc.n_verses
+                assert (Path(output_dir, Path(corpus_filename).name).read_text()
+                        == Path(reference_filename).read_text())
+                assert Path(output_dir, f"{Path(corpus_filename).name}.back_versification.json").exists()
+    finally:
+        sys.stderr = orig_stderr
+
+
+def test_reversify_batch_output_collisions(bible: BibleStructure):
+    v = Versification.get_versification('eng')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_filename, vref_filename = write_corpus_files(v, bible, 0, tmp_dir)
+        plan = ReversificationPlan.from_files(v, vref_filename, Versification.vref_filename())
+        os.makedirs(os.path.join(tmp_dir, 'P2'))
+        corpus_filename2 = os.path.join(tmp_dir, 'P2', Path(corpus_filename).name)
+        Path(corpus_filename2).write_text(Path(corpus_filename).read_text())
+        corpus_text = Path(corpus_filename).read_text()
+        for corpus_filenames, output_dir in (([corpus_filename, corpus_filename2], os.path.join(tmp_dir, 'out')),
+                                             ([corpus_filename], tmp_dir),
+                                             ([corpus_filename2], os.path.join(tmp_dir, 'P2', '.'))):
+            with pytest.raises(ValueError):
+                VersifiedCorpus.reversify_batch(corpus_filenames, plan, output_dir, Versification.vref_filename(),
+                                                bible)
+        assert Path(corpus_filename).read_text() == Path(corpus_filename2).read_text() == corpus_text
+        assert not os.path.exists(os.path.join(tmp_dir, 'out'))
+
+
+def main():
+    bible = BibleStructure()
+    Versification.load_versifications(bible, io.StringIO())
+    Versification.load_all_versifications()
+    v = Versification.versification_d['eng']
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_filename, vref_filename = write_corpus_files(v, bible, 1, tmp_dir, ' and more text' * 10, 0)
+        sys.stderr = io.StringIO()
+        start_time = time.perf_counter()
+        plan = ReversificationPlan.from_files(v, vref_filename, Versification.vref_filename())
+        print(f"Built reversification plan in {time.perf_counter() - start_time:.3f} sec", file=sys.__stdout__)
+        for name in ('load_corpus/reversify/write_corpus', 'reversify_stream (with shared plan)'):
+            durations = []
+            for trace_memory in (False, True):  # time without tracemalloc overhead
+                if trace_memory:
+                    tracemalloc.start()
+                start_time = time.perf_counter()
+                output_filename = os.path.join(tmp_dir, 'out.txt')
+                if name.startswith('reversify_stream'):
+                    VersifiedCorpus.reversify_stream(corpus_filename, plan, output_filename, bible, io.StringIO())
+                else:
+                    reversify(corpus_filename, vref_filename, v, output_filename, bible)
+                durations.append(time.perf_counter() - start_time)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"Reversified corpus from schema 'eng' with {name} in {durations[0]:.3f} sec, "
+                  f"peak memory {peak_memory / 1e6:.1f} MB", file=sys.__stdout__)
+        sys.stderr = sys.__stderr__
+
+
+if __name__ == "__main__":
+    main()
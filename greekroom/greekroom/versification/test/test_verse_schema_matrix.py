@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+# Checks that matching a corpus against all versification schemas at once (VerseSchemaMatrix.match) gives the same
+# overage and shortage verses as verse ID string lookups per schema, and (main) measures both ways of matching.
+
+import io
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from greekroom.versification.versification import (BibleStructure, Versification, VerseSchemaMatrix,
+                                                   VersificationMatch, VersifiedCorpus)
+
+
+def corpus_with_verse_ids(verse_ids: list) -> VersifiedCorpus:
+    vc = VersifiedCorpus(None)
+    for verse_id in verse_ids:
+        vc.vref2verse[verse_id] = f"text of {verse_id}"
+        book, chapter, _verse, _to_verse = Versification.split_verse_id(verse_id)
+        vc.chapters[(book, chapter)] += 1
+    return vc
+
+
+def random_corpus(bible: BibleStructure, seed: int) -> VersifiedCorpus:
+    rand = random.Random(seed)
+    verse_ids = [bible.verse_id(packed_verse_id)
+                 for packed_verse_id in Versification.get_verse_schema_matrix().verse_schema_masks
+                 if rand.random() < 0.7]
+    verse_ids = rand.sample(verse_ids, len(verse_ids) // 2)
+    verse_ids += ['PSA 3:0', 'PSA 1:0', 'PSA 11:0', 'HAB 3:20', 'GEN 1:1a', 'GEN 1:1-3', 'XXA 1:1', 'GEN  1:2',
+                  'GEN 01:1', 'PSA 119:300', 'MAT 17:21', 'REV 12:18', 'FRT 0:0', 'no verse ID']
+    return corpus_with_verse_ids(verse_ids)
+
+
+def string_based_match(vc: VersifiedCorpus, v: Versification, bible: BibleStructure) -> tuple[dict, dict]:
+    """Overage and shortage verses as computed with verse ID strings"""
+    schema_verse_ids = [bible.verse_id(packed_verse_id) for packed_verse_id in v.packed_verse_ids]
+    schema_verse_id_set = set(schema_verse_ids)
+    overage_chapters, shortage_chapters = {}, {}
+    for verse_id in vc.vref2verse.keys():
+        if verse_id not in schema_verse_id_set:
+            book, chapter, verse, _to_verse = v.split_verse_id(verse_id)
+            if (book is None) or (book not in bible.books):
+                continue
+            if ((book == "PSA") and (verse == 0)
+                    and ((v.schema in ('rsc', 'rso')) or (chapter in bible.psalms_with_descriptive_titles))):
+                continue
+            if verse_id in bible.post_verse_descriptive_titles_pseudo_verse_ids:
+                continue
+            overage_chapters.setdefault((book, chapter), []).append(verse_id)
+    for verse_id in schema_verse_ids:
+        if verse_id not in vc.vref2verse:
+            if verse_id in bible.often_omitted_verses + bible.verses_sometimes_merged_into_neighboring_verses:
+                continue
+            book, chapter, verse, _to_verse = v.split_verse_id(verse_id)
+            if vc.chapters.get((book, chapter)):
+                shortage_chapters.setdefault((book, chapter), []).append(verse_id)
+    return overage_chapters, shortage_chapters
+
+
+def test_verse_schema_matrix_match(bible: BibleStructure):
+    vc = random_corpus(bible, 1)
+    sys.stderr, orig_stderr = io.StringIO(), sys.stderr
+    try:
+        vms = Versification.get_verse_schema_matrix().match(vc, bible)
+        single_schema_vms = [VersificationMatch(vc, v, bible) for v in Versification.versification_d.values()]
+    finally:
+        sys.stderr = orig_stderr
+    assert [vm.schema for vm in vms] == list(Versification.versification_d.keys())
+    for vm, single_schema_vm in zip(vms, single_schema_vms):
+        v = Versification.versification_d[vm.schema]
+        overage_chapters, shortage_chapters = string_based_match(vc, v, bible)
+        assert vm.overage_chapters == overage_chapters
+        assert list(vm.shortage_chapters.items()) == list(shortage_chapters.items())
+        assert vm.cost == single_schema_vm.cost > 0
+        n_verses = sum(len(verse_ids) for d in (overage_chapters, shortage_chapters) for verse_ids in d.values())
+        assert vm.cost == len(overage_chapters) + len(shortage_chapters) + 10 * n_verses
+
+
+def test_matrix_masks(bible: BibleStructure):
+    matrix = VerseSchemaMatrix(list(Versification.versification_d.values())[:2])
+    org, eng = Versification.versification_d['org'], Versification.versification_d['eng']
+    assert matrix.schema_bits == {'org': 1, 'eng': 2}
+    for packed_verse_id, mask in matrix.verse_schema_masks.items():
+        assert mask == org.contains_packed_verse_id(packed_verse_id) + 2 * eng.contains_packed_verse_id(packed_verse_id)
+    assert matrix.includes('eng') and not matrix.includes('lxx')
+
+
+def main():
+    bible = BibleStructure()
+    Versification.load_versifications(bible, io.StringIO())
+    Versification.load_all_versifications()
+    vc = random_corpus(bible, 2)
+    sys.stderr = io.StringIO()
+    start_time = time.perf_counter()
+    Versification.get_verse_schema_matrix().match(vc, bible)
+    matrix_duration = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for v in Versification.versification_d.values():
+        VersificationMatch(vc, v, bible)
+    single_schema_duration = time.perf_counter() - start_time
+    sys.stderr = sys.__stderr__
+    print(f"Matched corpus with {len(vc.vref2verse):,d} verses against {len(Versification.versification_d)} schemas: "
+          f"all at once {matrix_duration:.3f} sec; one schema at a time {single_schema_duration:.3f} sec")
+
+
+if __name__ == "__main__":
+    main()
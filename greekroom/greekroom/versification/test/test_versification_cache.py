@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+# Checks that versification schemas loaded lazily from the precompiled schema cache are the same as schemas compiled
+# from their JSON files, also when precompiled in parallel (Versification.precompile_versifications), that the data
+# log of versification.py does not depend on the cache state and that stale cache files are deleted,
+# and (main) measures loading the schemas with and without the cache.
+
+import io
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from greekroom.versification.versification import BibleStructure, Versification
+
+
+def schema_data(v: Versification) -> tuple:
+    mapping_to_org = {verse_id: target if isinstance(target, str) else type(target).__name__
+                      for verse_id, target in v.verse_id_mapping_to_org.items()}
+    return (v.schema, list(v.packed_verse_ids), dict(v.chapter_max_verse), mapping_to_org, dict(v.errors),
+            dict(v.infos), v.n_books, v.n_chapters, v.n_verses, v.n_mappings)
+
+
+def load_all_versifications() -> tuple[list, str]:
+    """Schema data and data log, as in a new process (cache directory: $GREEKROOM_CACHE_DIR)"""
+    f_log = io.StringIO()
+    Versification.load_versifications(BibleStructure(), f_log)
+    versifications = Versification.load_all_versifications()
+    Versification.get_verse_schema_matrix()
+    return [schema_data(v) for v in versifications], f_log.getvalue()
+
+
+def test_versification_cache(greekroom_cache_dir: Path):
+    reference_data, reference_log = load_all_versifications()  # cold: from JSON files
+    assert [data[0] for data in reference_data] == ['org', 'eng', 'rsc', 'rso', 'vul', 'lxx']
+    assert 'Loading versification from' in reference_log
+    matrix = Versification.verse_schema_matrix
+    assert len(list(greekroom_cache_dir.glob('versification-*.pickle'))) == 6
+    assert load_all_versifications() == (reference_data, reference_log)  # from precompiled cache
+    assert Versification.verse_schema_matrix.verse_schema_masks == matrix.verse_schema_masks
+    assert Versification.verse_schema_matrix.schema_chapters == matrix.schema_chapters
+    cache_filename = next(greekroom_cache_dir.glob('versification-eng-*.pickle'))
+    cache_filename.write_bytes(b'corrupted')
+    assert load_all_versifications() == (reference_data, reference_log)  # unreadable: from JSON
+    # schemas are loaded on first use
+    Versification.load_versifications(BibleStructure(), io.StringIO())
+    assert not Versification.versification_d
+    assert Versification.get_verse_schema_matrix().schemas == ['org', 'eng', 'rsc', 'rso', 'vul', 'lxx']
+    assert Versification.get_versification('rso').schema == 'rso'
+    assert list(Versification.versification_d.keys()) == ['rso']
+    assert Versification.get_versification('xyz') is None
+
+
+def test_stale_cache_files_pruned(greekroom_cache_dir: Path):
+    load_all_versifications()
+    cache_filenames = set(greekroom_cache_dir.iterdir())
+    for pattern in ('versification-eng-*.pickle', 'verse-schema-matrix-*.pickle'):
+        cache_filename = next(greekroom_cache_dir.glob(pattern))
+        cache_filename.rename(greekroom_cache_dir / pattern.replace('*', 'earlier-version'))
+    load_all_versifications()
+    assert set(greekroom_cache_dir.iterdir()) == cache_filenames  # stale files replaced, other schemas kept
+
+
+def test_precompile_versifications(greekroom_cache_dir: Path):
+    reference_data, reference_log = load_all_versifications()
+    for cached_schema_filename in greekroom_cache_dir.glob('versification-*.pickle'):
+        if '-org-' not in cached_schema_filename.name:
+            cached_schema_filename.unlink()
+    f_log, f_report = io.StringIO(), io.StringIO()
+    Versification.load_versifications(BibleStructure(), f_log)
+    durations = Versification.precompile_versifications(2, f_report)
+    assert list(durations.keys()) == ['eng', 'rsc', 'rso', 'vul', 'lxx']
+    assert all(0 < check_duration < compile_duration for check_duration, compile_duration in durations.values())
+    assert "Checked versification schema 'eng' in" in f_report.getvalue()
+    assert [schema_data(v) for v in Versification.versification_d.values()] == reference_data
+    assert f_log.getvalue() == reference_log
+    Versification.load_versifications(BibleStructure(), io.StringIO())
+    f_report = io.StringIO()
+    assert Versification.precompile_versifications(2, f_report) == {}
+    assert "Skipped checks of 6 unchanged versification schemas" in f_report.getvalue()
+
+
+def test_data_log_independent_of_cache():
+    """The data log of versification.py (-d) covers all standard schemas, with a cold or a warm cache"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[3]))  # incl. GREEKROOM_CACHE_DIR
+        versification_script = str(Path(__file__).resolve().parents[1] / 'versification.py')
+        corpus_filename, vref_filename = os.path.join(tmp_dir, 'corpus.txt'), os.path.join(tmp_dir, 'vref.txt')
+        with open(Versification.vref_filename()) as f_vref:
+            verse_ids = [line.strip() for line, _ in zip(f_vref, range(100))]
+        Path(corpus_filename).write_text(''.join(f"text of {verse_id}\n" for verse_id in verse_ids))
+        Path(vref_filename).write_text(''.join(verse_id + '\n' for verse_id in verse_ids))
+        data_logs = []
+        for i in range(2):  # cold cache, warm cache
+            data_log_filename = os.path.join(tmp_dir, f"data_log{i}.txt")
+            subprocess.run([sys.executable, versification_script, '-i', corpus_filename, '-j', vref_filename,
+                            '-d', data_log_filename, '-l', os.path.join(tmp_dir, 'corpus_log.txt')],
+                           env=env, cwd=tmp_dir, capture_output=True, check=True)
+            data_logs.append(Path(data_log_filename).read_text())
+        assert data_logs[0] == data_logs[1]
+        assert data_logs[0].count('Loading versification from') == 6
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ['GREEKROOM_CACHE_DIR'] = cache_dir
+        for name in ('JSON files', 'precompiled cache'):
+            start_time = time.perf_counter()
+            load_all_versifications()
+            print(f"Loaded all versification schemas from {name} in {time.perf_counter() - start_time:.3f} sec")
+        start_time = time.perf_counter()
+        Versification.load_versifications(BibleStructure(), io.StringIO())
+        Versification.get_verse_schema_matrix()
+        Versification.get_versification('eng')
+        print(f"Loaded verse schema matrix and 'eng' schema from precompiled cache "
+              f"in {time.perf_counter() - start_time:.3f} sec")
+    for n_workers in (1, 4):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            os.environ['GREEKROOM_CACHE_DIR'] = cache_dir
+            Versification.load_versifications(BibleStructure(), io.StringIO())
+            Versification.precompile_versifications(n_workers, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+# Checks that the indexed verse alignment of versification_diff_html (find_matching_verses) finds the same anchor
+# verses as the original search that compares all verses within 20 lines, and (main) measures the alignment
+# of a corpus with many shifted and merged verses.
+
+from collections import defaultdict
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # versification_diff_html imports sibling module
+from versification_diff_html import find_matching_verses, VersePrefixIndex
+
+
+def reference_find_non_consecutive_matching_verses(s: str, line_number_to_verse_txt: dict,
+                                                   anchor_line_number_to_verse_txt: dict, center_line_number: int,
+                                                   prev_anchor_line_numbers: list) -> list:
+    """Original search (without index)"""
+    for abs_line_diff in range(0, 21):
+        for anchor_line_number in [center_line_number + abs_line_diff, center_line_number - abs_line_diff]:
+            if ((anchor_line_number not in prev_anchor_line_numbers)
+                    and (line_number_to_verse_txt[anchor_line_number]
+                         != anchor_line_number_to_verse_txt[anchor_line_number])):
+                anchor_verse_txt = anchor_line_number_to_verse_txt[anchor_line_number].rstrip()
+                if s.startswith(anchor_verse_txt):
+                    if remaining_text := s[len(anchor_verse_txt):].strip():
+                        if remaining_matches := reference_find_non_consecutive_matching_verses(
+                                remaining_text, line_number_to_verse_txt, anchor_line_number_to_verse_txt,
+                                anchor_line_number, prev_anchor_line_numbers + [anchor_line_number]):
+                            return [anchor_line_number] + remaining_matches
+                    else:
+                        return [anchor_line_number]
+    return []
+
+
+def reference_find_matching_verses(line_number: int, line_number_to_verse_txt: dict,
+                                   anchor_line_number_to_verse_txt: dict, verse_txt_to_anchor_line_numbers: dict,
+                                   prev_line_number_diff: int | None = None) -> list:
+    """Original search (without index)"""
+    verse_text = line_number_to_verse_txt[line_number]
+    if verse_text == '':
+        return []
+    anchor_verse_text = anchor_line_number_to_verse_txt[line_number]
+    if verse_text == anchor_verse_text:
+        return [line_number]
+    if anchor_line_numbers := verse_txt_to_anchor_line_numbers[verse_text]:
+        return [min(anchor_line_numbers, key=lambda anchor_line_number:
+                    (line_number - anchor_line_number != prev_line_number_diff, abs(line_number - anchor_line_number),
+                     anchor_line_number))]
+    for abs_line_diff in range(0, 21):
+        for anchor_start_line_number in [line_number - abs_line_diff, line_number + abs_line_diff]:
+            anchor_line_number = anchor_start_line_number
+            remaining_verse_text = verse_text.strip()
+            while remaining_verse_text:
+                anchor_verse_txt = anchor_line_number_to_verse_txt[anchor_line_number]
+                if remaining_verse_text.startswith(anchor_verse_txt.strip()):
+                    remaining_verse_text = remaining_verse_text[len(anchor_verse_txt.strip()):].strip()
+                    anchor_line_number += 1
+                else:
+                    break
+            if remaining_verse_text == '':
+                return list(range(anchor_start_line_number, anchor_line_number))
+    if result := reference_find_non_consecutive_matching_verses(verse_text.strip(), line_number_to_verse_txt,
+                                                                anchor_line_number_to_verse_txt, line_number, []):
+        return result
+    elif verse_text.startswith(anchor_verse_text):
+        return [line_number, 'unknown']
+    elif anchor_verse_text.startswith(verse_text):
+        return [line_number, 'start']
+    return []
+
+
+def random_corpora(seed: int, n_lines: int) -> tuple[dict, dict]:
+    """Anchor corpus and a corpus with shifted, merged, split and truncated verses (line number to verse text)"""
+    rand = random.Random(seed)
+    words = ['and', 'the', 'LORD', 'said', 'Selah.', 'unto', 'Moses', 'a', 'an']
+    anchor_verses = [' '.join(rand.choice(words) for _ in range(rand.randint(1, 4))) if rand.random() < 0.9 else ''
+                     for _ in range(n_lines)]
+    verses = list(anchor_verses)
+    for _ in range(n_lines // 5):
+        i = rand.randrange(n_lines - 6)
+        change = rand.choice(['shift', 'merge', 'non-consecutive merge', 'truncate', 'anchor merge'])
+        if change == 'shift':
+            verses[i:i + 5] = [''] + verses[i:i + 4]
+        elif change == 'merge':
+            verses[i:i + 3] = [' '.join(verses[i:i + 3]).strip(), '', '']
+        elif change == 'non-consecutive merge':
+            verses[i], verses[i + 2] = f"{verses[i]} {verses[i + 2]}".strip(), ''
+        elif change == 'truncate':
+            verses[i] = verses[i][:len(verses[i]) // 2].strip()
+        else:
+            anchor_verses[i:i + 2] = [' '.join(anchor_verses[i:i + 2]).strip(), '']
+    # lines at the end, same in both corpora (original search does not end for verses following the last line)
+    verses += [f"end {i}" for i in range(25)]
+    anchor_verses += [f"end {i}" for i in range(25)]
+    line_number_to_verse_txt, anchor_line_number_to_verse_txt = defaultdict(str), defaultdict(str)
+    for line_number, (verse, anchor_verse) in enumerate(zip(verses, anchor_verses), 1):
+        line_number_to_verse_txt[line_number] = verse
+        anchor_line_number_to_verse_txt[line_number] = anchor_verse
+    return line_number_to_verse_txt, anchor_line_number_to_verse_txt
+
+
+def test_find_matching_verses():
+    anchor = defaultdict(str, enumerate(['In the beginning', 'God created', 'the heaven', 'and the earth.',
+                                         'Let there be light', 'Selah.', 'And God said'] + [f'end {i}' for i in range(25)], 1))
+    verses = defaultdict(str, enumerate(['In the beginning God created', '', 'the heaven', 'And God said',
+                                         'and the earth.', 'Sel', '', 'In the beginning and the earth.']
+                                        + [f'end {i}' for i in range(24)], 1))
+    anchor_verse_index = VersePrefixIndex(anchor)
+    assert anchor_verse_index.short_verse_txt_lengths == {5, 6}  # "Selah.", "end 0"
+    assert find_matching_verses(1, verses, anchor, anchor_verse_index) == [1, 2]  # consecutive merge
+    assert find_matching_verses(3, verses, anchor, anchor_verse_index) == [3]
+    assert find_matching_verses(4, verses, anchor, anchor_verse_index) == [7]  # shifted
+    assert find_matching_verses(6, verses, anchor, anchor_verse_index) == [6, 'start']
+    assert find_matching_verses(8, verses, anchor, anchor_verse_index) == [1, 4]  # non-consecutive merge
+
+
+def test_same_as_reference_search():
+    for seed in range(10):
+        line_number_to_verse_txt, anchor_line_number_to_verse_txt = random_corpora(seed, 200)
+        anchor_verse_index = VersePrefixIndex(anchor_line_number_to_verse_txt)
+        verse_txt_to_anchor_line_numbers = defaultdict(list)
+        for line_number, verse_txt in list(anchor_line_number_to_verse_txt.items()):
+            verse_txt_to_anchor_line_numbers[verse_txt].append(line_number)
+        prev_line_number_diff = None
+        for line_number in range(1, anchor_verse_index.n_lines + 1):
+            result = find_matching_verses(line_number, line_number_to_verse_txt, anchor_line_number_to_verse_txt,
+                                          anchor_verse_index, prev_line_number_diff)
+            assert result == reference_find_matching_verses(line_number, line_number_to_verse_txt,
+                                                            anchor_line_number_to_verse_txt,
+                                                            verse_txt_to_anchor_line_numbers, prev_line_number_diff)
+            prev_line_number_diff = (line_number - result[0]) if len(result) == 1 else None
+
+
+def main():
+    line_number_to_verse_txt, anchor_line_number_to_verse_txt = random_corpora(1, 30000)
+    start_time = time.perf_counter()
+    anchor_verse_index = VersePrefixIndex(anchor_line_number_to_verse_txt)
+    n_matches = sum(1 for line_number in range(1, anchor_verse_index.n_lines + 1)
+                    if find_matching_verses(line_number, line_number_to_verse_txt, anchor_line_number_to_verse_txt,
+                                            anchor_verse_index))
+    print(f"Aligned {anchor_verse_index.n_lines:,d} verses ({n_matches:,d} matched) "
+          f"in {time.perf_counter() - start_time:.3f} sec")
+
+
+if __name__ == "__main__":
+    main()
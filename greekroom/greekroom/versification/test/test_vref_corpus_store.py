@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+# Checks that a vref corpus store (VrefCorpusStore) returns the same verse IDs and lines as the corpus and vref files
+# it was built from, also in a new process, and that the corpus loaders (general_util.Corpus, verse_inspection.Corpus,
+# VersifiedCorpus.load_corpus) load the same verses from a store as from the files,
+# and (main) measures loading and random verse access of a store against loading the files.
+
+import io
+import os
+from pathlib import Path
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from greekroom.gr_utilities import general_util
+from greekroom.versification.versification import Versification, VersifiedCorpus
+from greekroom.versification.vref_corpus_store import VrefCorpusStore
+from greekroom.versification import verse_inspection
+
+
+def write_corpus_files(seed: int, tmp_dir: str, n_verses: int | None = None) -> tuple[str, str]:
+    """Corpus with vref.txt verse IDs and some empty, blank, duplicate, non-standard and missing verse IDs"""
+    rand = random.Random(seed)
+    with open(Versification.vref_filename()) as f_vref:
+        verse_ids = [line.rstrip() for line in f_vref]
+    if n_verses:
+        verse_ids = verse_ids[:n_verses]
+    else:
+        verse_ids = verse_ids[:2000] + rand.sample(verse_ids, 50)
+        verse_ids += ['', '', 'GEN 1:1-3', 'XXA 1:1', 'PSA 3:1a', 'GEN 1:1 ', 'Genesis 1:1', 'GEN 1:1']
+        rand.shuffle(verse_ids)
+    verses = [rand.choice(['', '  ', '<range>', 'tab\tinside ']) if rand.random() < 0.1
+              else f"Ünïcode text of {verse_id} " + 'more ' * rand.randrange(20) for verse_id in verse_ids]
+    corpus_filename, vref_filename = os.path.join(tmp_dir, 'corpus.txt'), os.path.join(tmp_dir, 'vref.txt')
+    Path(corpus_filename).write_text(''.join(verse + '\n' for verse in verses) + 'line 1 without verse ID\n'
+                                     + 'line 2 without verse ID')
+    Path(vref_filename).write_text(''.join(verse_id + '\n' for verse_id in verse_ids))
+    return corpus_filename, vref_filename
+
+
+def test_store_same_as_files():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_filename, vref_filename = write_corpus_files(1, tmp_dir)
+        store_filename = os.path.join(tmp_dir, 'corpus.vrefcorpus')
+        n_lines = VrefCorpusStore.build(corpus_filename, vref_filename, store_filename)
+        assert VrefCorpusStore.is_store_file(store_filename) and not VrefCorpusStore.is_store_file(corpus_filename)
+        store = VrefCorpusStore(store_filename)
+        assert list(store.lines()) == list(VrefCorpusStore.read_corpus_files(corpus_filename, vref_filename))
+        assert n_lines == len(store) == len(Path(corpus_filename).read_text().splitlines())
+        assert store.verse_id(n_lines - 1) is None
+        verse_id_line_indexes = {}
+        for line_index, (verse_id, _line) in enumerate(store.lines()):
+            if verse_id is not None:
+                verse_id_line_indexes.setdefault(verse_id, []).append(line_index)
+        for verse_id, line_indexes in verse_id_line_indexes.items():
+            assert store.line_indexes(verse_id) == line_indexes
+        assert len(store.line_indexes('GEN 1:1')) >= 3  # incl. 'GEN 1:1 '
+        assert store.line_indexes('GEN 1:2-3') == store.line_indexes('XXB 1:1') == []
+        store.close()
+
+
+def test_store_read_by_new_process():
+    """Verse IDs with process-local book numbers (e.g. 'Gen') must be read back the same by another process"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        verse_ids = ['mat 2:3', 'Gen 1:1', 'GEN 1:1', 'GENESIS 1:1', 'LAO 1:1', 'Gen 1:1']
+        store_filename = os.path.join(tmp_dir, 'corpus.vrefcorpus')
+        VrefCorpusStore.write_store(store_filename, [(verse_id, f"text {i}") for i, verse_id in enumerate(verse_ids)])
+        script = (f"import sys; sys.path.insert(0, {str(Path(__file__).resolve().parents[3])!r})\n"
+                  f"from greekroom.versification.vref_corpus_store import VrefCorpusStore\n"
+                  f"store = VrefCorpusStore({store_filename!r})\n"
+                  f"print([store.verse_id(i) for i in range(len(store))])\n"
+                  f"print([store.line_indexes(verse_id) for verse_id in {verse_ids!r}])\n")
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+        assert output.splitlines() == [str(verse_ids), str([[0], [1, 5], [2], [3], [4], [1, 5]])]
+
+
+def test_loaders_same_as_files():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_filename, vref_filename = write_corpus_files(2, tmp_dir)
+        store_filename = os.path.join(tmp_dir, 'corpus.vrefcorpus')
+        VrefCorpusStore.build(corpus_filename, vref_filename, store_filename)
+        file_corpus, store_corpus = general_util.Corpus(), general_util.Corpus()
+        assert (file_corpus.load_corpus_with_vref(corpus_filename, vref_filename)
+                == (store_corpus.load_corpus_from_store(VrefCorpusStore(store_filename)), ""))
+        assert list(file_corpus.get_snt_ids()) == store_corpus.get_snt_ids()
+        for snt_id in list(file_corpus.get_snt_ids()) + ['GEN 1:2-3']:
+            assert file_corpus.lookup_snt(snt_id) == store_corpus.lookup_snt(snt_id)
+        store_corpus.reset()
+        file_corpus = verse_inspection.Corpus(corpus_filename, vref_filename, None)
+        store_corpus = verse_inspection.Corpus(store_filename, None, None)
+        assert file_corpus.n_entries == store_corpus.n_entries
+        for line_number in range(len(Path(corpus_filename).read_text().splitlines()) + 2):
+            vref = file_corpus.lookup_ref(line_number)
+            assert vref == store_corpus.lookup_ref(line_number)
+            assert file_corpus.lookup_line_number(vref) == store_corpus.lookup_line_number(vref)
+            assert file_corpus.lookup_verse(vref) == store_corpus.lookup_verse(vref)
+        file_vc, store_vc = VersifiedCorpus(None), VersifiedCorpus(None)
+        sys.stderr, orig_stderr = io.StringIO(), sys.stderr
+        try:
+            file_vc.load_corpus(corpus_filename, vref_filename, io.StringIO())
+            store_vc.load_corpus(store_filename, None, io.StringIO())
+        finally:
+            sys.stderr = orig_stderr
+        assert list(file_vc.vref2verse.items()) == list(store_vc.vref2verse.items())
+        assert (file_vc.errors, file_vc.books, file_vc.chapters, file_vc.n_range_lines) \
+               == (store_vc.errors, store_vc.books, store_vc.chapters, store_vc.n_range_lines)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_filename, vref_filename = write_corpus_files(3, tmp_dir, 100000)
+        store_filename = os.path.join(tmp_dir, 'corpus.vrefcorpus')
+        start_time = time.perf_counter()
+        VrefCorpusStore.build(corpus_filename, vref_filename, store_filename)
+        print(f"Built vref corpus store in {time.perf_counter() - start_time:.3f} sec")
+        verse_ids = random.Random(3).sample(Path(vref_filename).read_text().splitlines(), 10000)
+        start_time = time.perf_counter()
+        corpus = general_util.Corpus()
+        corpus.load_corpus_with_vref(corpus_filename, vref_filename)
+        load_duration = time.perf_counter() - start_time
+        for verse_id in verse_ids:
+            corpus.lookup_snt(verse_id)
+        print(f"Corpus and vref files: loaded in {load_duration:.3f} sec, "
+              f"{len(verse_ids):,d} lookups in {time.perf_counter() - start_time - load_duration:.3f} sec")
+        start_time = time.perf_counter()
+        corpus = general_util.Corpus()
+        corpus.load_corpus_from_store(VrefCorpusStore(store_filename))
+        load_duration = time.perf_counter() - start_time
+        for verse_id in verse_ids:
+            corpus.lookup_snt(verse_id)
+        print(f"Vref corpus store: opened in {load_duration:.3f} sec, "
+              f"{len(verse_ids):,d} lookups in {time.perf_counter() - start_time - load_duration:.3f} sec")
+        corpus.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,12 @@ import json
 import os
 import regex
 import sys
+from greekroom.versification.vref_corpus_store import VrefCorpusStore
 
 
 class Corpus:
-    def __init__(self, corpus_filename: str, vref_filename: str, legend: str | None):
+    def __init__(self, corpus_filename: str, vref_filename: str | None, legend: str | None):
+        """corpus_filename can also be a vref corpus store (see vref_corpus_store.py; vref_filename then not needed)"""
         self.corpus_filename = corpus_filename
         self.vref_filename = vref_filename
         self.legend = legend
@@ -21,6 +23,12 @@ class Corpus:
         self.line_number2ref = {}
         self.ref2line_number = {}
         self.n_entries = 0
+        self.store = None
+        if VrefCorpusStore.is_store_file(corpus_filename):
+            self.store = VrefCorpusStore(corpus_filename)
+            self.n_entries = sum(1 for line_index in range(self.store.n_vref_lines)
+                                 if self.store.line_flags[line_index] and self.store.verse_id(line_index))
+            return
         with open(corpus_filename) as f_corpus, open(vref_filename) as f_vref:
             line_number = 0
             for line in f_corpus:
@@ -36,6 +44,33 @@ class Corpus:
     def __repr__(self) -> str:
         return f"Corpus {self.legend or os.path.basename(self.corpus_filename)} with {self.n_entries} entries"
 
+    def store_line_index(self, vref: str | None) -> int | None:
+        """Index of last non-empty store line with vref"""
+        if vref:
+            for line_index in reversed(self.store.line_indexes(vref)):
+                if not self.store.line_is_blank(line_index):
+                    return line_index
+        return None
+
+    def lookup_line_number(self, vref: str | None) -> int | None:
+        if self.store is None:
+            return self.ref2line_number.get(vref)
+        line_index = self.store_line_index(vref)
+        return None if line_index is None else line_index + 1
+
+    def lookup_ref(self, line_number: int) -> str | None:
+        if self.store is None:
+            return self.line_number2ref.get(line_number)
+        if (1 <= line_number <= self.store.n_vref_lines) and not self.store.line_is_blank(line_number - 1):
+            return self.store.verse_id(line_number - 1) or None
+        return None
+
+    def lookup_verse(self, vref: str | None) -> str | None:
+        if self.store is None:
+            return self.ref2verse.get(vref)
+        line_index = self.store_line_index(vref)
+        return None if line_index is None else self.store.line(line_index).rstrip()
+
 
 def full_filename(filename: str, default_dir: str) -> str:
     return filename if filename.startswith("/") else f"{default_dir}/{filename}"
@@ -68,13 +103,13 @@ def load_config(config_filename: str) -> dict:
 
 
 def smart_verse_line_number(corpus: Corpus, verse_ref: str) -> int | None:
-    if verse_line_number := corpus.ref2line_number.get(verse_ref):
+    if verse_line_number := corpus.lookup_line_number(verse_ref):
         return verse_line_number
     if m := regex.match(r'(.*):(\d+)\s*$', verse_ref):
         book_chapter, verse_number_s = m.group(1, 2)
         verse_number = int(verse_number_s)
         for offset in (1, -1, 2, -2):
-            if neighbor_verse_line_number := corpus.ref2line_number.get(f"{book_chapter}:{verse_number+offset}"):
+            if neighbor_verse_line_number := corpus.lookup_line_number(f"{book_chapter}:{verse_number+offset}"):
                 return neighbor_verse_line_number - offset
     return None
 
@@ -88,8 +123,8 @@ def show_verses_across_corpora(d: dict):
             if verse_line_number:
                 for line_number in range(verse_line_number - d.get('window-size'),
                                          verse_line_number + d.get('window-size') + 1):
-                    vref = corpus.line_number2ref.get(line_number)
-                    verse = corpus.ref2verse.get(vref)
+                    vref = corpus.lookup_ref(line_number)
+                    verse = corpus.lookup_verse(vref)
                     symbol = ">" if line_number == verse_line_number else " "
                     if (vref is None) and (verse is None):
                         print(f"  {symbol} None")
@@ -3,22 +3,54 @@
 # versification.py
 # versification.py -i f_usfm.txt -j f_usfm_vref.txt
 # versification.py -i f_usfm.txt -j f_usfm_vref.txt -o f_usfm_reversified.txt -t ../vref.txt
+# versification.py -s eng -j f_usfm_vref.txt --batch_input_corpus_filenames f1.txt f2.txt --batch_output_dir rev --workers 4
+# versification.py -b back_versification.json -j f_usfm_vref.txt --back_versify_batch org1.txt org2.txt --workers 4
+# versification.py --back_versification_diff_dirs bv_dir1 bv_dir2 --workers 4
+# versification.py -i f_usfm.vrefcorpus -o f_usfm_reversified.txt   (vref corpus store, see vref_corpus_store.py)
 
 from __future__ import annotations
+from array import array
 import argparse
-from collections import defaultdict
+from collections import defaultdict, deque
+import hashlib
+import io
 import json
+import multiprocessing
 import os
 from pathlib import Path
+import pickle
 import regex
 import sys
+import time
 from typing import List, TextIO, Tuple
 from greekroom.gr_utilities import general_util
 from greekroom.usfm.ualign_utilities import BibleUtilities
 
+reversify_worker_plan = None  # ReversificationPlan shared with forked workers of VersifiedCorpus.reversify_batch
+back_versify_worker_index = None  # index remapping array shared with forked workers of BackVersification.apply_batch
+
 
 class BibleStructure:
     """This class holds some Bible-specific data."""
+    # Book numbers for packed verse IDs, shared by all instances: Bible book sorting numbers (see below),
+    # other 3-character book IDs (e.g. 'DAG', 'LAO', 'XXA') 100 + book ID read as base-36 number (so that packed
+    # verse IDs are the same in all processes, e.g. in precompiled schemas), any other book IDs (e.g. 'Gen')
+    # first_dynamic_book_number and above, numbered in order of first use.
+    # book_numbers and book_ids_by_number are process-local: dynamic book numbers differ between processes,
+    # so packed verse IDs with dynamic book numbers must not be persisted (see persistable_packed_verse_id).
+    book_numbers = {}        # key: book ID  value: int
+    book_ids_by_number = {}  # key: int  value: book ID
+    first_dynamic_book_number = 100 + 36 ** 3
+    # Dense table of book IDs by book number for the Bible books (book numbers below n_dense_book_numbers)
+    n_dense_book_numbers = 128
+    book_id_table = [None] * n_dense_book_numbers
+    packed_verse_id_regex = regex.compile(r'(\S+) (0|[1-9]\d*):(0|[1-9]\d*)([a-z]?)$')
+    base36_book_id_regex = regex.compile(r'[0-9A-Z]{3}$')
+    # Memoized conversions between verse IDs and packed verse IDs, shared by all instances (book numbers are fixed)
+    packed_verse_id_cache = {}  # key: verse ID  value: packed verse ID or None (can't be packed)
+    verse_id_cache = {}         # key: packed verse ID  value: verse ID
+    max_cache_size = 1000000    # caches are cleared when they grow beyond this size
+
     def __init__(self):
         self.books_by_section = {
             "Old Testament": ['GEN', 'EXO', 'LEV', 'NUM', 'DEU', 'JOS', 'JDG', 'RUT', '1SA', '2SA',
@@ -41,6 +73,10 @@ class BibleStructure:
         for bible_section, section_offset in (("Old Testament", 1), ("New Testament", 41), ("Apocrypha", 68)):
             for book_offset, book in enumerate(self.books_by_section[bible_section]):
                 self.sorting_numbers[book] = section_offset + book_offset
+        for book, book_number in self.sorting_numbers.items():
+            BibleStructure.book_numbers[book] = book_number
+            BibleStructure.book_ids_by_number[book_number] = book
+            BibleStructure.book_id_table[book_number] = book
 
         self.standard_versification_schemas = {
             "org": "Original",   # must be in first place as it is referenced by the others
@@ -96,6 +132,73 @@ class BibleStructure:
         self.post_verse_descriptive_titles = [("HAB 3:19", "HAB 3:20")]  # (verse ID, pseudo verse ID for descr. title)
         self.post_verse_descriptive_titles_pseudo_verse_ids = [elem[1] for elem in self.post_verse_descriptive_titles]
 
+    def book_number(self, book: str) -> int:
+        if (book_number := self.book_numbers.get(book)) is None:
+            if self.base36_book_id_regex.match(book):
+                book_number = 100 + int(book, 36)
+            else:
+                book_number = max(self.first_dynamic_book_number, max(self.book_ids_by_number.keys()) + 1)
+            self.book_numbers[book] = book_number
+            self.book_ids_by_number[book_number] = book
+        return book_number
+
+    def pack_book_chapter_verse(self, book: str, chapter: int, verse: int, segment: int = 0) -> int:
+        """Packed verse ID: (book number * 2^16 + chapter * 2^8 + verse) * 2^5 + segment ('a' = 1, 'b' = 2, ...)
+           Packed verse IDs sort in Bible book order; chapter and verse numbers must be below 256."""
+        return ((((self.book_number(book) << 8) | chapter) << 8 | verse) << 5) | segment
+
+    def pack_verse_id(self, verse_id: str) -> int | None:
+        """Packs a verse ID such as 'GEN 1:1' or 'ESG 1:1a' into an integer.
+           Returns None for verse IDs that can't be packed, e.g. 'GEN 1:1-3', 'GEN 01:1', 'PSA 1:300'.
+           Verse IDs are parsed only once (memoized)."""
+        if (packed_verse_id := self.packed_verse_id_cache.get(verse_id, -1)) != -1:
+            return packed_verse_id
+        packed_verse_id = None
+        if m := self.packed_verse_id_regex.match(verse_id):
+            book, chapter_s, verse_s, segment_s = m.group(1, 2, 3, 4)
+            chapter, verse = int(chapter_s), int(verse_s)
+            if (chapter < 256) and (verse < 256):
+                packed_verse_id = self.pack_book_chapter_verse(book, chapter, verse,
+                                                               (ord(segment_s) - 96) if segment_s else 0)
+        if len(self.packed_verse_id_cache) >= self.max_cache_size:
+            self.packed_verse_id_cache.clear()
+        self.packed_verse_id_cache[verse_id] = packed_verse_id
+        return packed_verse_id
+
+    def book_id(self, book_number: int) -> str:
+        """Book ID of book number. Raises ValueError for unregistered book numbers that are neither a Bible book
+        sorting number nor a base-36 book ID number, e.g. dynamic book numbers from another process."""
+        if (book := self.book_ids_by_number.get(book_number)) is None:
+            if not (100 <= book_number < self.first_dynamic_book_number):
+                raise ValueError(f"Unknown book number {book_number} (dynamic book numbers are process-local)")
+            n = book_number - 100  # 3-character book ID read as base-36 number
+            book = ''.join('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'[(n // (36 ** i)) % 36] for i in (2, 1, 0))
+            self.book_numbers[book] = book_number
+            self.book_ids_by_number[book_number] = book
+        return book
+
+    def persistable_packed_verse_id(self, packed_verse_id: int) -> bool:
+        """Packed verse IDs with a dynamic book number (e.g. of 'Gen 1:1') are only valid in the current process."""
+        return (packed_verse_id >> 21) < self.first_dynamic_book_number
+
+    def unpack_verse_id(self, packed_verse_id: int) -> Tuple[str, int, int, int]:
+        """Returns book, chapter, verse, segment (0 for none, 1 for 'a', 2 for 'b', ...)"""
+        book_number = packed_verse_id >> 21
+        book = (self.book_id_table[book_number] if book_number < self.n_dense_book_numbers else None) \
+            or self.book_id(book_number)
+        return book, (packed_verse_id >> 13) & 255, (packed_verse_id >> 5) & 255, packed_verse_id & 31
+
+    def verse_id(self, packed_verse_id: int) -> str:
+        """Verse ID of packed verse ID (memoized)"""
+        if verse_id := self.verse_id_cache.get(packed_verse_id):
+            return verse_id
+        book, chapter, verse, segment = self.unpack_verse_id(packed_verse_id)
+        verse_id = f"{book} {chapter}:{verse}{chr(96 + segment) if segment else ''}"
+        if len(self.verse_id_cache) >= self.max_cache_size:
+            self.verse_id_cache.clear()
+        self.verse_id_cache[packed_verse_id] = verse_id
+        return verse_id
+
     @staticmethod
     def pseudo_verse_id_for_descriptive_title(verse_id: str) -> bool:
         """Checks if a verse ID is an informal ID for a descriptive title such as 'PSA 23:0' ('A psalm of David.')
@@ -121,8 +224,16 @@ class Versification:
      * n-1 mappings (merges)
      * 1-n mappings (splits)
     Verse IDs not listed are assumed to map onto themselves (1-1)."""
-    versification_d = {}  # key: schema (str)  value: Versification
+    versification_d = {}  # key: schema (str)  value: Versification (loaded on first use, see get_versification)
     org = None
+    verse_schema_matrix = None  # VerseSchemaMatrix of all standard schemas, see get_verse_schema_matrix
+    load_args = None            # see load_versifications
+    schema_source_hashes = {}   # key: schema  value: hash of the files that the compiled schema is based on
+    compiled_schema_format_version = 1
+    verse_range_regex = regex.compile(r'(\S+) (\d+):(\d+)-(\d+)$')
+    verse_id_regex = regex.compile(r'(\S+)\s+(\d+):(\d+)([a-z]?)$')
+    simple_verse_id_regex = regex.compile(r'(\S+) (\d+):(\d+)$')
+    split_verse_id_cache = {}  # key: verse ID  value: result of split_verse_id
 
     def __init__(self, versification_filename: str, schema: str, bible: BibleStructure, f_log: TextIO):
         self.schema = schema
@@ -134,17 +245,18 @@ class Versification:
         Versification.versification_d[schema] = self
         self.book_ids = []
         self.chapter_max_verse = defaultdict(int)  # key: (book, chapter)  value: int
-        self.verse_ids = set()                     # element: verse ID
-        self.verse_id_list = []                    # element: verse ID
+        self.packed_chapter_max_verse = {}         # key: packed verse ID >> 13 (book, chapter)  value: int
+        # Dense table of max verses, index: packed verse ID >> 13 (book, chapter) for Bible books (see BibleStructure)
+        self.dense_chapter_max_verse = array('H', bytes(2 * (BibleStructure.n_dense_book_numbers << 8)))
+        self.packed_verse_ids = array('q')         # element: packed verse ID (see BibleStructure.pack_verse_id)
         self.verse_id_mapping_from_org = {}        # key: org verse ID  value: verse ID
         self.verse_id_mapping_to_org = {}
         self.verse_ids_for_descriptive_titles = []
-        self.merge_objects = List[MergeObject]
-        self.split_objects = List[MergeObject]
         self.n_books = 0
         self.n_chapters = 0
         self.n_verses = 0
         self.n_mappings = 0
+        self.check_duration = 0.0  # seconds (see check_mappings)
         self.errors = defaultdict(list)
         self.infos = defaultdict(list)
         # self.target_verse_ids_to_be_monitored = ()
@@ -155,7 +267,7 @@ class Versification:
             data = json.load(f)
             if max_verses_d := data.get("maxVerses"):
                 self.n_max_verses_entries += 1
-                self.book_ids = max_verses_d.keys()
+                self.book_ids = list(max_verses_d.keys())
                 for book_id in self.book_ids:
                     self.n_books += 1
                     for chapter_number, max_verse_s in enumerate(max_verses_d[book_id], 1):
@@ -164,10 +276,12 @@ class Versification:
                             max_verse = int(max_verse_s)
                             self.chapter_max_verse[(book_id, chapter_number)] = max_verse
                             self.n_verses += max_verse
-                            for verse_number in range(1, max_verse+1):
-                                verse_id = f"{book_id} {chapter_number}:{verse_number}"
-                                self.verse_ids.add(verse_id)
-                                self.verse_id_list.append(verse_id)
+                            packed_verse0_id = bible.pack_book_chapter_verse(book_id, chapter_number, 0)
+                            self.packed_chapter_max_verse[packed_verse0_id >> 13] = max_verse
+                            if (packed_verse0_id >> 13) < len(self.dense_chapter_max_verse):
+                                self.dense_chapter_max_verse[packed_verse0_id >> 13] = min(max_verse, 65535)
+                            self.packed_verse_ids.extend(range(packed_verse0_id + 32,
+                                                               packed_verse0_id + 32 * (max_verse + 1), 32))
                         else:
                             f_log.write(f'  ** Error: Last verse number for {book_id} {chapter_number} '
                                         f'is not integer: {max_verse_s}\n')
@@ -241,23 +355,37 @@ class Versification:
 
     @staticmethod
     def split_verse_id(verse_id: str) -> Tuple[str | None, int | None, int | str | None, int | None]:
-        if (m := (regex.match(r'(\S+) (\d+):(\d+)-(\d+)$', verse_id)
-                  or regex.match(r'(\S+)\s+(\d+):(\d+)([a-z]?)$', verse_id))):
+        """Returns book, chapter, from verse, to verse (memoized)"""
+        if result := Versification.split_verse_id_cache.get(verse_id):
+            return result
+        if m := Versification.verse_range_regex.match(verse_id):
+            book, chapter1_s, from_verse_s, to_verse_s = m.group(1, 2, 3, 4)
+            result = book, int(chapter1_s), int(from_verse_s), int(to_verse_s)
+        elif m := Versification.verse_id_regex.match(verse_id):
             book, chapter1_s, from_verse_s, last_element = m.group(1, 2, 3, 4)
             chapter_number, from_verse_number = int(chapter1_s), int(from_verse_s)
-            if regex.match(r'\d+$', last_element):
-                to_verse_number = int(last_element)
-            elif regex.match(r'[a-z]$', last_element):
+            if last_element:
                 from_verse_number = f"{from_verse_s}{last_element}"
-                to_verse_number = None
-            else:
-                to_verse_number = None
-            return book, chapter_number, from_verse_number, to_verse_number
+            result = book, chapter_number, from_verse_number, None
         else:
-            return None, None, None, None
+            result = None, None, None, None
+        if len(Versification.split_verse_id_cache) >= BibleStructure.max_cache_size:
+            Versification.split_verse_id_cache.clear()
+        Versification.split_verse_id_cache[verse_id] = result
+        return result
+
+    def contains_packed_verse_id(self, packed_verse_id: int) -> bool:
+        if packed_verse_id & 31:
+            return False
+        book_chapter = packed_verse_id >> 13
+        max_verse = self.dense_chapter_max_verse[book_chapter] if book_chapter < len(self.dense_chapter_max_verse) \
+            else self.packed_chapter_max_verse.get(book_chapter, 0)
+        return 0 < (packed_verse_id >> 5) & 255 <= max_verse
 
     def valid_verse_id(self, verse_id: str, bible: BibleStructure) -> bool:
-        return (verse_id in self.verse_ids) or bible.pseudo_verse_id_for_descriptive_title(verse_id)
+        return ((((packed_verse_id := bible.pack_verse_id(verse_id)) is not None)
+                 and self.contains_packed_verse_id(packed_verse_id))
+                or bible.pseudo_verse_id_for_descriptive_title(verse_id))
 
     def register_any_mapping_error(self, verse_id: str, valid: bool, side: str, bible: BibleStructure, verbose: bool):
         # side is "source" or "target"
@@ -323,7 +451,7 @@ class Versification:
         verse_spans = []
         current_book, current_chapter, first_verse_number, last_verse_number = None, None, -1, -1
         for verse_id in verse_id_list:
-            if m := regex.match(r'(\S+) (\d+):(\d+)$', verse_id):
+            if m := Versification.simple_verse_id_regex.match(verse_id):
                 book, chapter, verse_number_s = m.group(1, 2, 3)
                 verse_number = int(verse_number_s)
                 if book == current_book and chapter == current_chapter and verse_number == (last_verse_number + 1):
@@ -341,35 +469,45 @@ class Versification:
             verse_spans.append(f"{current_book} {current_chapter}:{first_verse_number}")
         return sep.join(verse_spans)
 
-    def dict_value_verse_list_pprint(self, d: dict, sep: str = '; ') -> str:
+    @staticmethod
+    def dict_value_verse_list_pprint(d: dict, sep: str = '; ') -> str:
         flattened_verse_ids = []
         for verse_ids in d.values():
             flattened_verse_ids.extend(verse_ids)
-        return self.verse_list_pprint(flattened_verse_ids, sep)
+        return Versification.verse_list_pprint(flattened_verse_ids, sep)
 
     def check_mappings(self, bible: BibleStructure):
-        previous_target_verse_ids = set()
-        for source_verse_id in self.verse_id_list:
+        """Checks for dropped source verses and duplicate target verses (on packed verse IDs where possible).
+        Run once per compiled schema; its results (errors) are stored with the compiled schema in the cache."""
+        start_time = time.perf_counter()
+        org = Versification.org
+        previous_target_verse_ids = set()  # element: packed verse ID, or verse ID if it can't be packed
+        for packed_verse_id in self.packed_verse_ids:
+            source_verse_id = bible.verse_id(packed_verse_id)
             target = self.verse_id_mapping_to_org.get(source_verse_id)
+            if target is None:
+                if not (org.contains_packed_verse_id(packed_verse_id)
+                        or bible.pseudo_verse_id_for_descriptive_title(source_verse_id)):
+                    self.errors["dropped-sources"].append(source_verse_id)
+                continue
             if isinstance(target, str):
-                target_verse_ids = [target]
+                target_verse_ids = (target,)
             elif isinstance(target, MergeObject):
-                target_verse_ids = [] if target.target_checked else [target.target_verse_id]
+                target_verse_ids = () if target.target_checked else (target.target_verse_id,)
                 target.target_checked = True
             elif isinstance(target, SplitObject):
                 target_verse_ids = target.target_verse_ids
-            elif target is None:
-                target_verse_ids = []
-                if not Versification.org.valid_verse_id(source_verse_id, bible):
-                    self.errors["dropped-sources"].append(source_verse_id)
             else:
                 sys.stderr.write(f"  ** Error: unexpected type '{type(target)}' for {source_verse_id} mapping target\n")
-                target_verse_ids = []
+                target_verse_ids = ()
             for target_verse_id in target_verse_ids:
-                if target_verse_id in previous_target_verse_ids:
+                if (target_key := bible.pack_verse_id(target_verse_id)) is None:
+                    target_key = target_verse_id
+                if target_key in previous_target_verse_ids:
                     self.errors["duplicate-targets"].append(target_verse_id)
                 else:
-                    previous_target_verse_ids.add(target_verse_id)
+                    previous_target_verse_ids.add(target_key)
+        self.check_duration = time.perf_counter() - start_time
 
     @staticmethod
     def count_and_number_suffix(n: int | list, singular_form, plural_form) -> Tuple[int, str]:
@@ -402,23 +540,184 @@ class Versification:
     def load_versifications(bible: BibleStructure, f_log: TextIO,
                             standard_mapping_dir: str | None = None,
                             supplementary_mapping_filename: str | None = None):
+        """Registers the standard versification schemas (see BibleStructure.standard_versification_schemas).
+        Each schema is loaded into versification_d on first use (see get_versification), its data log
+        is written to f_log at that point."""
         versification_dir = os.path.dirname(os.path.realpath(__file__))
         if standard_mapping_dir is None:
             standard_mapping_dir = Path(versification_dir) / 'data' / 'standard_mappings'
+        Versification.versification_d.clear()
+        Versification.org = None
+        Versification.verse_schema_matrix = None
+        Versification.schema_source_hashes.clear()
+        Versification.load_args = (bible, f_log, standard_mapping_dir, supplementary_mapping_filename)
+
+    @staticmethod
+    def load_all_versifications() -> List[Versification]:
+        bible = Versification.load_args[0]
+        return [Versification.get_versification(schema) for schema in bible.standard_versification_schemas.keys()]
+
+    @staticmethod
+    def compile_versification(schema: str, bible: BibleStructure, f_log: TextIO,
+                              standard_mapping_dir: str | Path,
+                              supplementary_mapping_filename: str | None = None) -> Versification:
+        """Loads versification schema from its JSON file (and any supplementary mappings) and checks it."""
+        filename = f"{standard_mapping_dir}/{schema}.json"
+        f_log.write(f"Loading versification from {filename} ...\n")
+        v = Versification(filename, schema, bible, f_log)
+        if supplementary_mapping_filename:
+            with open(supplementary_mapping_filename) as f:
+                if file_content := f.read():
+                    if file_d := json.loads(file_content):
+                        if mapped_verses_d := file_d.get("mappedVerses"):
+                            v.add_mapped_verses(mapped_verses_d, bible, f_log)
+        v.check_mappings(bible)
+        v.report_issues(f_log)
+        f_log.write(f"  Loaded {v.n_books} books; {v.n_chapters:,d} chapters; {v.n_verses:,d} verses; "
+                    f"{v.n_mappings:,d} mappings\n")
+        return v
+
+    @staticmethod
+    def schema_source_hash(schema: str) -> str:
+        """Hash of this source code, the schema's JSON file, the 'org' JSON file (referenced by other schemas) and
+        any supplementary mapping file, as key of the compiled schema in the cache directory."""
+        if source_hash := Versification.schema_source_hashes.get(schema):
+            return source_hash
+        _bible, _f_log, standard_mapping_dir, supplementary_mapping_filename = Versification.load_args
+        # Classes are pickled with their module name, which is '__main__' if this file is run as a script.
+        version_hash = hashlib.sha256(f"versification schema {Versification.compiled_schema_format_version} "
+                                      f"{__name__} {schema}\n".encode())
+        filenames = [os.path.realpath(__file__), f"{standard_mapping_dir}/{schema}.json"]
+        if schema != 'org':
+            filenames.append(f"{standard_mapping_dir}/org.json")
+        if supplementary_mapping_filename:
+            filenames.append(supplementary_mapping_filename)
+        for filename in filenames:
+            with open(filename, 'rb') as f:
+                version_hash.update(f.read())
+        source_hash = Versification.schema_source_hashes[schema] = version_hash.hexdigest()
+        return source_hash
+
+    @staticmethod
+    def compiled_schema_filename(schema: str) -> Path:
+        return general_util.cache_dir() / f"versification-{schema}-{Versification.schema_source_hash(schema)}.pickle"
+
+    @staticmethod
+    def store_compiled_schema(schema: str, v: Versification, log_s: str):
+        Versification.store_compiled(Versification.compiled_schema_filename(schema), (v, log_s),
+                                     f"versification-{schema}-*.pickle")
+
+    @staticmethod
+    def load_compiled(cache_filename: Path):
+        """Returns content of precompiled cache file, or None if the file is not available or unreadable."""
+        try:
+            with open(cache_filename, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as error:
+            sys.stderr.write(f"Ignoring unreadable versification cache file {cache_filename}: {error}\n")
+            return None
+
+    @staticmethod
+    def store_compiled(cache_filename: Path, content, stale_pattern: str | None = None):
+        """Stores content in a precompiled cache file, deleting any other cache files matching stale_pattern
+        (earlier versions of the same content, keyed by other source hashes)."""
+        cache_dir = cache_filename.parent
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_filename = cache_dir / f"{cache_filename.stem}.{os.getpid()}.tmp"
+            with open(tmp_filename, 'wb') as f:
+                pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_filename, cache_filename)  # atomic, in case of concurrent runs
+            if stale_pattern:
+                general_util.prune_cache_files(cache_filename, stale_pattern)
+        except OSError as error:
+            sys.stderr.write(f"Could not store precompiled versification in {cache_dir}: {error}\n")
+
+    @staticmethod
+    def get_versification(schema: str) -> Versification | None:
+        """Returns Versification of a standard schema (after load_versifications), loading it on first use
+        from the precompiled schema cache or, if not available, from the schema's JSON file (then storing it
+        in the cache). Compiled schemas are validated by a hash of their source files (see schema_source_hash)."""
+        if v := Versification.versification_d.get(schema):
+            return v
+        if Versification.load_args is None:
+            return None
+        bible, f_log, standard_mapping_dir, supplementary_mapping_filename = Versification.load_args
+        if schema not in bible.standard_versification_schemas:
+            return None
+        cache_filename = Versification.compiled_schema_filename(schema)
+        if compiled := Versification.load_compiled(cache_filename):
+            v, log_s = compiled
+            Versification.versification_d[schema] = v
+            if schema == 'org':
+                Versification.org = v
+        else:
+            if schema != 'org':
+                Versification.get_versification('org')  # mappings are checked against 'org'
+            f_schema_log = io.StringIO()
+            v = Versification.compile_versification(schema, bible, f_schema_log, standard_mapping_dir,
+                                                    supplementary_mapping_filename)
+            log_s = f_schema_log.getvalue()
+            Versification.store_compiled_schema(schema, v, log_s)
+        f_log.write(log_s)
+        return v
+
+    @staticmethod
+    def precompile_versifications(n_workers: int = 1, f_report: TextIO = sys.stderr) -> dict:
+        """Compiles and checks the standard schemas (after load_versifications) that are not in the precompiled
+        schema cache yet, with schemas other than 'org' in parallel worker processes, storing them in the cache,
+        so that later loads of unchanged schema files skip the checks. Reports the cost of the checks to f_report.
+        Returns check duration and compile duration (incl. check) in seconds for each schema compiled."""
+        bible = Versification.load_args[0]
+        stale_schemas = [schema for schema in bible.standard_versification_schemas.keys()
+                         if (schema not in Versification.versification_d)
+                         and not Versification.compiled_schema_filename(schema).exists()]
+        durations = {}
+        start_time = time.perf_counter()
+        if 'org' in stale_schemas:
+            v = Versification.get_versification('org')  # other schemas are checked against 'org'
+            durations['org'] = v.check_duration, time.perf_counter() - start_time
+        else:
+            Versification.get_versification('org')
+        jobs = [schema for schema in stale_schemas if schema != 'org']
+        if (n_workers > 1) and (len(jobs) > 1) and ('fork' in multiprocessing.get_all_start_methods()):
+            with multiprocessing.get_context('fork').Pool(min(n_workers, len(jobs))) as pool:
+                for schema, check_duration, compile_duration in pool.map(compile_versification_in_worker, jobs):
+                    durations[schema] = check_duration, compile_duration
+        else:
+            for schema in jobs:
+                schema_start_time = time.perf_counter()
+                v = Versification.get_versification(schema)
+                durations[schema] = v.check_duration, time.perf_counter() - schema_start_time
+        Versification.load_all_versifications()  # precompiled schemas from cache, in standard order
+        for schema, (check_duration, compile_duration) in durations.items():
+            f_report.write(f"Checked versification schema '{schema}' in {check_duration:.3f} sec "
+                           f"(compiled in {compile_duration:.3f} sec)\n")
+        if n_unchanged_schemas := len(bible.standard_versification_schemas) - len(durations):
+            f_report.write(f"Skipped checks of {n_unchanged_schemas} unchanged versification schemas "
+                           f"(precompiled in {general_util.cache_dir()})\n")
+        f_report.write(f"Precompiled versification schemas in {time.perf_counter() - start_time:.3f} sec "
+                       f"({max(1, n_workers)} workers)\n")
+        return durations
+
+    @staticmethod
+    def get_verse_schema_matrix() -> VerseSchemaMatrix:
+        """Returns VerseSchemaMatrix of all standard schemas (after load_versifications), from the precompiled
+        schema cache if available, so that a corpus can be matched against all schemas without loading them."""
+        if verse_schema_matrix := Versification.verse_schema_matrix:
+            return verse_schema_matrix
+        bible = Versification.load_args[0]
+        version_hash = hashlib.sha256(f"verse schema matrix {__name__}\n".encode())
         for schema in bible.standard_versification_schemas.keys():
-            filename = f"{standard_mapping_dir}/{schema}.json"
-            f_log.write(f"Loading versification from {filename} ...\n")
-            v = Versification(filename, schema, bible, f_log)
-            if supplementary_mapping_filename:
-                with open(supplementary_mapping_filename) as f:
-                    if file_content := f.read():
-                        if file_d := json.loads(file_content):
-                            if mapped_verses_d := file_d.get("mappedVerses"):
-                                v.add_mapped_verses(mapped_verses_d, bible, f_log)
-            v.check_mappings(bible)
-            v.report_issues(f_log)
-            f_log.write(f"  Loaded {v.n_books} books; {v.n_chapters:,d} chapters; {v.n_verses:,d} verses; "
-                        f"{v.n_mappings:,d} mappings\n")
+            version_hash.update(f"{schema} {Versification.schema_source_hash(schema)}\n".encode())
+        cache_filename = general_util.cache_dir() / f"verse-schema-matrix-{version_hash.hexdigest()}.pickle"
+        if not (verse_schema_matrix := Versification.load_compiled(cache_filename)):
+            verse_schema_matrix = VerseSchemaMatrix(Versification.load_all_versifications())
+            Versification.store_compiled(cache_filename, verse_schema_matrix, "verse-schema-matrix-*.pickle")
+        Versification.verse_schema_matrix = verse_schema_matrix
+        return verse_schema_matrix
 
     @staticmethod
     def vref_filename() -> Path:
@@ -454,7 +753,6 @@ class MergeObject:
         self.source_texts = None
         self.merged_target_text = None
         self.target_checked = False
-        self.verses_mapped = False
 
 
 class SplitObject:
@@ -468,53 +766,195 @@ class SplitObject:
         self.split_target_texts = None
 
 
-class VersificationMatch:
-    """This class measures how well a VersifiedCorpus matches a Versification (e.g. 'eng', 'rsc')."""
-    def __init__(self, vc: VersifiedCorpus, v: Versification, bible: BibleStructure):
-        self.chapter_overage_count = 0
-        self.overage_chapters = defaultdict(list)
-        self.verse_overage_count = 0
-        self.chapter_shortage_count = 0
-        self.shortage_chapters = defaultdict(list)
-        self.verse_shortage_count = 0
-        for verse_id in vc.vref2verse.keys():
-            if verse_id not in v.verse_ids:
-                book, chapter, verse, _to_verse = v.split_verse_id(verse_id)
+class VerseSchemaMatrix:
+    """This class holds a verse x schema bit matrix: for each verse of the versification schemas (e.g. 'org', 'eng'),
+    a bit mask of the schemas that contain the verse, so that a corpus can be matched against all schemas at once."""
+    def __init__(self, versifications: List[Versification]):
+        self.schemas = [v.schema for v in versifications]
+        self.schema_bits = {}                              # key: schema  value: int (single bit)
+        self.schema_chapters = {}                          # key: schema  value: list of (book, chapter) in schema
+        self.verse_schema_masks = {}                       # key: packed verse ID  value: int (bits of schemas)
+        self.chapter_packed_verse_ids = defaultdict(list)  # key: packed verse ID >> 13  value: sorted packed verse IDs
+        for schema_index, v in enumerate(versifications):
+            schema_bit = 1 << schema_index
+            self.schema_bits[v.schema] = schema_bit
+            self.schema_chapters[v.schema] = list(v.chapter_max_verse.keys())
+            verse_schema_masks = self.verse_schema_masks
+            for packed_verse_id in v.packed_verse_ids:
+                verse_schema_masks[packed_verse_id] = verse_schema_masks.get(packed_verse_id, 0) | schema_bit
+        for packed_verse_id in sorted(self.verse_schema_masks.keys()):
+            self.chapter_packed_verse_ids[packed_verse_id >> 13].append(packed_verse_id)
+
+    def includes(self, schema: str) -> bool:
+        return schema in self.schema_bits
+
+    def match(self, vc: VersifiedCorpus, bible: BibleStructure) -> List[VersificationMatch]:
+        """Matches corpus against all schemas of the matrix (in matrix order) and reports the results."""
+        vms = [VersificationMatch(None, schema, bible) for schema in self.schemas]
+        self.score(vc, bible, vms)
+        for vm in vms:
+            vm.report()
+        return vms
+
+    def score(self, vc: VersifiedCorpus, bible: BibleStructure, vms: List[VersificationMatch]):
+        """Records overage and shortage verses of corpus for versification matches (of schemas in the matrix)
+        in one pass over the corpus verses and one pass over the schema verses of the chapters covered by corpus."""
+        vm_schema_bits = [(self.schema_bits[vm.schema], vm) for vm in vms]
+        vms_mask = 0
+        for schema_bit, _vm in vm_schema_bits:
+            vms_mask |= schema_bit
+        verse_schema_masks = self.verse_schema_masks
+        corpus_packed_verse_ids, corpus_packed_verse_id_set = vc.pack_verse_ids(bible)
+        for verse_id, packed_verse_id in zip(vc.vref2verse.keys(), corpus_packed_verse_ids):
+            if packed_verse_id is None:
+                missing_mask = vms_mask
+                book, chapter, verse, _to_verse = Versification.split_verse_id(verse_id)
                 if book is None:
                     continue
-                if book not in bible.books:
-                    continue
-                if ((book == "PSA") and (verse == 0)
-                        and ((v.schema in ('rsc', 'rso')) or (chapter in bible.psalms_with_descriptive_titles))):
+            elif missing_mask := vms_mask & ~verse_schema_masks.get(packed_verse_id, 0):
+                book, chapter, verse, segment = bible.unpack_verse_id(packed_verse_id)
+                if segment:
+                    verse = f"{verse}{chr(96 + segment)}"
+            else:
+                continue
+            if book not in bible.books:
+                continue
+            if verse_id in bible.post_verse_descriptive_titles_pseudo_verse_ids:
+                continue
+            psalm_descriptive_title = (book == "PSA") and (verse == 0)
+            for schema_bit, vm in vm_schema_bits:
+                if missing_mask & schema_bit:
+                    if (psalm_descriptive_title
+                            and ((vm.schema in ('rsc', 'rso')) or (chapter in bible.psalms_with_descriptive_titles))):
+                        continue
+                    vm.add_overage_verse(book, chapter, verse_id)
+        # Do not consider for shortage any chapters not covered by corpus at all.
+        for book, chapter in vc.chapters.keys():
+            if (book is None) or (chapter >= 256):
+                continue
+            packed_chapter = bible.pack_book_chapter_verse(book, chapter, 0) >> 13
+            for packed_verse_id in self.chapter_packed_verse_ids.get(packed_chapter, ()):
+                if packed_verse_id in corpus_packed_verse_id_set:
                     continue
-                if verse_id in bible.post_verse_descriptive_titles_pseudo_verse_ids:
+                if not (missing_mask := vms_mask & verse_schema_masks[packed_verse_id]):
                     continue
-                self.verse_overage_count += 1
-                if not self.overage_chapters.get((book, chapter)):
-                    self.chapter_overage_count += 1
-                self.overage_chapters[(book, chapter)].append(verse_id)
-        for verse_id in v.verse_id_list:
-            if verse_id not in vc.vref2verse:
+                verse_id = bible.verse_id(packed_verse_id)
                 if verse_id in bible.often_omitted_verses:
                     continue
                 if verse_id in bible.verses_sometimes_merged_into_neighboring_verses:
                     continue
-                book, chapter, verse, _to_verse = v.split_verse_id(verse_id)
-                # Do not consider for shortage any chapters not covered by corpus at all.
-                if vc.chapters.get((book, chapter)):
-                    self.verse_shortage_count += 1
-                    if not self.shortage_chapters.get((book, chapter)):
-                        self.chapter_shortage_count += 1
-                    self.shortage_chapters[(book, chapter)].append(verse_id)
+                for schema_bit, vm in vm_schema_bits:
+                    if missing_mask & schema_bit:
+                        vm.add_shortage_verse(book, chapter, verse_id)
+        for vm in vms:
+            vm.sort_shortage_chapters(self.schema_chapters[vm.schema])
+
+
+class VersificationMatch:
+    """This class measures how well a VersifiedCorpus matches a Versification (e.g. 'eng', 'rsc').
+    To match a corpus against all schemas, use VerseSchemaMatrix.match (vc = None here)."""
+    def __init__(self, vc: VersifiedCorpus | None, v: Versification | str, bible: BibleStructure):
+        self.schema = v if isinstance(v, str) else v.schema
+        self.chapter_overage_count = 0
+        self.overage_chapters = defaultdict(list)
+        self.verse_overage_count = 0
+        self.chapter_shortage_count = 0
+        self.shortage_chapters = defaultdict(list)
+        self.verse_shortage_count = 0
+        self.cost = 0
+        if vc is not None:
+            verse_schema_matrix = Versification.verse_schema_matrix
+            if (verse_schema_matrix is None) or not verse_schema_matrix.includes(self.schema):
+                verse_schema_matrix = VerseSchemaMatrix([Versification.get_versification(v) if isinstance(v, str)
+                                                         else v])
+            verse_schema_matrix.score(vc, bible, [self])
+            self.report()
+
+    def add_overage_verse(self, book: str, chapter: int, verse_id: str):
+        self.verse_overage_count += 1
+        if not self.overage_chapters.get((book, chapter)):
+            self.chapter_overage_count += 1
+        self.overage_chapters[(book, chapter)].append(verse_id)
+
+    def add_shortage_verse(self, book: str, chapter: int, verse_id: str):
+        self.verse_shortage_count += 1
+        if not self.shortage_chapters.get((book, chapter)):
+            self.chapter_shortage_count += 1
+        self.shortage_chapters[(book, chapter)].append(verse_id)
+
+    def sort_shortage_chapters(self, schema_chapters: List[Tuple[str, int]]):
+        """Shortage chapters in the order of the versification schema"""
+        if self.shortage_chapters:
+            shortage_chapters = self.shortage_chapters
+            self.shortage_chapters = defaultdict(list)
+            for book_chapter in schema_chapters:
+                if book_chapter in shortage_chapters:
+                    self.shortage_chapters[book_chapter] = shortage_chapters[book_chapter]
+
+    def report(self):
         self.cost = self.chapter_overage_count + self.chapter_shortage_count
         self.cost += 10 * (self.verse_overage_count + self.verse_shortage_count)
-        sys.stderr.write(f'For schema "{v.schema}", {self.chapter_overage_count}/{self.verse_overage_count} overage, '
-                         f'{self.chapter_shortage_count}/{self.verse_shortage_count} shortage\n')
-        if v.schema:  # == 'eng':
+        sys.stderr.write(f'For schema "{self.schema}", {self.chapter_overage_count}/{self.verse_overage_count} '
+                         f'overage, {self.chapter_shortage_count}/{self.verse_shortage_count} shortage\n')
+        if self.schema:  # == 'eng':
             if self.overage_chapters and (self.verse_overage_count <= 100):
-                sys.stderr.write(f'   Overage:  {v.dict_value_verse_list_pprint(self.overage_chapters)}\n')
+                sys.stderr.write(f'   Overage:  '
+                                 f'{Versification.dict_value_verse_list_pprint(self.overage_chapters)}\n')
             if self.shortage_chapters and (self.verse_shortage_count <= 100):
-                sys.stderr.write(f'   Shortage: {v.dict_value_verse_list_pprint(self.shortage_chapters)}\n')
+                sys.stderr.write(f'   Shortage: '
+                                 f'{Versification.dict_value_verse_list_pprint(self.shortage_chapters)}\n')
+
+
+class ReversificationPlan:
+    """This class holds a precomputed plan to reversify corpora that share a verse ID file from a Versification
+    to the verse IDs of a target verse ID file (e.g. vref.txt), line by line (see VersifiedCorpus.reversify_stream).
+    One plan can be shared by any number of corpora, e.g. by the worker processes of a batch."""
+    def __init__(self, v: Versification, source_verse_ids: List[str], target_verse_ids: List[str]):
+        self.v = v
+        self.source_vref_filename = None
+        self.source_verse_ids = source_verse_ids  # element: verse ID of corpus line
+        self.target_verse_ids = target_verse_ids  # element: verse ID of reversified corpus line
+        self.last_source_line = {}                # key: source verse ID  value: index of last line with verse ID
+        for line_index, verse_id in enumerate(source_verse_ids):
+            self.last_source_line[verse_id] = line_index
+        self.merge_source_verse_ids = set()       # source verse IDs of merges
+        # A reversified verse can be written once all source verses that can map to it have been reversified.
+        self.target_n_sources = defaultdict(int)  # key: target verse ID  value: number of source verse IDs mapping to it
+        for source_verse_id in self.last_source_line.keys():
+            if isinstance(merge_object := v.verse_id_mapping_to_org.get(source_verse_id), MergeObject):
+                self.merge_source_verse_ids.update(merge_object.source_verse_ids)
+            for target_verse_id in self.target_verse_ids_of_source(source_verse_id):
+                self.target_n_sources[target_verse_id] += 1
+        self.last_target_line = {}  # key: target verse ID  value: index of last line with verse ID
+        for line_index, target_verse_id in enumerate(target_verse_ids):
+            self.last_target_line[target_verse_id] = line_index
+
+    def target_verse_ids_of_source(self, source_verse_id: str) -> List[str]:
+        target = self.v.verse_id_mapping_to_org.get(source_verse_id)
+        if isinstance(target, str):
+            return [target]
+        elif isinstance(target, MergeObject):
+            return [target.target_verse_id]
+        elif isinstance(target, SplitObject):
+            return target.target_verse_ids
+        else:
+            return [source_verse_id]
+
+    def merge_sources_read(self, merge_object: MergeObject, merge_source_verses: dict, n_lines_read: int) -> bool:
+        """Have all source verses of a merge been read (first non-empty line or else last line with verse ID)?"""
+        return all((merge_source_verse_id in merge_source_verses)
+                   or (self.last_source_line.get(merge_source_verse_id, -1) < n_lines_read)
+                   for merge_source_verse_id in merge_object.source_verse_ids)
+
+    @staticmethod
+    def from_files(v: Versification, source_vref_filename: str, target_vref_filename: str) -> ReversificationPlan:
+        with open(source_vref_filename) as f_vref:
+            source_verse_ids = [line.rstrip() for line in f_vref]
+        with open(target_vref_filename) as f_vref:
+            target_verse_ids = [line.strip() for line in f_vref]
+        plan = ReversificationPlan(v, source_verse_ids, target_verse_ids)
+        plan.source_vref_filename = source_vref_filename
+        return plan
 
 
 class VersifiedCorpus:
@@ -533,42 +973,54 @@ class VersifiedCorpus:
         self.warnings = defaultdict(list)
         self.books = defaultdict(int)  # key: book  value: number of chapters in book
         self.chapters = defaultdict(int)  # key: (book, chapter)  value: number of verses in chapter
+        self.packed_verse_ids = None      # element: packed verse ID or None (aligned with vref2verse keys)
+        self.packed_verse_id_set = None
 
-    def load_corpus(self, corpus_filename: str, vref_filename: str, _f_log: TextIO):
+    def load_corpus(self, corpus_filename: str, vref_filename: str | None, _f_log: TextIO):
+        """corpus_filename can also be a vref corpus store (see vref_corpus_store.py; vref_filename then not needed)"""
+        from greekroom.versification.vref_corpus_store import VrefCorpusStore
         self.corpus_filename = corpus_filename
         self.vref_filename = vref_filename
-        with open(corpus_filename) as f_corpus, open(vref_filename) as f_vref:
-            line_number = 0
-            for line in f_corpus:
-                line_number += 1
-                verse = line.strip()
-                if verse == "<range>":
-                    self.n_range_lines += 1
-                verse_id = f_vref.readline().rstrip()
-                if self.vref2verse.get(verse_id):
-                    self.errors["duplicate-verse-ids"].append(verse_id)
-                    continue
-                elif verse == "":
-                    continue
-                book, chapter, from_verse, _to_verse = Versification.split_verse_id(verse_id)
-                if not self.books.get(book):
-                    self.books[book] = 0
-                if not self.chapters.get((book, chapter)):
-                    self.books[book] += 1
-                    self.chapters[(book, chapter)] = 0
-                self.chapters[(book, chapter)] += 1
-                self.vref2verse[verse_id] = verse
-                self.n_verses += 1
-            if self.errors:
-                sys.stderr.write(f'Errors in {vref_filename}: {self.errors}\n')
-            range_clause = f" (thereof {self.n_range_lines} <range>)" if self.n_range_lines else ""
-            sys.stderr.write(f'Loaded {len(self.books)} books with {len(self.chapters):,d} chapters'
-                             f' and {self.n_verses:,d} verses from {line_number:,d} lines{range_clause}'
-                             f' in {corpus_filename} and {vref_filename}\n')
+        line_number = 0
+        for verse_id, line in VrefCorpusStore.corpus_lines(corpus_filename, vref_filename):
+            line_number += 1
+            verse = line.strip()
+            if verse == "<range>":
+                self.n_range_lines += 1
+            verse_id = verse_id or ''
+            if self.vref2verse.get(verse_id):
+                self.errors["duplicate-verse-ids"].append(verse_id)
+                continue
+            elif verse == "":
+                continue
+            book, chapter, from_verse, _to_verse = Versification.split_verse_id(verse_id)
+            if not self.books.get(book):
+                self.books[book] = 0
+            if not self.chapters.get((book, chapter)):
+                self.books[book] += 1
+                self.chapters[(book, chapter)] = 0
+            self.chapters[(book, chapter)] += 1
+            self.vref2verse[verse_id] = verse
+            self.n_verses += 1
+        if self.errors:
+            sys.stderr.write(f'Errors in {vref_filename or corpus_filename}: {self.errors}\n')
+        range_clause = f" (thereof {self.n_range_lines} <range>)" if self.n_range_lines else ""
+        sys.stderr.write(f'Loaded {len(self.books)} books with {len(self.chapters):,d} chapters'
+                         f' and {self.n_verses:,d} verses from {line_number:,d} lines{range_clause}'
+                         f' in {corpus_filename}{f" and {vref_filename}" if vref_filename else ""}\n')
+
+    def pack_verse_ids(self, bible: BibleStructure) -> Tuple[list, set]:
+        """Returns packed verse IDs of vref2verse keys (None for those that can't be packed) and their set."""
+        if (self.packed_verse_ids is None) or (len(self.packed_verse_ids) != len(self.vref2verse)):
+            self.packed_verse_ids = [bible.pack_verse_id(verse_id) for verse_id in self.vref2verse.keys()]
+            self.packed_verse_id_set = set(self.packed_verse_ids)
+            self.packed_verse_id_set.discard(None)
+        return self.packed_verse_ids, self.packed_verse_id_set
 
     def reversify(self, v: Versification, _f_log: TextIO) -> VersifiedCorpus:
         target_vc = VersifiedCorpus('org')
         target_vc.back_versification = {}
+        mapped_merge_objects = set()
         for source_verse_id in self.vref2verse.keys():
             target = v.verse_id_mapping_to_org.get(source_verse_id)
             if isinstance(target, str):
@@ -583,7 +1035,7 @@ class VersifiedCorpus:
                         target_vc.back_versification[target_verse_id] = source_verse_id
             elif isinstance(target, MergeObject):
                 merge_object = target
-                if not merge_object.verses_mapped:
+                if merge_object not in mapped_merge_objects:
                     target_verse_id = merge_object.target_verse_id
                     target_verses = []
                     range_verse = None
@@ -600,7 +1052,7 @@ class VersifiedCorpus:
                             target_vc.vref2verse[target_verse_id] = target_verse_s
                             target_vc.back_versification[target_verse_id] \
                                 = v.verse_list_pprint(merge_object.source_verse_ids)
-                    merge_object.verses_mapped = True
+                    mapped_merge_objects.add(merge_object)
             elif isinstance(target, SplitObject):
                 split_object = target
                 split_source_verse_id = split_object.source_verse_id
@@ -648,6 +1100,169 @@ class VersifiedCorpus:
                 else:
                     self.errors["dropped-target-verse-ids"].append(verse_id)
 
+    @staticmethod
+    def reversify_stream(corpus_filename: str, plan: ReversificationPlan, output_corpus_filename: str,
+                         bible: BibleStructure, f_log: TextIO = sys.stderr) -> VersifiedCorpus:
+        """Reversifies a corpus line by line as planned (see ReversificationPlan) and writes the reversified corpus,
+        with the same result as load_corpus, reversify and write_corpus, but holding only a small look-ahead buffer
+        (for merges) and the reversified verses not yet written in memory.
+        Returns the reversified VersifiedCorpus with back_versification, errors and warnings, but without verses."""
+        v = plan.v
+        target_vc = VersifiedCorpus('org')
+        target_vc.back_versification = {}
+        source_errors = defaultdict(list)
+        source_verse_ids, target_verse_ids = plan.source_verse_ids, plan.target_verse_ids
+        processed_source_verse_ids = set()
+        merge_source_verses = {}     # key: merge source verse ID  value: verse
+        mapped_merge_objects = set()
+        look_ahead_buffer = deque()  # element: (verse ID, verse) of line read, but not yet reversified
+        target_n_open_sources = dict(plan.target_n_sources)  # value: number of source verse IDs not yet reversified
+        written_target_verse_ids = set()
+        pending_target_verses = {}   # key: target verse ID  value: verse (until written to last line with verse ID)
+        dropped_target_verse_ids, dropped_non_org_descriptive_titles = [], []
+        n_lines_read, n_target_lines_written, n_verses_written, max_look_ahead = 0, 0, 0, 0
+
+        def read_line() -> bool:
+            nonlocal n_lines_read
+            if not (line := f_corpus.readline()):
+                return False
+            verse_id = source_verse_ids[n_lines_read] if n_lines_read < len(source_verse_ids) else ''
+            verse = line.strip()
+            if verse and (verse_id in plan.merge_source_verse_ids) and (verse_id not in merge_source_verses):
+                merge_source_verses[verse_id] = verse
+            look_ahead_buffer.append((verse_id, verse))
+            n_lines_read += 1
+            return True
+
+        def add_target_verse(target_verse_id: str, target_verse: str, back_verse_id: str | None,
+                             monitor_label: str | None = None, monitor_source_verse_id: str | None = None):
+            if target_verse_id in written_target_verse_ids:
+                target_vc.errors["duplicate-target-verse-ids"].append(target_verse_id)
+                if monitor_label and (target_verse_id in v.target_verse_ids_to_be_monitored):
+                    sys.stderr.write(f" -*{monitor_label}*- {v.schema} t:{target_verse_id} "
+                                     f"s:{monitor_source_verse_id}\n")
+                return
+            written_target_verse_ids.add(target_verse_id)
+            if back_verse_id is not None:
+                target_vc.back_versification[target_verse_id] = back_verse_id
+            if target_verse_id in plan.last_target_line:
+                pending_target_verses[target_verse_id] = target_verse
+            elif bible.valid_pseudo_verse_id_for_descriptive_title_not_in_org_schema(target_verse_id):
+                dropped_non_org_descriptive_titles.append(target_verse_id)
+            else:
+                dropped_target_verse_ids.append(target_verse_id)
+
+        general_util.mkdirs_in_path(output_corpus_filename)
+        with open(corpus_filename) as f_corpus, open(output_corpus_filename, "w") as f_out:
+            line_index = 0
+            while look_ahead_buffer or read_line():
+                source_verse_id, source_verse = look_ahead_buffer[0]
+                target = v.verse_id_mapping_to_org.get(source_verse_id)
+                if (isinstance(target, MergeObject) and source_verse and (target not in mapped_merge_objects)
+                        and (source_verse_id not in processed_source_verse_ids)):
+                    while (not plan.merge_sources_read(target, merge_source_verses, n_lines_read)) and read_line():
+                        pass
+                max_look_ahead = max(max_look_ahead, len(look_ahead_buffer) - 1)
+                look_ahead_buffer.popleft()
+                source_verse_resolved = False
+                if source_verse_id in processed_source_verse_ids:
+                    source_errors["duplicate-verse-ids"].append(source_verse_id)
+                elif source_verse:
+                    processed_source_verse_ids.add(source_verse_id)
+                    source_verse_resolved = True
+                    if isinstance(target, str):
+                        add_target_verse(target, source_verse, source_verse_id, 'MONITOR1a', source_verse_id)
+                    elif isinstance(target, MergeObject):
+                        merge_object = target
+                        if merge_object not in mapped_merge_objects:
+                            target_verses = []
+                            range_verse = None
+                            for merge_source_verse_id in merge_object.source_verse_ids:
+                                if merge_source_verse := merge_source_verses.get(merge_source_verse_id):
+                                    if merge_source_verse == '<range>':
+                                        range_verse = merge_source_verse
+                                    else:
+                                        target_verses.append(merge_source_verse)
+                            if target_verse_s := ' '.join(target_verses) if target_verses else range_verse:
+                                add_target_verse(merge_object.target_verse_id, target_verse_s,
+                                                 merge_object.source_verse_pprint)
+                            mapped_merge_objects.add(merge_object)
+                    elif isinstance(target, SplitObject):
+                        split_object = target
+                        source_copied = False
+                        letter_suffix_ord = ord('a') - 1  # add suffix 'a', 'b', 'c' to split source verse ID
+                        for target_verse_id in split_object.target_verse_ids:
+                            if target_verse_id in written_target_verse_ids:
+                                target_vc.errors["duplicate-target-verse-ids"].append(target_verse_id)
+                            else:
+                                letter_suffix_ord += 1
+                                add_target_verse(target_verse_id, "<range>" if source_copied else source_verse,
+                                                 split_object.source_verse_id + chr(letter_suffix_ord))
+                                source_copied = True
+                    else:
+                        add_target_verse(source_verse_id, source_verse, None, 'MONITOR1d', source_verse_id)
+                elif plan.last_source_line.get(source_verse_id) == line_index:
+                    source_verse_resolved = True  # source verse ID without any non-empty line
+                if source_verse_resolved:
+                    for target_verse_id in plan.target_verse_ids_of_source(source_verse_id):
+                        if target_verse_id in target_n_open_sources:
+                            target_n_open_sources[target_verse_id] -= 1
+                while ((n_target_lines_written < len(target_verse_ids))
+                       and not target_n_open_sources.get(target_verse_ids[n_target_lines_written])):
+                    n_verses_written += VersifiedCorpus.write_target_line(f_out, n_target_lines_written, plan,
+                                                                          pending_target_verses)
+                    n_target_lines_written += 1
+                line_index += 1
+            while n_target_lines_written < len(target_verse_ids):
+                n_verses_written += VersifiedCorpus.write_target_line(f_out, n_target_lines_written, plan,
+                                                                      pending_target_verses)
+                n_target_lines_written += 1
+        if dropped_target_verse_ids:
+            target_vc.errors["dropped-target-verse-ids"] = dropped_target_verse_ids
+        if dropped_non_org_descriptive_titles:
+            target_vc.warnings["dropped-non-org-descriptive-titles"] = dropped_non_org_descriptive_titles
+        target_vc.n_verses = n_verses_written
+        if source_errors:
+            f_log.write(f'Errors in {plan.source_vref_filename}: {source_errors}\n')
+        f_log.write(f'Reversified {n_lines_read:,d} lines of {corpus_filename} from schema "{v.schema}" and wrote '
+                    f'{n_verses_written:,d} verses to {output_corpus_filename} (look-ahead: {max_look_ahead} lines)\n')
+        return target_vc
+
+    @staticmethod
+    def write_target_line(f_out: TextIO, line_index: int, plan: ReversificationPlan, pending_target_verses: dict) -> int:
+        """Writes a line of a streamed reversified corpus; returns number of verses written (0 or 1)."""
+        target_verse_id = plan.target_verse_ids[line_index]
+        if plan.last_target_line[target_verse_id] == line_index:
+            verse = pending_target_verses.pop(target_verse_id, None)
+        else:
+            verse = pending_target_verses.get(target_verse_id)
+        if verse:
+            f_out.write(verse + '\n')
+            return 1
+        f_out.write('\n')
+        return 0
+
+    @staticmethod
+    def reversify_batch(corpus_filenames: List[str], plan: ReversificationPlan, output_dir: str,
+                        target_vref_filename: str, bible: BibleStructure, n_workers: int = 1) -> List[tuple]:
+        """Reversifies corpora that share a verse ID file with one plan, in parallel worker processes.
+        For each corpus, writes the reversified corpus, its back-versification and a log file to output_dir.
+        Returns a summary (corpus filename, number of verses written, number of errors) per corpus.
+        Raises ValueError for corpora with the same basename or an output_dir that would overwrite a corpus.
+        Workers are forked, so they share the plan without pickling it."""
+        global reversify_worker_plan
+        output_filename_cores = batch_output_filenames(corpus_filenames, output_dir)
+        jobs = [(corpus_filename, output_filename_core, target_vref_filename, bible)
+                for corpus_filename, output_filename_core in zip(corpus_filenames, output_filename_cores)]
+        reversify_worker_plan = plan
+        try:
+            if (n_workers > 1) and (len(jobs) > 1) and ('fork' in multiprocessing.get_all_start_methods()):
+                with multiprocessing.get_context('fork').Pool(min(n_workers, len(jobs))) as pool:
+                    return pool.map(reversify_in_worker, jobs)
+            return [reversify_in_worker(job) for job in jobs]
+        finally:
+            reversify_worker_plan = None
+
     def report_errors(self, vref_filename: str, f_log: TextIO):
         if self.errors:
             for error_type in self.errors.keys():
@@ -670,7 +1285,9 @@ class VersifiedCorpus:
 
 class BackVersification:
     """This class supports scripts to back-versify verse IDs from 'org' to what the user submitted."""
-    def __init__(self, filename: str | None):
+    no_line_index = -1  # in index remapping arrays (see compile_index): no corresponding line, i.e. empty line
+
+    def __init__(self, filename: str | None, verbose: bool = True):
         self.d = None
         self.log_d = defaultdict(int)
         if filename:
@@ -678,7 +1295,8 @@ class BackVersification:
                 with open(filename) as f:
                     if dict_s := f.read():
                         self.d = json.loads(dict_s)
-                        sys.stderr.write(f"Loaded {len(self.d):,d} back-versification entries from {filename}\n")
+                        if verbose:
+                            sys.stderr.write(f"Loaded {len(self.d):,d} back-versification entries from {filename}\n")
                     else:
                         sys.stderr.write(f"Could not read from {filename}\n")
             else:
@@ -747,6 +1365,151 @@ class BackVersification:
         diff = back_versification1.diff(back_versification2)
         out.write(f"No. of diff. back versifications: {len(diff)}   {diff}\n")
 
+    @staticmethod
+    def diff_dirs(dir1: str, dir2: str, n_workers: int = 1, out: TextIO = sys.stderr, max_n_listed: int = 10,
+                  max_n_examples: int = 3) -> List[tuple]:
+        """Diffs the back-versification files (*.json) with the same name in two directories, in parallel worker
+        processes, and writes a summary report (listing the file pairs with the most differences) to out.
+        Returns (filename1, filename2, number of differences, some examples) per file pair."""
+        filenames1 = sorted(filename for filename in os.listdir(dir1) if filename.endswith('.json'))
+        filenames2 = set(filename for filename in os.listdir(dir2) if filename.endswith('.json'))
+        jobs = [(os.path.join(dir1, filename), os.path.join(dir2, filename), max_n_examples)
+                for filename in filenames1 if filename in filenames2]
+        if (n_workers > 1) and (len(jobs) > 1):
+            with multiprocessing.Pool(min(n_workers, len(jobs))) as pool:
+                summaries = pool.map(back_versification_diff_in_worker, jobs,
+                                     chunksize=max(1, len(jobs) // (4 * n_workers)))
+        else:
+            summaries = [back_versification_diff_in_worker(job) for job in jobs]
+        if unpaired_filenames := sorted(set(filenames1) ^ filenames2):
+            out.write(f"Back-versification files in only one of {dir1} and {dir2}: {', '.join(unpaired_filenames)}\n")
+        diff_summaries = sorted((summary for summary in summaries if summary[2]), key=lambda summary: -summary[2])
+        out.write(f"Compared {len(summaries):,d} back-versification file pairs: {len(diff_summaries):,d} with "
+                  f"differences ({sum(summary[2] for summary in diff_summaries):,d} differences in total)\n")
+        for filename1, _filename2, n_diffs, examples in diff_summaries[:max_n_listed]:
+            out.write(f"  {Path(filename1).name}: {n_diffs:,d} differences, e.g. {examples}\n")
+        if len(diff_summaries) > max_n_listed:
+            out.write(f"  ... and {len(diff_summaries) - max_n_listed:,d} more file pairs with differences\n")
+        return summaries
+
+    def compile_index(self, org_vref_filename: str, user_vref_filename: str) -> array:
+        """Compiles back-versification into an index remapping array to back-versify corpora that match
+        org_vref_filename line by line into corpora that match user_vref_filename line by line.
+        Element i is the line index of the 'org' verse that back-versifies to the user verse ID of line i;
+        for further verses of a merged verse range (e.g. 'GEN 1:2' of 'GEN 1:1-2'), it is -2 - line index of the
+        merged verse (for '<range>'); it is no_line_index for user verse IDs without any 'org' verse."""
+        org_line_index = {}       # key: user verse ID  value: element of index remapping array
+        identity_line_index = {}  # same for 'org' verse IDs without back-versification entry (lower priority)
+        with open(org_vref_filename) as f_org_vref:
+            for line_index, line in enumerate(f_org_vref):
+                if not (verse_id := line.strip()):
+                    continue
+                if (back_verse_id := self.back_verse_id(verse_id)) == verse_id:
+                    identity_line_index.setdefault(verse_id, line_index)
+                elif ('-' in back_verse_id) \
+                        and (from_to_verse_id_pair := BibleUtilities.split_vref_start_end(back_verse_id)):
+                    org_line_index.setdefault(from_to_verse_id_pair[0], line_index)
+                    book, chapter, from_verse, _ = Versification.split_verse_id(from_to_verse_id_pair[0])
+                    book2, chapter2, to_verse, _ = Versification.split_verse_id(from_to_verse_id_pair[1])
+                    if (book, chapter) == (book2, chapter2) and isinstance(from_verse, int) \
+                            and isinstance(to_verse, int):
+                        for verse in range(from_verse + 1, to_verse + 1):
+                            org_line_index.setdefault(f"{book} {chapter}:{verse}", -2 - line_index)
+                elif regex.match(r'\S+ \d+:\d+a$', back_verse_id):  # first part of split verse, e.g. 'GEN 1:1a'
+                    org_line_index.setdefault(back_verse_id, line_index)
+                    org_line_index.setdefault(back_verse_id[:-1], line_index)
+                else:
+                    org_line_index.setdefault(back_verse_id, line_index)
+        for verse_id, line_index in identity_line_index.items():
+            org_line_index.setdefault(verse_id, line_index)
+        with open(user_vref_filename) as f_user_vref:
+            return array('q', (org_line_index.get(line.strip(), BackVersification.no_line_index)
+                               for line in f_user_vref))
+
+    @staticmethod
+    def apply_index(index: array, corpus_filename: str, output_corpus_filename: str) -> int:
+        """Back-versifies a corpus with an index remapping array (see compile_index) by permuting its lines.
+        Returns the number of verses written."""
+        with open(corpus_filename) as f_corpus:
+            lines = f_corpus.read().splitlines()
+        n_lines = len(lines)
+        verses = [(lines[i] if i < n_lines else '') if i >= 0
+                  else ('<range>' if (i < -1) and (-2 - i < n_lines) and lines[-2 - i] else '')
+                  for i in index]
+        general_util.mkdirs_in_path(output_corpus_filename)
+        with open(output_corpus_filename, 'w') as f_out:
+            f_out.write(''.join(verse + '\n' for verse in verses))
+        return sum(1 for verse in verses if verse)
+
+    @staticmethod
+    def apply_batch(corpus_filenames: List[str], index: array, output_dir: str, n_workers: int = 1) -> List[tuple]:
+        """Back-versifies corpora with an index remapping array (see compile_index) in parallel worker processes,
+        writing the back-versified corpora to output_dir.
+        Returns a summary (corpus filename, output corpus filename, number of verses written) per corpus.
+        Raises ValueError for corpora with the same basename or an output_dir that would overwrite a corpus.
+        Workers are forked, so they share the index without pickling it."""
+        global back_versify_worker_index
+        jobs = list(zip(corpus_filenames, batch_output_filenames(corpus_filenames, output_dir)))
+        back_versify_worker_index = index
+        try:
+            if (n_workers > 1) and (len(jobs) > 1) and ('fork' in multiprocessing.get_all_start_methods()):
+                with multiprocessing.get_context('fork').Pool(min(n_workers, len(jobs))) as pool:
+                    return pool.map(back_versify_in_worker, jobs)
+            return [back_versify_in_worker(job) for job in jobs]
+        finally:
+            back_versify_worker_index = None
+
+
+def batch_output_filenames(corpus_filenames: List[str], output_dir: str) -> List[str]:
+    """Output filenames of batch corpora in output_dir (same basename as the corpus).
+    Raises ValueError if two corpora have the same basename or if an output file would overwrite a corpus."""
+    output_filenames = [os.path.join(output_dir, Path(corpus_filename).name) for corpus_filename in corpus_filenames]
+    if len(set(output_filenames)) < len(output_filenames):
+        raise ValueError(f"Batch corpus filenames with the same basename: {corpus_filenames}")
+    corpus_real_paths = set(os.path.realpath(corpus_filename) for corpus_filename in corpus_filenames)
+    if overwritten_filenames := [output_filename for output_filename in output_filenames
+                                 if os.path.realpath(output_filename) in corpus_real_paths]:
+        raise ValueError(f"Batch output files would overwrite input corpora: {overwritten_filenames}")
+    return output_filenames
+
+
+def reversify_in_worker(job: tuple) -> tuple:
+    corpus_filename, output_filename_core, target_vref_filename, bible = job
+    with open(f'{output_filename_core}.log', 'w') as f_log:
+        reversified_corpus = VersifiedCorpus.reversify_stream(corpus_filename, reversify_worker_plan,
+                                                              output_filename_core, bible, f_log)
+        reversified_corpus.report_errors(target_vref_filename, f_log)
+    with open(f'{output_filename_core}.back_versification.json', 'w') as f_br:
+        f_br.write(json.dumps(reversified_corpus.back_versification) + '\n')
+    n_errors = sum(len(verse_ids) for verse_ids in reversified_corpus.errors.values())
+    return corpus_filename, reversified_corpus.n_verses, n_errors
+
+
+def compile_versification_in_worker(schema: str) -> tuple:
+    """Compiles and checks a schema into the precompiled schema cache (see Versification.precompile_versifications)"""
+    start_time = time.perf_counter()
+    bible, _f_log, standard_mapping_dir, supplementary_mapping_filename = Versification.load_args
+    f_schema_log = io.StringIO()
+    v = Versification.compile_versification(schema, bible, f_schema_log, standard_mapping_dir,
+                                            supplementary_mapping_filename)
+    Versification.store_compiled_schema(schema, v, f_schema_log.getvalue())
+    return schema, v.check_duration, time.perf_counter() - start_time
+
+
+def back_versify_in_worker(job: tuple) -> tuple:
+    corpus_filename, output_corpus_filename = job
+    n_verses = BackVersification.apply_index(back_versify_worker_index, corpus_filename, output_corpus_filename)
+    return corpus_filename, output_corpus_filename, n_verses
+
+
+def back_versification_diff_in_worker(job: tuple) -> tuple:
+    filename1, filename2, max_n_examples = job
+    back_versification1 = BackVersification(filename1, verbose=False)
+    back_versification2 = BackVersification(filename2, verbose=False)
+    back_versification1.d, back_versification2.d = back_versification1.d or {}, back_versification2.d or {}
+    diff = back_versification1.diff(back_versification2)
+    return filename1, filename2, len(diff), dict(list(diff.items())[:max_n_examples])
+
 
 def main():
     supplementary_mapping_filename = Versification.supplementary_mapping_filename()
@@ -763,7 +1526,22 @@ def main():
     parser.add_argument('-b', '--back_versification_filename', default='vers/back_versification.json')
     parser.add_argument('-m', '--standard_mapping_dir')
     parser.add_argument('--back_versification_diff', nargs=2)
+    parser.add_argument('--precompile_schemas', action='store_true',
+                        help='check and precompile changed standard versification schemas (see --workers)')
+    parser.add_argument('--back_versification_diff_dirs', nargs=2, metavar='DIRECTORY',
+                        help='diff back-versification files (*.json) with the same name in 2 directories')
+    parser.add_argument('--back_versify_batch', nargs='+', metavar='FILENAME',
+                        help='corpora matching -t to be back-versified with -b to match -j (see --batch_output_dir)')
     parser.add_argument('--supplementary_verse_mapping', default=supplementary_mapping_filename)
+    parser.add_argument('--stream', action='store_true',
+                        help='reversify corpus line by line in small memory (requires -s)')
+    parser.add_argument('--batch_input_corpus_filenames', nargs='+', metavar='FILENAME',
+                        help='corpora sharing verse ID file -j and schema -s, to be reversified in a batch')
+    parser.add_argument('--batch_output_dir', default='vers/batch', metavar='DIRECTORY',
+                        help='directory for reversified corpora, back versifications and logs of a batch')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='number of worker processes for batch reversification, batch back-versification, '
+                             'back-versification diffs and schema precompilation (default: 1)')
     args = parser.parse_args()
     # sys.stderr.write(f"vref: {args.output_verse_id_filename}\n")
     f_corpus_log = sys.stderr  # default
@@ -771,6 +1549,20 @@ def main():
         sys.stderr.write(f"back_versification_diff: {bv_filenames}\n")
         BackVersification.diff_files(bv_filenames[0], bv_filenames[1])
         return
+    if bv_dirs := args.back_versification_diff_dirs:
+        BackVersification.diff_dirs(bv_dirs[0], bv_dirs[1], args.workers)
+        return
+    if args.back_versify_batch:
+        if not args.input_verse_id_filename:
+            sys.stderr.write("** Error: batch back-versification requires a user verse ID file (-j)\n")
+            return
+        index = BackVersification(args.back_versification_filename).compile_index(args.output_verse_id_filename,
+                                                                                args.input_verse_id_filename)
+        os.makedirs(args.batch_output_dir, exist_ok=True)
+        summaries = BackVersification.apply_batch(args.back_versify_batch, index, args.batch_output_dir, args.workers)
+        sys.stderr.write(f"Back-versified {len(summaries):,d} corpora ({sum(summary[2] for summary in summaries):,d} "
+                         f"verses) to {args.batch_output_dir}\n")
+        return
     if args.corpus_log_filename:
         try:
             general_util.mkdirs_in_path(args.corpus_log_filename)
@@ -784,26 +1576,57 @@ def main():
             f_data_log = open(args.data_log_filename, 'w')
         except IOError:
             sys.stderr.write(f"Cannot write to {args.data_log_filename}")
+    from greekroom.versification.vref_corpus_store import VrefCorpusStore
     bible = BibleStructure()
     Versification.load_versifications(bible, f_data_log, args.standard_mapping_dir, args.supplementary_verse_mapping)
-    if args.input_corpus_filename and args.input_verse_id_filename:
+    if args.precompile_schemas:
+        Versification.precompile_versifications(args.workers)
+    Versification.load_all_versifications()  # data log of all standard schemas, whether precompiled or not
+    if ((args.stream or args.batch_input_corpus_filenames) and args.input_verse_id_filename
+            and args.output_verse_id_filename):
+        if not (args.input_schema and (source_versification := Versification.get_versification(args.input_schema))):
+            sys.stderr.write("** Error: streaming and batch reversification require a valid input schema (-s)\n")
+        else:
+            plan = ReversificationPlan.from_files(source_versification, args.input_verse_id_filename,
+                                                  args.output_verse_id_filename)
+            if args.batch_input_corpus_filenames:
+                os.makedirs(args.batch_output_dir, exist_ok=True)
+                for corpus_filename, n_verses, n_errors \
+                        in VersifiedCorpus.reversify_batch(args.batch_input_corpus_filenames, plan,
+                                                           args.batch_output_dir, args.output_verse_id_filename,
+                                                           bible, args.workers):
+                    sys.stderr.write(f"Reversified {corpus_filename}: {n_verses:,d} verses written, "
+                                     f"{n_errors:,d} errors\n")
+                sys.stderr.write(f"Reversified {len(args.batch_input_corpus_filenames)} corpora to "
+                                 f"{args.batch_output_dir}\n")
+            elif args.input_corpus_filename and args.output_corpus_filename:
+                reversified_corpus = VersifiedCorpus.reversify_stream(args.input_corpus_filename, plan,
+                                                                      args.output_corpus_filename, bible, sys.stderr)
+                reversified_corpus.report_errors(args.output_verse_id_filename, sys.stderr)
+                if args.back_versification_filename:
+                    general_util.mkdirs_in_path(args.back_versification_filename)
+                    with open(args.back_versification_filename, "w") as f_br:
+                        f_br.write(json.dumps(reversified_corpus.back_versification) + '\n')
+                        sys.stderr.write(f"Wrote {len(reversified_corpus.back_versification):,d} back "
+                                         f"versification mappings to {args.back_versification_filename}\n")
+    elif args.input_corpus_filename and (args.input_verse_id_filename
+                                         or VrefCorpusStore.is_store_file(args.input_corpus_filename)):
         input_corpus = VersifiedCorpus(args.input_schema)
         input_corpus.load_corpus(args.input_corpus_filename, args.input_verse_id_filename, f_corpus_log)
         best_cost: float | None = None
         best_schema = None
         best_versification = None
         input_versification = None
-        for schema in ('org', 'eng', 'rsc', 'rso', 'vul', 'lxx'):
-            if v := Versification.versification_d[schema]:
-                vm = VersificationMatch(input_corpus, v, bible)
-                if best_cost is None or vm.cost < best_cost:
-                    best_cost, best_schema, best_versification = vm.cost, v.schema, v
+        for vm in Versification.get_verse_schema_matrix().match(input_corpus, bible):
+            if best_cost is None or vm.cost < best_cost:
+                best_cost, best_schema = vm.cost, vm.schema
         if best_schema:
+            best_versification = Versification.get_versification(best_schema)
             best_schema_name = bible.standard_versification_schemas.get(best_schema)
             sys.stderr.write(f"Schema with lowest cost: {best_schema} ({best_schema_name})\n")
         if input_schema := args.input_schema:
             input_schema_name = bible.standard_versification_schemas.get(input_schema)
-            input_versification = Versification.versification_d.get(input_schema)
+            input_versification = Versification.get_versification(input_schema)
             sys.stderr.write(f"Input schema: {input_schema} ({input_schema_name})\n")
         if source_versification := input_versification or best_versification:
             if input_versification and (input_versification != best_versification):
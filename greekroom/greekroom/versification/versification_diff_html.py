@@ -7,6 +7,7 @@
 #     -v ../vref.txt -o vref/diff_vref.html
 
 import argparse
+import bisect
 from collections import defaultdict
 import datetime
 from pathlib import Path
@@ -163,33 +164,121 @@ def string_is_right_to_left(s: str) -> bool:
     return n_arabic + n_hebrew > 0.5 * n_letters
 
 
+class VersePrefixIndex:
+    """This class indexes the verses of a corpus (the anchor) by verse text and by verse text prefix, so that
+    the verses that a (merged) verse text starts with can be looked up directly rather than compared one by one."""
+    prefix_length = 8
+
+    def __init__(self, line_number_to_verse_txt: dict):
+        self.n_lines = len(line_number_to_verse_txt)
+        self.verse_txt_to_line_numbers = defaultdict(list)  # key: verse text  value: line numbers (ascending)
+        self.prefix_to_line_numbers = defaultdict(list)     # key: prefix of longer verse text  value: line numbers
+        self.short_verse_txt_lengths = set()                # lengths of non-empty verse texts shorter than prefix
+        self.empty_line_numbers = []                        # line numbers of empty verses (ascending)
+        for line_number in range(1, self.n_lines + 1):
+            verse_txt = line_number_to_verse_txt[line_number].strip()
+            self.verse_txt_to_line_numbers[verse_txt].append(line_number)
+            if verse_txt == '':
+                self.empty_line_numbers.append(line_number)
+            elif len(verse_txt) < self.prefix_length:
+                self.short_verse_txt_lengths.add(len(verse_txt))
+            else:
+                self.prefix_to_line_numbers[verse_txt[:self.prefix_length]].append(line_number)
+
+    @staticmethod
+    def line_numbers_in_range(line_numbers: List[int], from_line_number: int, to_line_number: int) -> List[int]:
+        return line_numbers[bisect.bisect_left(line_numbers, from_line_number):
+                            bisect.bisect_right(line_numbers, to_line_number)]
+
+    def prefix_line_numbers(self, s: str, line_number_to_verse_txt: dict, from_line_number: int,
+                            to_line_number: int) -> List[int]:
+        """Line numbers (in range) of non-empty verses that s starts with"""
+        prefix_line_numbers = self.prefix_to_line_numbers.get(s[:self.prefix_length], [])
+        result = [line_number
+                  for line_number in self.line_numbers_in_range(prefix_line_numbers, from_line_number, to_line_number)
+                  if s.startswith(line_number_to_verse_txt[line_number].strip())]
+        for length in self.short_verse_txt_lengths:
+            if length <= len(s):
+                result.extend(self.line_numbers_in_range(self.verse_txt_to_line_numbers.get(s[:length], []),
+                                                         from_line_number, to_line_number))
+        return result
+
+    def empty_line_numbers_in_range(self, from_line_number: int, to_line_number: int) -> List[int]:
+        """Line numbers (in range) of empty verses, incl. line numbers outside the corpus"""
+        return (list(range(from_line_number, min(0, to_line_number) + 1))
+                + self.line_numbers_in_range(self.empty_line_numbers, from_line_number, to_line_number)
+                + list(range(max(self.n_lines + 1, from_line_number), to_line_number + 1)))
+
+
 def find_non_consecutive_matching_verses(s: str, line_number_to_verse_txt: dict, anchor_line_number_to_verse_txt: dict,
-                                         center_line_number: int, prev_anchor_line_numbers: List[int]) \
+                                         anchor_verse_index: VersePrefixIndex, center_line_number: int,
+                                         prev_anchor_line_numbers: List[int], failed_searches: set | None = None) \
         -> List[int | str]:
-    for abs_line_diff in range(0, 21):
-        for anchor_line_number in [center_line_number + abs_line_diff,
-                                   center_line_number - abs_line_diff]:
-            if ((anchor_line_number not in prev_anchor_line_numbers)
-                    and (line_number_to_verse_txt[anchor_line_number]
-                         != anchor_line_number_to_verse_txt[anchor_line_number])):
-                anchor_verse_txt = anchor_line_number_to_verse_txt[anchor_line_number].rstrip()
-                if s.startswith(anchor_verse_txt):
-                    if remaining_text := s[len(anchor_verse_txt):].strip():
-                        remaining_matches = find_non_consecutive_matching_verses(remaining_text,
-                                                                                 line_number_to_verse_txt,
-                                                                                 anchor_line_number_to_verse_txt,
-                                                                                 anchor_line_number,
-                                                                                 prev_anchor_line_numbers
-                                                                                 + [anchor_line_number])
-                        if remaining_matches:
-                            return [anchor_line_number] + remaining_matches
-                    else:
-                        return [anchor_line_number]
+    # Candidate anchor lines (within 20 lines of center) are looked up in the anchor_verse_index, nearest first.
+    # Searches that failed before (same remaining text, center and previous non-empty anchor lines in any order)
+    # are not repeated. (Empty anchor lines only move the center, so paths through them are not told apart.)
+    if failed_searches is None:
+        failed_searches = set()
+    search = (len(s), center_line_number,
+              frozenset(anchor_line_number for anchor_line_number in prev_anchor_line_numbers
+                        if anchor_line_number_to_verse_txt.get(anchor_line_number)))
+    if search in failed_searches:
+        return []
+    from_line_number, to_line_number = center_line_number - 20, center_line_number + 20
+    anchor_line_numbers = (anchor_verse_index.prefix_line_numbers(s, anchor_line_number_to_verse_txt,
+                                                                  from_line_number, to_line_number)
+                           + anchor_verse_index.empty_line_numbers_in_range(from_line_number, to_line_number))
+    anchor_line_numbers.sort(key=lambda anchor_line_number: (abs(anchor_line_number - center_line_number),
+                                                             anchor_line_number < center_line_number))
+    for anchor_line_number in anchor_line_numbers:
+        if ((anchor_line_number not in prev_anchor_line_numbers)
+                and (line_number_to_verse_txt.get(anchor_line_number, '')
+                     != anchor_line_number_to_verse_txt.get(anchor_line_number, ''))):
+            anchor_verse_txt = anchor_line_number_to_verse_txt.get(anchor_line_number, '').rstrip()
+            if remaining_text := s[len(anchor_verse_txt):].strip():
+                remaining_matches = find_non_consecutive_matching_verses(remaining_text,
+                                                                         line_number_to_verse_txt,
+                                                                         anchor_line_number_to_verse_txt,
+                                                                         anchor_verse_index,
+                                                                         anchor_line_number,
+                                                                         prev_anchor_line_numbers
+                                                                         + [anchor_line_number],
+                                                                         failed_searches)
+                if remaining_matches:
+                    return [anchor_line_number] + remaining_matches
+            else:
+                return [anchor_line_number]
+    failed_searches.add(search)
+    return []
+
+
+def find_consecutive_matching_verses(verse_text: str, line_number: int, anchor_line_number_to_verse_txt: dict,
+                                     anchor_verse_index: VersePrefixIndex) -> List[int]:
+    # Candidate start lines (within 20 lines of line_number) are looked up in the anchor_verse_index, nearest first.
+    from_line_number, to_line_number = line_number - 20, line_number + 20
+    anchor_start_line_numbers \
+        = (anchor_verse_index.prefix_line_numbers(verse_text, anchor_line_number_to_verse_txt,
+                                                  from_line_number, to_line_number)
+           + anchor_verse_index.empty_line_numbers_in_range(from_line_number, to_line_number))
+    anchor_start_line_numbers.sort(key=lambda anchor_start_line_number: (abs(anchor_start_line_number - line_number),
+                                                                         anchor_start_line_number > line_number))
+    for anchor_start_line_number in anchor_start_line_numbers:
+        anchor_line_number = anchor_start_line_number
+        remaining_verse_text = verse_text
+        while remaining_verse_text and (anchor_line_number <= anchor_verse_index.n_lines):
+            anchor_verse_txt = anchor_line_number_to_verse_txt.get(anchor_line_number, '').strip()
+            if remaining_verse_text.startswith(anchor_verse_txt):
+                remaining_verse_text = remaining_verse_text[len(anchor_verse_txt):].strip()
+                anchor_line_number += 1
+            else:
+                break
+        if remaining_verse_text == '':
+            return list(range(anchor_start_line_number, anchor_line_number))
     return []
 
 
 def find_matching_verses(line_number: int, line_number_to_verse_txt: dict, anchor_line_number_to_verse_txt: dict,
-                         verse_txt_to_anchor_line_numbers: dict, prev_line_number_diff: int | None = None) \
+                         anchor_verse_index: VersePrefixIndex, prev_line_number_diff: int | None = None) \
         -> List[int | str]:
     verse_text = line_number_to_verse_txt[line_number]
     if verse_text == '':
@@ -199,7 +288,7 @@ def find_matching_verses(line_number: int, line_number_to_verse_txt: dict, ancho
     if verse_text == anchor_verse_text:
         return [line_number]
     # match with some other (single) line
-    if anchor_line_numbers := verse_txt_to_anchor_line_numbers[verse_text]:
+    if anchor_line_numbers := anchor_verse_index.verse_txt_to_line_numbers.get(verse_text):
         best_anchor_line_number = None
         best_line_number_diff = None
         for anchor_line_number in anchor_line_numbers:
@@ -213,23 +302,14 @@ def find_matching_verses(line_number: int, line_number_to_verse_txt: dict, ancho
         if best_anchor_line_number is not None:
             return [best_anchor_line_number]
     # match with consecutive lines
-    for abs_line_diff in range(0, 21):
-        for anchor_start_line_number in [line_number - abs_line_diff, line_number + abs_line_diff]:
-            anchor_line_number = anchor_start_line_number
-            remaining_verse_text = verse_text.strip()
-            while remaining_verse_text:
-                anchor_verse_txt = anchor_line_number_to_verse_txt[anchor_line_number]
-                if remaining_verse_text.startswith(anchor_verse_txt.strip()):
-                    remaining_verse_text = remaining_verse_text[len(anchor_verse_txt.strip()):].strip()
-                    anchor_line_number += 1
-                else:
-                    break
-            if remaining_verse_text == '':
-                return list(range(anchor_start_line_number, anchor_line_number))
+    if result := find_consecutive_matching_verses(verse_text.strip(), line_number, anchor_line_number_to_verse_txt,
+                                                  anchor_verse_index):
+        return result
     # match with non-consecutive lines
     if result := find_non_consecutive_matching_verses(verse_text.strip(),
                                                       line_number_to_verse_txt,
                                                       anchor_line_number_to_verse_txt,
+                                                      anchor_verse_index,
                                                       line_number,
                                                       []):
         return result
@@ -266,7 +346,6 @@ def main():
     line_number_to_vref = defaultdict(str)
     vref_to_line_number = defaultdict(int)
     line_number_to_verse_txt_list: List[dict] = []   # for each input and reference, defaultdict(str)
-    verse_txt_to_line_numbers_list: List[dict] = []  # for each input, defaultdict(list)
     remap = defaultdict(int)
     with open(args.vref_filename) as f_vref:
         line_number = 0
@@ -288,18 +367,14 @@ def main():
             line_number = 0
             line_number_to_verse_txt = defaultdict(str)
             line_number_to_verse_txt_list.append(line_number_to_verse_txt)
-            if input_p:
-                verse_txt_to_line_numbers = defaultdict(list)
-                verse_txt_to_line_numbers_list.append(verse_txt_to_line_numbers)
             for line in f_in:
                 line = line.strip()
                 line_number += 1
                 line_number_to_verse_txt[line_number] = line
-                if input_p:
-                    verse_txt_to_line_numbers[line].append(line_number)
             if line_number != n_vref_lines:
                 sys.stderr.write(f"Verse number mismatch: {n_vref_lines} ({args.vref_filename}) "
                                  f"!= {line_number} ({input_filename})\n")
+    anchor_verse_index = VersePrefixIndex(line_number_to_verse_txt_list[n_input_files-1])
     general_util.mkdirs_in_path(args.output_filename)
     with open(args.output_filename, 'w') as f_html:
         date = f"{datetime.datetime.now():%B %-d, %Y at %-H:%M}"
@@ -335,7 +410,6 @@ def main():
                 f_html.write(f"     <tr><td valign='top' patitle='{verse_id} at line {line_number}'>"
                              f"<nobr>{verse_id}</nobr></td>")
                 anchor_index = n_input_files-1
-                verse_txt_to_anchor_line_numbers = verse_txt_to_line_numbers_list[anchor_index]
                 anchor_legend = legends[anchor_index]
                 for i in range(n_input_and_ref_filenames):
                     # verbose = ((i == 0) and (1709 < line_number < 1714))
@@ -348,7 +422,7 @@ def main():
                             = find_matching_verses(line_number,
                                                    line_number_to_verse_txt_list[i],
                                                    line_number_to_verse_txt_list[anchor_index],
-                                                   verse_txt_to_anchor_line_numbers,
+                                                   anchor_verse_index,
                                                    remap.get((i, line_number-1)))
                         # if verbose: sys.stderr.write(f"  P.A {verse_id} {line_number} "
                         #                              f"{matching_anchor_line_numbers}\n")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vref_corpus_store.py
+# This tool converts a versified corpus (two parallel files: verses and verse IDs) into a vref corpus store,
+#   a single file that tools (e.g. versification.py, verse_inspection.py, owl) can memory-map instead of the two files.
+# vref_corpus_store.py -i f_usfm.txt -j f_usfm_vref.txt -o f_usfm.vrefcorpus
+
+from __future__ import annotations
+from array import array
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Iterable, Iterator, List, Tuple
+from greekroom.gr_utilities import general_util
+from greekroom.versification.versification import BibleStructure
+
+
+class VrefCorpusStore:
+    """This class is for a memory-mapped versified corpus. The store file contains (little-endian):
+    a header, packed verse IDs (one per line, see BibleStructure.pack_verse_id; other verse IDs, incl. those with
+    process-local book numbers such as 'Gen 1:1': -1, -2, ...),
+    the index of the next line with the same verse ID (or -1), line flags (1: line is not blank),
+    offsets of the lines in a UTF-8 text blob, an open-addressing hash table from verse ID to its first line,
+    verse IDs that can't be packed (JSON) and the text blob.
+    Opening a store reads only its header, so that verses can be looked up right away, by line or by verse ID,
+    and processes using the same store share it in the page cache."""
+    magic = b'GRVC'
+    format_version = 2
+    header_format = '<4sIQQQQQQ'  # magic, version, n_lines, n_vref_lines, table size, extra offset, length, blob offset
+    header_size = 64
+    hash_multiplier = 0x9E3779B97F4A7C15
+
+    def __init__(self, store_filename: str, bible: BibleStructure | None = None):
+        self.store_filename = store_filename
+        self.bible = bible or BibleStructure()
+        with open(store_filename, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, format_version, self.n_lines, self.n_vref_lines, self.table_size, extra_offset, extra_length,
+         self.blob_offset) = struct.unpack_from(self.header_format, self.mm)
+        if (magic != self.magic) or (format_version != self.format_version):
+            self.mm.close()
+            raise ValueError(f"Not a vref corpus store (version {self.format_version}): {store_filename}")
+        self.table_bits = self.table_size.bit_length() - 1
+        buffer = memoryview(self.mm)
+        position = self.header_size
+        self.packed_verse_ids, position = self.array_view(buffer, position, self.n_lines, 'q')
+        self.next_line_with_same_verse_id, position = self.array_view(buffer, position, self.n_lines, 'q')
+        self.line_flags, position = self.array_view(buffer, position, self.n_lines, 'B')
+        position = (position + 7) & ~7
+        self.offsets, position = self.array_view(buffer, position, self.n_lines + 1, 'Q')
+        self.hash_table, position = self.array_view(buffer, position, self.table_size, 'q')
+        self.other_verse_ids = json.loads(bytes(buffer[extra_offset:extra_offset + extra_length]))  # for -1, -2, ...
+        self.other_verse_id_keys = {verse_id: -1 - i for i, verse_id in enumerate(self.other_verse_ids)}
+
+    def __repr__(self):
+        return f"VrefCorpusStore {self.store_filename} with {self.n_lines:,d} lines"
+
+    def __len__(self):
+        return self.n_lines
+
+    @staticmethod
+    def array_view(buffer: memoryview, position: int, n: int, typecode: str) -> Tuple[memoryview | array, int]:
+        end_position = position + n * array(typecode).itemsize
+        if sys.byteorder == 'little':
+            return buffer[position:end_position].cast(typecode), end_position
+        values = array(typecode, buffer[position:end_position])  # big-endian platform: copy
+        values.byteswap()
+        return values, end_position
+
+    @staticmethod
+    def is_store_file(filename: str) -> bool:
+        try:
+            with open(filename, 'rb') as f:
+                return f.read(len(VrefCorpusStore.magic)) == VrefCorpusStore.magic
+        except IOError:
+            return False
+
+    @staticmethod
+    def hash_slot(key: int, table_bits: int) -> int:
+        return ((key * VrefCorpusStore.hash_multiplier) & 0xFFFFFFFFFFFFFFFF) >> (64 - table_bits)
+
+    @staticmethod
+    def write_store(store_filename: str, verse_id_and_lines: Iterable[Tuple[str | None, str]],
+                    bible: BibleStructure | None = None) -> int:
+        """Writes store from (verse ID, line) pairs, with verse ID None after the end of the verse ID file.
+        Verse IDs are right-stripped, lines without final newline. Returns number of lines."""
+        bible = bible or BibleStructure()
+        packed_verse_ids, line_flags, offsets = array('q'), bytearray(), array('Q', [0])
+        other_verse_ids, other_verse_id_keys = [], {}
+        blob = bytearray()
+        n_vref_lines = 0
+        for verse_id, line in verse_id_and_lines:
+            if verse_id is None:
+                verse_id = ''
+            else:
+                n_vref_lines += 1
+            packed_verse_id = bible.pack_verse_id(verse_id)
+            if (packed_verse_id is None) or not bible.persistable_packed_verse_id(packed_verse_id):
+                if (packed_verse_id := other_verse_id_keys.get(verse_id)) is None:
+                    other_verse_ids.append(verse_id)
+                    packed_verse_id = other_verse_id_keys[verse_id] = -len(other_verse_ids)
+            packed_verse_ids.append(packed_verse_id)
+            line_flags.append(1 if line.strip() else 0)
+            blob += line.encode('utf-8')
+            offsets.append(len(blob))
+        n_lines = len(packed_verse_ids)
+        next_line_with_same_verse_id = array('q', [-1] * n_lines)
+        table_bits = max(3, (2 * n_lines).bit_length())
+        hash_table = array('q', [-1] * (1 << table_bits))
+        last_line = {}  # key: packed verse ID  value: last line with verse ID so far
+        for line_index, packed_verse_id in enumerate(packed_verse_ids):
+            if (prev_line_index := last_line.get(packed_verse_id)) is None:
+                slot = VrefCorpusStore.hash_slot(packed_verse_id, table_bits)
+                while hash_table[slot] >= 0:
+                    slot = (slot + 1) & (len(hash_table) - 1)
+                hash_table[slot] = line_index
+            else:
+                next_line_with_same_verse_id[prev_line_index] = line_index
+            last_line[packed_verse_id] = line_index
+        extra = json.dumps(other_verse_ids).encode('utf-8')
+        sections = [packed_verse_ids, next_line_with_same_verse_id, line_flags]
+        position = VrefCorpusStore.header_size + sum(len(section) * getattr(section, 'itemsize', 1)
+                                                     for section in sections)
+        padding = bytes(-position % 8)
+        position += len(padding) + (len(offsets) + len(hash_table)) * 8
+        extra_offset, blob_offset = position, position + len(extra)
+        header = struct.pack(VrefCorpusStore.header_format, VrefCorpusStore.magic, VrefCorpusStore.format_version,
+                             n_lines, n_vref_lines, len(hash_table), extra_offset, len(extra), blob_offset)
+        general_util.mkdirs_in_path(store_filename)
+        tmp_filename = f"{store_filename}.tmp{os.getpid()}"
+        with open(tmp_filename, 'wb') as f_out:
+            f_out.write(header.ljust(VrefCorpusStore.header_size, b'\0'))
+            for section in (packed_verse_ids, next_line_with_same_verse_id, line_flags, padding, offsets, hash_table):
+                if isinstance(section, array) and (sys.byteorder != 'little'):
+                    section = array(section.typecode, section)
+                    section.byteswap()
+                f_out.write(section)
+            f_out.write(extra)
+            f_out.write(blob)
+        os.replace(tmp_filename, store_filename)
+        return n_lines
+
+    @staticmethod
+    def read_corpus_files(corpus_filename: str, vref_filename: str) -> Iterator[Tuple[str | None, str]]:
+        """(verse ID, line) pairs of a corpus file and its verse ID file, verse ID None after end of verse ID file"""
+        with open(corpus_filename) as f_corpus, open(vref_filename) as f_vref:
+            for line in f_corpus:
+                vref_line = f_vref.readline()
+                yield (vref_line.rstrip() if vref_line else None), line[:-1] if line.endswith('\n') else line
+
+    @staticmethod
+    def build(corpus_filename: str, vref_filename: str, store_filename: str,
+              bible: BibleStructure | None = None) -> int:
+        return VrefCorpusStore.write_store(store_filename,
+                                           VrefCorpusStore.read_corpus_files(corpus_filename, vref_filename), bible)
+
+    @staticmethod
+    def corpus_lines(corpus_filename: str, vref_filename: str | None) -> Iterator[Tuple[str | None, str]]:
+        """(verse ID, line) pairs from a vref corpus store or from a corpus file and its verse ID file"""
+        if VrefCorpusStore.is_store_file(corpus_filename):
+            store = VrefCorpusStore(corpus_filename)
+            try:
+                yield from store.lines()
+            finally:
+                store.close()
+        else:
+            yield from VrefCorpusStore.read_corpus_files(corpus_filename, vref_filename)
+
+    def close(self) -> None:
+        for view in (self.packed_verse_ids, self.next_line_with_same_verse_id, self.line_flags, self.offsets,
+                     self.hash_table):
+            if isinstance(view, memoryview):
+                view.release()
+        self.mm.close()
+
+    def verse_id(self, line_index: int) -> str | None:
+        """Verse ID of line; None after the end of the verse ID file"""
+        if line_index >= self.n_vref_lines:
+            return None
+        if (packed_verse_id := self.packed_verse_ids[line_index]) >= 0:
+            return self.bible.verse_id(packed_verse_id)
+        return self.other_verse_ids[-1 - packed_verse_id]
+
+    def line(self, line_index: int) -> str:
+        return self.mm[self.blob_offset + self.offsets[line_index]:
+                       self.blob_offset + self.offsets[line_index + 1]].decode('utf-8')
+
+    def line_is_blank(self, line_index: int) -> bool:
+        return not self.line_flags[line_index]
+
+    def line_indexes(self, verse_id: str) -> List[int]:
+        """Indexes of all lines with verse ID (in O(1) for verse IDs on a single line)"""
+        key = self.bible.pack_verse_id(verse_id)
+        if (key is None) or not self.bible.persistable_packed_verse_id(key):
+            if (key := self.other_verse_id_keys.get(verse_id)) is None:
+                return []
+        slot = self.hash_slot(key, self.table_bits)
+        while (line_index := self.hash_table[slot]) >= 0:
+            if self.packed_verse_ids[line_index] == key:
+                result = []
+                while line_index >= 0:
+                    if line_index < self.n_vref_lines:
+                        result.append(line_index)
+                    line_index = self.next_line_with_same_verse_id[line_index]
+                return result
+            slot = (slot + 1) & (self.table_size - 1)
+        return []
+
+    def lines(self) -> Iterator[Tuple[str | None, str]]:
+        """(verse ID, line) pairs, as read from a corpus file and its verse ID file"""
+        for line_index in range(self.n_lines):
+            yield self.verse_id(line_index), self.line(line_index)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input_corpus_filename', required=True)
+    parser.add_argument('-j', '--input_verse_id_filename', default=None)
+    parser.add_argument('-o', '--output_store_filename', required=True)
+    args = parser.parse_args()
+    n_lines = VrefCorpusStore.build(args.input_corpus_filename,
+                                    args.input_verse_id_filename or general_util.find_file('vref.txt', []),
+                                    args.output_store_filename)
+    sys.stderr.write(f"Wrote {n_lines:,d} lines of {args.input_corpus_filename} to {args.output_store_filename}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,15 +34,17 @@ used to quantify the phonetic similarity.
 """
 # -*- encoding: utf-8 -*-
 import argparse
+import hashlib
 import logging as log
 import re
+import sqlite3
 import sys
 from typing import List, Optional, Tuple, TextIO, Union
 
 log.basicConfig(level=log.WARNING)
 
-__version__ = '0.2.0'
-last_mod_date = 'April 4, 2024'
+__version__ = '0.2.1'
+last_mod_date = 'October 18, 2026'
 
 
 def slot_value_in_double_colon_del_list(line: str, slot: str, default: Optional[str] = None) -> str:
@@ -101,14 +103,110 @@ def concat2(s1: str, s2: str, sep: str) -> str:
         return s1 + sep + s2
 
 
+class SmartEditDistanceMemoStore:
+    """Optional persistent (SQLite) memo store for string_distance_cost results, shared across runs.
+    Entries are keyed by a fingerprint of the loaded cost rules (cost file content and language codes),
+    the two strings and the search parameters (max_cost, partial, min_len).
+    When the number of entries exceeds max_entries, the least recently used entries are evicted.
+    New entries and usage updates are buffered and written in batches; the store may be shared by processes."""
+    def __init__(self, filename: str, max_entries: int = 1000000, commit_interval: int = 1000):
+        self.filename = filename
+        self.max_entries = max_entries
+        self.commit_interval = commit_interval  # number of buffered changes between commits
+        self.pending_entries = {}               # key: memo key, value: row values
+        self.pending_usage = {}                 # key: memo key, value: last_used
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_evictions = 0
+        # Autocommit mode (isolation_level=None), so that reads do not hold locks; writes use explicit
+        # 'BEGIN IMMEDIATE' transactions, which wait (timeout) for other processes rather than deadlock.
+        self.connection = sqlite3.connect(filename, timeout=60, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        # cost column without type affinity, so that integer costs (e.g. 1) are returned as int, not float.
+        self.connection.execute('CREATE TABLE IF NOT EXISTS memo (rules TEXT, s1 TEXT, s2 TEXT, max_cost REAL, '
+                                'partial INTEGER, min_len INTEGER, cost, cost_log TEXT, l1 INTEGER, '
+                                'l2 INTEGER, last_used INTEGER, '
+                                'PRIMARY KEY (rules, s1, s2, max_cost, partial, min_len))')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS memo_last_used ON memo (last_used)')
+        # last_used is a logical clock (rather than wall-clock time), continued across runs.
+        self.clock = self.connection.execute('SELECT MAX(last_used) FROM memo').fetchone()[0] or 0
+        self.n_entries = self.connection.execute('SELECT COUNT(*) FROM memo').fetchone()[0]
+
+    @staticmethod
+    def memo_key(rules: str, s1: str, s2: str, max_cost: Optional[float], partial: bool, min_len: int) -> tuple:
+        return rules, s1, s2, -1 if max_cost is None else max_cost, int(partial), min_len
+
+    def tick(self) -> int:
+        self.clock += 1
+        return self.clock
+
+    def lookup(self, rules: str, s1: str, s2: str, max_cost: Optional[float], partial: bool, min_len: int) \
+            -> Optional[Tuple[Optional[float], str, Optional[int], Optional[int]]]:
+        """Returns (cost, cost_log, l1, l2) or None if there is no memo entry."""
+        key = self.memo_key(rules, s1, s2, max_cost, partial, min_len)
+        if pending_entry := self.pending_entries.get(key):
+            self.n_hits += 1
+            return pending_entry[:4]
+        row = self.connection.execute('SELECT cost, cost_log, l1, l2 FROM memo WHERE rules=? AND s1=? AND s2=? '
+                                      'AND max_cost=? AND partial=? AND min_len=?', key).fetchone()
+        if row is None:
+            self.n_misses += 1
+            return None
+        self.n_hits += 1
+        self.pending_usage[key] = self.tick()
+        self.commit_if_due()
+        return row
+
+    def store(self, rules: str, s1: str, s2: str, max_cost: Optional[float], partial: bool, min_len: int,
+              cost: Optional[float], cost_log: str, l1: Optional[int] = None, l2: Optional[int] = None) -> None:
+        key = self.memo_key(rules, s1, s2, max_cost, partial, min_len)
+        self.pending_entries[key] = (cost, cost_log, l1, l2, self.tick())
+        self.commit_if_due()
+
+    def commit_if_due(self) -> None:
+        if len(self.pending_entries) + len(self.pending_usage) >= self.commit_interval:
+            self.commit()
+
+    def commit(self) -> None:
+        """Writes buffered new entries and usage updates to disk; evicts entries if store exceeds max_entries."""
+        if not (self.pending_entries or self.pending_usage):
+            return
+        self.connection.execute('BEGIN IMMEDIATE')
+        self.connection.executemany('INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                    [key + value for key, value in self.pending_entries.items()])
+        self.connection.executemany('UPDATE memo SET last_used=? WHERE rules=? AND s1=? AND s2=? '
+                                    'AND max_cost=? AND partial=? AND min_len=?',
+                                    [(last_used,) + key for key, last_used in self.pending_usage.items()])
+        self.n_entries = self.connection.execute('SELECT COUNT(*) FROM memo').fetchone()[0]
+        if self.n_entries > self.max_entries:
+            # Leave some headroom (10%) below max_entries, so that eviction is not needed again right away.
+            n_excess = self.n_entries - int(self.max_entries * 0.9)
+            self.connection.execute('DELETE FROM memo WHERE rowid IN '
+                                    '(SELECT rowid FROM memo ORDER BY last_used LIMIT ?)', (n_excess,))
+            self.n_evictions += n_excess
+            self.n_entries -= n_excess
+        self.connection.execute('COMMIT')
+        self.pending_entries.clear()
+        self.pending_usage.clear()
+
+    def close(self) -> None:
+        self.commit()
+        self.connection.close()
+        log.info(f'Memo store {self.filename}: {self.n_hits} hits, {self.n_misses} misses, '
+                 f'{self.n_evictions} evictions, {self.n_entries} entries')
+
+
 class SmartEditDistance:
-    def __init__(self):
+    def __init__(self, memo_store: Optional[SmartEditDistanceMemoStore] = None):
         self.ht = {}              # dictionary stores most of the cost file data
         self.max1 = 1             # max length of 's1', used for run-time optimization
         self.max2 = 1             # max length of 's2'
         self.n_cost_rules = 0
         self.n_entries = 0
         self.prev_line_number = 0
+        self.memo_store = memo_store     # optional persistent cache of string_distance_cost results
+        self.rule_hash = hashlib.sha1()  # fingerprint of loaded cost rules, part of memo store key
+        self.rule_fingerprint = ''
 
     def add_re_context_to_cost_rule(self, slot: str, value: str, cost_rule_id: str, line_number: int) -> None:
         """Adds optional compiled regular expression left context to cost rule"""
@@ -197,8 +295,10 @@ class SmartEditDistance:
         self.prev_line_number = 0
         line_number = 0
         n_warnings = 0
+        self.rule_hash.update(f'lc1:{lang_code1}\tlc2:{lang_code2}\n'.encode('utf-8'))
         for line in cost_file:
             line_number += 1
+            self.rule_hash.update(line.encode('utf-8'))
             if re.match(r'^\uFEFF?\s*(?:#.*)?$', line):  # ignore empty or comment line
                 continue
             # Check whether cost file line is well-formed. Following call will output specific warnings.
@@ -238,6 +338,7 @@ class SmartEditDistance:
         lang_code2_clause = f' lc2: {lang_code2}' if lang_code2 else ''
         log.info(f'Loaded {self.n_entries} entries from {line_number} lines '
                  f'in {filename}{lang_code1_clause}{lang_code2_clause}')
+        self.rule_fingerprint = self.rule_hash.hexdigest()
         if isinstance(raw_cost_file, str):
             cost_file.close()
 
@@ -287,7 +388,22 @@ class SmartEditDistance:
             -> Union[Tuple[Optional[float], str], Tuple[Optional[float], str, Optional[int], Optional[int]]]:
         """The core function of the SmartEditDistance class.
         Returns a tuple of cost and cost-log (= cost explanation). Return cost of None marks failure.
-        Optional: maximum allowable cost. The lower the maximum allowable cost, the more efficient the cost search."""
+        Optional: maximum allowable cost. The lower the maximum allowable cost, the more efficient the cost search.
+        If a memo store is attached, it is consulted first, and new results are added to it."""
+        if self.memo_store is None:
+            return self.compute_string_distance_cost(s1, s2, max_cost=max_cost, partial=partial, min_len=min_len)
+        memo = self.memo_store.lookup(self.rule_fingerprint, s1, s2, max_cost, partial, min_len)
+        if memo is not None:
+            cost, cost_log, l1, l2 = memo
+            return (cost, cost_log, l1, l2) if partial else (cost, cost_log)
+        result = self.compute_string_distance_cost(s1, s2, max_cost=max_cost, partial=partial, min_len=min_len)
+        self.memo_store.store(self.rule_fingerprint, s1, s2, max_cost, partial, min_len, *result)
+        return result
+
+    def compute_string_distance_cost(self, s1: str, s2: str, max_cost: float = None, partial: bool = False,
+                                     min_len: int = 4) \
+            -> Union[Tuple[Optional[float], str], Tuple[Optional[float], str, Optional[int], Optional[int]]]:
+        """Computes string_distance_cost (without memo store)."""
         log.debug(f'string_distance_cost({s1}, {s2})')
         len1 = len(s1)
         len2 = len(s2)
@@ -384,12 +500,17 @@ def main(argv) -> None:
     parser.add_argument('--lc2', type=str, default='', metavar='LANGUAGE-CODE2', help="of second string ...")
     parser.add_argument('--maxcost', type=float, default=1.9, metavar='MAXIMUM-ALLOWABLE-COST',
                         help='to limit search and thus improve speed (default: 1.9)')
+    parser.add_argument('-m', '--memo', type=str, default=None, metavar='MEMO-FILENAME',
+                        help='optional persistent memo store (SQLite) to reuse costs across runs')
+    parser.add_argument('--memo_max_entries', type=int, default=1000000, metavar='MAX-ENTRIES',
+                        help='size cap of memo store; least recently used entries are evicted (default: 1000000)')
     # add program version; thanks to https://stackoverflow.com/a/15406624/1506477
     parser.add_argument('-v', '--version', action='version',
                         version=f'%(prog)s {__version__} last modified: {last_mod_date}')
     args = parser.parse_args(argv)
     # Initialize SmartEditDistance object.
-    sd = SmartEditDistance()
+    memo_store = SmartEditDistanceMemoStore(args.memo, max_entries=args.memo_max_entries) if args.memo else None
+    sd = SmartEditDistance(memo_store=memo_store)
     # Read in cost file.
     if args.cost:
         sd.load_smart_edit_distance_data(args.cost, args.lc1, args.lc2)
@@ -423,6 +544,8 @@ def main(argv) -> None:
             if len(values) >= 3:
                 args.output.write(f'\t{values[2]}')
             args.output.write('\n')
+    if memo_store:
+        memo_store.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch scoring of string pairs with the smart edit distance, spread across a pool of worker processes.
+Each worker loads the cost rules once (per language code pair) and then scores chunks of input pairs.
+Results are streamed back in input order, so output lines correspond one-to-one to input lines.
+
+Input: tab-separated lines: s1, s2, optionally followed by lc1, lc2 (language codes) and a comment.
+Empty or missing language codes default to the values of the --lc1 and --lc2 arguments.
+Output: s1, s2, cost (99.99 for failure, i.e. cost above max-cost), cost-log, and any lc1, lc2, comment.
+Example: smart_edit_distance_batch.py -c ../data/string-distance-cost-rules.txt -i pairs.tsv -o costs.tsv -j 8
+"""
+import argparse
+import itertools
+import logging as log
+import multiprocessing
+import multiprocessing.util
+import os
+import re
+import sys
+from typing import Iterator, List, Optional
+
+from smart_edit_distance import SmartEditDistance, SmartEditDistanceMemoStore
+
+log.basicConfig(level=log.WARNING)
+
+__version__ = '0.2.1'
+last_mod_date = 'October 18, 2026'
+
+# Per-worker state, set by init_worker. Key of sed_dict: (lang_code1, lang_code2)
+worker_config = {}
+sed_dict = {}
+
+
+def init_worker(cost_filename: Optional[str], lang_code1: str, lang_code2: str, max_cost: Optional[float],
+                memo_filename: Optional[str] = None) -> None:
+    worker_config.update({'cost_filename': cost_filename, 'lc1': lang_code1, 'lc2': lang_code2,
+                          'max_cost': max_cost, 'memo_filename': memo_filename})
+    sed_dict.clear()
+
+
+def init_pool_worker(*init_args) -> None:
+    init_worker(*init_args)
+    # Runs when the worker exits normally (after pool.close() and pool.join(), not after pool.terminate()).
+    multiprocessing.util.Finalize(None, close_memo_stores, exitpriority=10)
+
+
+def close_memo_stores() -> None:
+    """Writes any buffered memo store changes to disk and closes the memo stores of this process."""
+    for sed in sed_dict.values():
+        if sed.memo_store:
+            sed.memo_store.close()
+    sed_dict.clear()
+
+
+def get_sed(lang_code1: str, lang_code2: str) -> SmartEditDistance:
+    """Returns SmartEditDistance for language code pair, loading cost rules only on first use in this worker."""
+    sed = sed_dict.get((lang_code1, lang_code2))
+    if sed is None:
+        memo_filename = worker_config.get('memo_filename')
+        sed = SmartEditDistance(memo_store=SmartEditDistanceMemoStore(memo_filename) if memo_filename else None)
+        if cost_filename := worker_config.get('cost_filename'):
+            sed.load_smart_edit_distance_data(cost_filename, lang_code1, lang_code2)
+        sed_dict[(lang_code1, lang_code2)] = sed
+    return sed
+
+
+def score_line(line: str) -> Optional[str]:
+    """Scores one input line; returns output line (without newline) or None for lines without string pair."""
+    values = re.split(r'\t', line.rstrip('\r\n'), 4)
+    if len(values) < 2:
+        return None
+    s1, s2 = values[0], values[1]
+    lang_code1 = (values[2] if len(values) >= 3 else '') or worker_config['lc1']
+    lang_code2 = (values[3] if len(values) >= 4 else '') or worker_config['lc2']
+    sed = get_sed(lang_code1, lang_code2)
+    cost, cost_log = sed.string_distance_cost(s1.lower(), s2.lower(), max_cost=worker_config['max_cost'])
+    if cost is None:  # string distance search failure (search cut short for cost > max-cost)
+        cost = 99.99
+    result = f'{s1}\t{s2}\t{str(round(cost, 2))}\t# {cost_log}'
+    if len(values) >= 3:
+        result += '\t' + '\t'.join(values[2:])
+    return result
+
+
+def score_chunk(lines: List[str]) -> List[Optional[str]]:
+    results = [score_line(line) for line in lines]
+    for sed in sed_dict.values():
+        if sed.memo_store:
+            sed.memo_store.commit()
+    return results
+
+
+def chunks(lines: Iterator[str], chunk_size: int) -> Iterator[List[str]]:
+    while chunk := list(itertools.islice(lines, chunk_size)):
+        yield chunk
+
+
+def score_pairs(lines: Iterator[str], cost_filename: Optional[str], lang_code1: str = '', lang_code2: str = '',
+                max_cost: Optional[float] = 1.9, n_workers: Optional[int] = None, chunk_size: int = 200,
+                memo_filename: Optional[str] = None) -> Iterator[Optional[str]]:
+    """Generator of output lines (None for skipped input lines), in input order."""
+    init_args = (cost_filename, lang_code1, lang_code2, max_cost, memo_filename)
+    if n_workers == 1:
+        init_worker(*init_args)
+        try:
+            for chunk in chunks(lines, chunk_size):
+                yield from score_chunk(chunk)
+        finally:
+            close_memo_stores()
+    else:
+        with multiprocessing.Pool(n_workers, initializer=init_pool_worker, initargs=init_args) as pool:
+            # imap (as opposed to imap_unordered) returns chunk results in input order, as soon as available.
+            for results in pool.imap(score_chunk, chunks(lines, chunk_size)):
+                yield from results
+            # Let workers exit normally, so that they close their memo stores (see init_pool_worker).
+            pool.close()
+            pool.join()
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser(description='Scores string pairs by smart edit distance using multiple processes')
+    parser.add_argument('-c', '--cost', type=str, default=None, metavar='COST-FILENAME',
+                        help='(default: Levenshtein distance)')
+    parser.add_argument('-i', '--input', type=argparse.FileType('r', encoding='utf-8', errors='ignore'),
+                        default=sys.stdin, metavar='INPUT-FILENAME', help='(default: STDIN)')
+    parser.add_argument('-o', '--output', type=argparse.FileType('w', encoding='utf-8', errors='ignore'),
+                        default=sys.stdout, metavar='OUTPUT-FILENAME', help='(default: STDOUT)')
+    parser.add_argument('--lc1', type=str, default='', metavar='LANGUAGE-CODE1',
+                        help='default language code of first string (ISO 639-3)')
+    parser.add_argument('--lc2', type=str, default='', metavar='LANGUAGE-CODE2', help='... of second string')
+    parser.add_argument('--maxcost', type=float, default=1.9, metavar='MAXIMUM-ALLOWABLE-COST',
+                        help='to limit search and thus improve speed (default: 1.9)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), metavar='N',
+                        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--chunk_size', type=int, default=200, metavar='N',
+                        help='number of pairs per task sent to a worker (default: 200)')
+    parser.add_argument('-m', '--memo', type=str, default=None, metavar='MEMO-FILENAME',
+                        help='optional persistent memo store (SQLite), shared by workers')
+    parser.add_argument('-v', '--version', action='version',
+                        version=f'%(prog)s {__version__} last modified: {last_mod_date}')
+    args = parser.parse_args(argv)
+    if args.cost and not os.path.exists(args.cost):
+        sys.exit(f'Cost file {args.cost} not found')
+    n_output_lines = 0
+    for result in score_pairs(args.input, args.cost, args.lc1, args.lc2, max_cost=args.maxcost,
+                              n_workers=max(1, args.workers or 1), chunk_size=max(1, args.chunk_size),
+                              memo_filename=args.memo):
+        if result is not None:
+            args.output.write(result + '\n')
+            n_output_lines += 1
+    log.info(f'Scored {n_output_lines} string pairs')
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark and equivalence harness for the smart edit distance.
+Word pairs are drawn from bundled corpora (owl sample input, legitimate duplicates) and from the two bundled
+cost rule files (::example slots, plus variants of corpus words obtained by applying cost rules).
+For each mode (full, thresholded, partial), it measures pairs per second of an engine, and verifies that the
+engine returns the same costs as a reference (another engine class and/or previously saved reference results).
+Results are written as JSON. "equivalent" is null if there was no reference to compare with; a dataset or mode
+missing from the saved reference results counts as not equivalent.
+Example: smart_edit_distance_benchmark.py -o sed_benchmark.json --save_reference sed_reference.json
+Later:   smart_edit_distance_benchmark.py -o sed_benchmark.json --engine my_fast_sed:FastSmartEditDistance \
+                                          --reference_results sed_reference.json
+"""
+import argparse
+import datetime
+import importlib
+import json
+import logging as log
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from smart_edit_distance import slot_value_in_double_colon_del_list
+
+log.basicConfig(level=log.WARNING)
+
+__version__ = '0.2.1'
+last_mod_date = 'October 18, 2026'
+
+src_dir = os.path.dirname(os.path.abspath(__file__))
+data_dir = os.path.join(os.path.dirname(src_dir), 'data')
+root_dir = os.path.dirname(os.path.dirname(src_dir))
+owl_data_dir = os.path.join(root_dir, 'greekroom', 'greekroom', 'owl', 'data')
+
+# Dataset name -> cost file, language codes
+datasets = {'latin': ('string-distance-cost-rules.txt', '', ''),
+            'devanagari': ('string-distance-cost-rules-Devanagari.txt', 'hin', 'hin')}
+
+# Mode name -> keyword arguments of string_distance_cost
+modes = {'full': {'max_cost': None},
+         'thresholded': {'max_cost': 1.9},
+         'partial': {'max_cost': 1.9, 'partial': True}}
+
+
+def corpus_words(script_re: str) -> List[str]:
+    """Lower-case words (of a given script) from bundled owl data files."""
+    words = set()
+    filenames = [os.path.join(owl_data_dir, 'legitimate_duplicates.jsonl')]
+    samples_dir = os.path.join(owl_data_dir, 'samples_inputs')
+    if os.path.isdir(samples_dir):
+        filenames.extend(os.path.join(samples_dir, filename) for filename in sorted(os.listdir(samples_dir)))
+    for filename in filenames:
+        try:
+            with open(filename, encoding='utf-8') as f:
+                text = f.read()
+        except OSError:
+            log.warning(f'Could not read corpus file {filename}')
+            continue
+        for word in re.findall(fr'(?:{script_re})+', text):
+            if 3 <= len(word) <= 14:
+                words.add(word.lower())
+    return sorted(words)
+
+
+def rule_pairs(cost_filename: str) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Returns (example pairs from ::example slots, substring pairs (s1, s2) of cost rules)."""
+    example_pairs, substring_pairs = [], []
+    with open(cost_filename, encoding='utf-8') as f:
+        for line in f:
+            if re.match(r'^\uFEFF?\s*(?:#.*)?$', line):
+                continue
+            s1 = slot_value_in_double_colon_del_list(line, 's1')
+            s2 = slot_value_in_double_colon_del_list(line, 's2')
+            if s1 is not None and s2 is not None:
+                substring_pairs.append((s1, s2))
+            if example := slot_value_in_double_colon_del_list(line, 'example'):
+                # e.g. 'जायेगा/जाएगा/will go' (pair) or 'Delhi, Minh, Riyadh' (words containing s1)
+                elements = example.split('/')
+                if len(elements) >= 2:
+                    example_pairs.append((elements[0].strip().lower(), elements[1].strip().lower()))
+                elif s1 is not None and s2 is not None:
+                    for word in re.split(r',\s*', example):
+                        word = word.strip().lower()
+                        if s1 and s1 in word:
+                            example_pairs.append((word, word.replace(s1, s2, 1)))
+    return example_pairs, substring_pairs
+
+
+def build_pairs(dataset: str, max_n_pairs: int, seed: int = 1) -> List[Tuple[str, str]]:
+    """Deterministic list of word pairs: rule examples, rule-based variants and similar corpus word pairs."""
+    cost_file = datasets[dataset][0]
+    example_pairs, substring_pairs = rule_pairs(os.path.join(data_dir, cost_file))
+    words = corpus_words(r'[\u0900-\u097F]' if dataset == 'devanagari' else r'[a-zA-Z]')
+    words = words or sorted({w for pair in example_pairs for w in pair})
+    rand = random.Random(seed)
+    pairs = list(example_pairs)
+    # Variants of corpus words, obtained by applying a cost rule (exercises rules incl. context restrictions)
+    for word in words:
+        applicable = [(s1, s2) for s1, s2 in substring_pairs if s1 and s1 in word]
+        if applicable:
+            s1, s2 = rand.choice(applicable)
+            pairs.append((word, word.replace(s1, s2, 1)))
+    # Similar corpus words (same initial letter, similar length), and some dissimilar ones
+    for word in words:
+        similar = [w for w in words if w != word and w[0] == word[0] and abs(len(w) - len(word)) <= 2]
+        if similar:
+            pairs.append((word, rand.choice(similar)))
+        pairs.append((word, rand.choice(words)))
+    return pairs[:max_n_pairs]
+
+
+def load_engine_class(spec: str):
+    """spec format: module:class, e.g. smart_edit_distance:SmartEditDistance"""
+    module_name, _, class_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), class_name or 'SmartEditDistance')
+
+
+def load_engine(engine_class, dataset: str):
+    cost_file, lang_code1, lang_code2 = datasets[dataset]
+    engine = engine_class()
+    engine.load_smart_edit_distance_data(os.path.join(data_dir, cost_file), lang_code1, lang_code2)
+    return engine
+
+
+def run_mode(engine, pairs: List[Tuple[str, str]], mode: str) -> Tuple[list, float]:
+    """Returns list of results (cost, l1, l2) and elapsed time in seconds."""
+    kwargs = modes[mode]
+    results = []
+    start_time = time.perf_counter()
+    for s1, s2 in pairs:
+        result = engine.string_distance_cost(s1, s2, **kwargs)
+        cost = result[0]
+        l1, l2 = (result[2], result[3]) if len(result) >= 4 else (None, None)
+        results.append([cost, l1, l2])
+    return results, time.perf_counter() - start_time
+
+
+def compare_results(results: list, ref_results: list, pairs: List[Tuple[str, str]], max_n_examples: int = 10) \
+        -> Dict:
+    n_mismatches = 0
+    examples = []
+    for (s1, s2), result, ref_result in zip(pairs, results, ref_results):
+        cost, l1, l2 = result
+        ref_cost, ref_l1, ref_l2 = ref_result
+        if (cost is None) != (ref_cost is None) \
+                or (cost is not None and abs(cost - ref_cost) > 1e-9) \
+                or (l1, l2) != (ref_l1, ref_l2):
+            n_mismatches += 1
+            if len(examples) < max_n_examples:
+                examples.append({'s1': s1, 's2': s2, 'result': result, 'reference': ref_result})
+    return {'n_compared': min(len(results), len(ref_results)), 'n_mismatches': n_mismatches,
+            'length_mismatch': len(results) != len(ref_results), 'examples': examples}
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark and equivalence check for smart edit distance')
+    parser.add_argument('-o', '--output', type=argparse.FileType('w', encoding='utf-8'),
+                        default=sys.stdout, metavar='JSON-OUTPUT-FILENAME', help='(default: STDOUT)')
+    parser.add_argument('--engine', type=str, default='smart_edit_distance:SmartEditDistance',
+                        metavar='MODULE:CLASS', help='engine to benchmark')
+    parser.add_argument('--reference', type=str, default=None, metavar='MODULE:CLASS',
+                        help='reference engine, run on same pairs for equivalence check')
+    parser.add_argument('--reference_results', type=str, default=None, metavar='JSON-FILENAME',
+                        help='previously saved reference results for equivalence check')
+    parser.add_argument('--save_reference', type=str, default=None, metavar='JSON-FILENAME',
+                        help='save results of engine as reference results for later equivalence checks')
+    parser.add_argument('-n', '--max_n_pairs', type=int, default=2000, metavar='N',
+                        help='maximum number of pairs per dataset (default: 2000)')
+    parser.add_argument('--modes', type=str, default=','.join(modes), help=f"(default: {','.join(modes)})")
+    parser.add_argument('-v', '--version', action='version',
+                        version=f'%(prog)s {__version__} last modified: {last_mod_date}')
+    args = parser.parse_args(argv)
+    selected_modes = [mode for mode in re.split(r',\s*', args.modes) if mode in modes]
+    engine_class = load_engine_class(args.engine)
+    ref_engine_class = load_engine_class(args.reference) if args.reference else None
+    saved_ref = None
+    if args.reference_results:
+        with open(args.reference_results, encoding='utf-8') as f:
+            saved_ref = json.load(f)
+    report = {'engine': args.engine, 'reference': args.reference, 'reference_results': args.reference_results,
+              'date': datetime.datetime.now().isoformat(timespec='seconds'), 'datasets': {}}
+    all_ok = True
+    n_checks = 0  # equivalence checks against a reference engine or saved reference results
+    save_ref = {}
+    for dataset in datasets:
+        pairs = build_pairs(dataset, args.max_n_pairs)
+        start_time = time.perf_counter()
+        engine = load_engine(engine_class, dataset)
+        dataset_report = {'n_pairs': len(pairs), 'load_time': round(time.perf_counter() - start_time, 4),
+                          'modes': {}}
+        ref_engine = load_engine(ref_engine_class, dataset) if ref_engine_class else None
+        for mode in selected_modes:
+            results, elapsed = run_mode(engine, pairs, mode)
+            mode_report = {'seconds': round(elapsed, 4),
+                           'pairs_per_second': round(len(pairs) / elapsed, 1) if elapsed else None,
+                           'n_failures': sum(1 for result in results if result[0] is None)}
+            if ref_engine:
+                ref_results, ref_elapsed = run_mode(ref_engine, pairs, mode)
+                mode_report['reference_seconds'] = round(ref_elapsed, 4)
+                mode_report['speedup'] = round(ref_elapsed / elapsed, 3) if elapsed else None
+                mode_report['equivalence'] = compare_results(results, ref_results, pairs)
+            if saved_ref is not None:
+                if saved_results := saved_ref.get(dataset, {}).get(mode):
+                    mode_report['saved_reference_equivalence'] = compare_results(results, saved_results['results'],
+                                                                                 pairs)
+                    if saved_results.get('pairs') != [list(pair) for pair in pairs]:
+                        mode_report['saved_reference_equivalence']['pairs_differ'] = True
+                else:
+                    mode_report['saved_reference_equivalence'] = {'missing_in_reference_results': True}
+            for key in ('equivalence', 'saved_reference_equivalence'):
+                if key in mode_report:
+                    n_checks += 1
+                    if (mode_report[key].get('n_mismatches') or mode_report[key].get('length_mismatch')
+                            or mode_report[key].get('pairs_differ')
+                            or mode_report[key].get('missing_in_reference_results')):
+                        all_ok = False
+            dataset_report['modes'][mode] = mode_report
+            save_ref.setdefault(dataset, {})[mode] = {'pairs': pairs, 'results': results}
+        report['datasets'][dataset] = dataset_report
+    report['equivalent'] = all_ok if n_checks else None  # None: unchecked
+    if args.save_reference:
+        with open(args.save_reference, 'w', encoding='utf-8') as f:
+            json.dump(save_ref, f, ensure_ascii=False)
+    json.dump(report, args.output, ensure_ascii=False, indent=2)
+    args.output.write('\n')
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
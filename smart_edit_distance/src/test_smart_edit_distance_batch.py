@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Checks that batch scoring in worker processes (score_pairs) returns the same output lines, in input order,
+# as serial scoring, and that workers close their memo stores with all entries written.
+
+import os
+from pathlib import Path
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+from smart_edit_distance_batch import score_pairs
+
+cost_filename = str(Path(__file__).resolve().parent.parent / 'data' / 'string-distance-cost-rules.txt')
+
+
+def input_lines() -> list:
+    names = ['Josef Schumann', 'Joseph Schuman', 'Muhammad', 'Mohamed', 'center', 'centre', 'Jim', 'Kim', 'Nepal']
+    lines = [f"{name1}\t{name2}\n" for name1 in names for name2 in names]
+    lines[5] = 'no pair\n'
+    lines[7] = 'wuhammad\tuhammad\tara\t\tcomment\n'
+    return lines
+
+
+def test_batch_same_as_serial():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        serial_results = list(score_pairs(iter(input_lines()), cost_filename, n_workers=1, chunk_size=7))
+        assert serial_results[5] is None and serial_results[7].endswith('\tara\t\tcomment')
+        assert serial_results[1].startswith('Josef Schumann\tJoseph Schuman\t')
+        memo_filename = os.path.join(tmp_dir, 'memo.db')
+        batch_results = list(score_pairs(iter(input_lines()), cost_filename, n_workers=3, chunk_size=7,
+                                         memo_filename=memo_filename))
+        assert batch_results == serial_results
+        with sqlite3.connect(memo_filename) as connection:
+            n_entries = connection.execute('SELECT COUNT(*) FROM memo').fetchone()[0]
+        assert n_entries == len(set(line.lower() for line in input_lines() if '\t' in line))
+        # from memo store
+        assert list(score_pairs(iter(input_lines()), cost_filename, n_workers=1, chunk_size=7,
+                                memo_filename=memo_filename)) == serial_results
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Checks SmartEditDistanceMemoStore: hits and misses, max_cost keys (None stored as -1), failure costs,
+# least-recently-used eviction by logical clock, and reopening a persisted store.
+
+import os
+from pathlib import Path
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+from smart_edit_distance import SmartEditDistance, SmartEditDistanceMemoStore
+
+cost_filename = Path(__file__).resolve().parent.parent / 'data' / 'string-distance-cost-rules.txt'
+
+
+def test_memo_hits_and_max_cost():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SmartEditDistanceMemoStore(os.path.join(tmp_dir, 'memo.db'), commit_interval=3)
+        assert store.lookup('rules', 'fat', 'cat', None, False, 4) is None
+        store.store('rules', 'fat', 'cat', None, False, 4, 1.0, 'f/c', None, None)
+        assert store.lookup('rules', 'fat', 'cat', None, False, 4) == (1.0, 'f/c', None, None)  # pending
+        assert store.lookup('rules', 'fat', 'cat', 1.9, False, 4) is None  # max_cost is part of key
+        assert store.lookup('other rules', 'fat', 'cat', None, False, 4) is None
+        store.store('rules', 'fat', 'cat', 0.5, False, 4, None, '', None, None)  # failure: cost above max_cost
+        store.commit()
+        assert store.lookup('rules', 'fat', 'cat', None, False, 4) == (1.0, 'f/c', None, None)  # from disk
+        assert store.lookup('rules', 'fat', 'cat', 0.5, False, 4) == (None, '', None, None)
+        assert store.lookup('rules', 'fat', 'cat', -1, False, 4) == (1.0, 'f/c', None, None)  # None is stored as -1
+        assert (store.n_hits, store.n_misses) == (4, 3)
+        store.close()
+
+
+def test_memo_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SmartEditDistanceMemoStore(os.path.join(tmp_dir, 'memo.db'), max_entries=10, commit_interval=1)
+        for i in range(10):
+            store.store('rules', f's{i}', 't', None, False, 4, float(i), '')
+        assert store.lookup('rules', 's0', 't', None, False, 4) is not None  # s0 is now most recently used
+        store.store('rules', 's10', 't', None, False, 4, 10.0, '')
+        # 11 entries > 10: evicted down to 90% of max_entries, least recently used (s1, s2) first
+        assert (store.n_entries, store.n_evictions) == (9, 2)
+        assert [i for i in range(11) if store.lookup('rules', f's{i}', 't', None, False, 4) is None] == [1, 2]
+        store.close()
+
+
+def test_memo_reopen():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memo_filename = os.path.join(tmp_dir, 'memo.db')
+        sed = SmartEditDistance(memo_store=SmartEditDistanceMemoStore(memo_filename))
+        sed.load_smart_edit_distance_data(str(cost_filename), '', '')
+        result = sed.string_distance_cost('center', 'centre', max_cost=1.9)
+        clock = sed.memo_store.clock
+        sed.memo_store.close()  # pending entries are written on close
+        store = SmartEditDistanceMemoStore(memo_filename)
+        assert (store.n_entries, store.clock) == (1, clock)  # logical clock continues across runs
+        sed2 = SmartEditDistance(memo_store=store)
+        sed2.load_smart_edit_distance_data(str(cost_filename), '', '')
+        assert sed2.string_distance_cost('center', 'centre', max_cost=1.9) == result
+        assert (store.n_hits, store.n_misses) == (1, 0)
+        sed3 = SmartEditDistance(memo_store=store)  # different cost rules (none): not the same memo entry
+        assert sed3.string_distance_cost('center', 'centre', max_cost=3)[0] == 2
+        assert store.n_misses == 1
+        store.close()
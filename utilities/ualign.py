@@ -16,7 +16,7 @@ import pstats
 import regex
 import sys
 from typing import Optional, TextIO, Union
-from smart_edit_distance import SmartEditDistance
+from smart_edit_distance import SmartEditDistance, SmartEditDistanceMemoStore
 import unicodedata as ud
 
 
@@ -3503,6 +3503,8 @@ def main():
                         default=None, metavar='PROFILE-FILENAME', help='(optional output for performance analysis)')
     parser.add_argument('-c', '--cost', type=argparse.FileType('r', encoding='utf-8', errors='ignore'),
                         default=None, metavar='COST-FILENAME', help='(default: Levenshtein distance)')
+    parser.add_argument('--sed_memo', type=str, default=None, metavar='MEMO-FILENAME',
+                        help='optional persistent memo store for smart-edit-distance costs (reused across runs)')
     args = parser.parse_args()
     if args.log_filename:
         f_log = open(args.log_filename, 'w')
@@ -3514,8 +3516,10 @@ def main():
     f_lang_code = lang_to_langcode(args.f_lang_name)
     sd = None
     spc = None
+    sed_memo_store = None
     if args.cost:
-        sd = SmartEditDistance()
+        sed_memo_store = SmartEditDistanceMemoStore(args.sed_memo) if args.sed_memo else None
+        sd = SmartEditDistance(memo_store=sed_memo_store)
         sd.load_smart_edit_distance_data(args.cost, e_lang_code, f_lang_code)
         spc = SpellChecker()
         spc.read_battery_file(args.battery_filename)
@@ -3585,6 +3589,8 @@ def main():
         spc.build_alignment_based_spelling_variations('e', e_am, f_am, sd)
         spc.build_alignment_based_spelling_variations('f', f_am, e_am, sd)
         spc.report(args.battery_filename, e_am, f_am, sd)
+    if sed_memo_store:
+        sed_memo_store.close()
     if pr:
         pr.disable()
         ps = pstats.Stats(pr, stream=args.profile).sort_stats(pstats.SortKey.TIME)